@@ -0,0 +1,91 @@
+"""
+Benchmark: ingestion throughput per format, fast-path readers vs. the Docling pipeline.
+
+Generates synthetic TXT / CSV / XLSX files and times parse + chunk for each format:
+    - fast: Parser dispatch to the streaming readers (row batches / line windows)
+    - docling (--docling): the same file converted by Docling and chunked by HybridChunker
+With --pdf, also times a real PDF with each parsing profile (accurate, balanced, auto, fast).
+
+Run from apps/backend with src on the path:
+    PYTHONPATH=src python benchmarks/bench_fast_readers.py --rows 20000 --docling --pdf ../../samples/sample2.pdf
+"""
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+
+from openpyxl import Workbook
+
+from core.chunker import Chunker
+from core.parser import Parser
+
+WORDS = "invoice contract hotel room supplier delivery quantity discount payment warranty clause total".split()
+
+
+def write_files(folder: str, rows: int, rng: random.Random) -> dict:
+    header = ["id", "date", "supplier", "description", "quantity", "unit_price", "total"]
+    records = []
+    for i in range(rows):
+        quantity, price = rng.randint(1, 50), round(rng.uniform(1, 500), 2)
+        records.append([i, f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", f"Supplier {rng.randint(1, 200)}",
+                        " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 12))), quantity, price, round(quantity * price, 2)])
+
+    paths = {"txt": os.path.join(folder, "synthetic.txt"), "csv": os.path.join(folder, "synthetic.csv"), "xlsx": os.path.join(folder, "synthetic.xlsx")}
+    with open(paths["txt"], "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(f"On {record[1]}, {record[2]} delivered {record[4]} items ({record[3]}) for a total of {record[6]}.\n")
+    with open(paths["csv"], "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(records)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Invoices")
+    sheet.append(header)
+    for record in records:
+        sheet.append(record)
+    workbook.save(paths["xlsx"])
+    return paths
+
+
+def run(label: str, path: str, parse, chunker: Chunker, units: int):
+    start = time.perf_counter()
+    doc = parse(path)
+    parsed = time.perf_counter()
+    chunks = chunker.chunk(doc)
+    done = time.perf_counter()
+    total = done - start
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"{label:<14} | {parsed - start:>9.2f} {done - parsed:>9.2f} {total:>9.2f} | {len(chunks):>7} "
+          f"{units / total:>11.0f} {size_mb / total:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="Rows (CSV/XLSX) / lines (TXT) per synthetic file")
+    parser.add_argument("--docling", action="store_true", help="Also time the Docling pipeline on the synthetic files")
+    parser.add_argument("--pdf", default=None, help="PDF to time with every parsing profile")
+    args = parser.parse_args()
+
+    chunker = Chunker()
+    fast_parser = Parser()
+    print(f"{'run':<14} | {'parse (s)':>9} {'chunk (s)':>9} {'total (s)':>9} | {'chunks':>7} {'rows/pages/s':>11} {'MB/s':>8}")
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = write_files(folder, args.rows, random.Random(0))
+        for fmt, path in paths.items():
+            run(f"{fmt} fast", path, lambda p: fast_parser.parse(p), chunker, args.rows)
+            if args.docling:
+                run(f"{fmt} docling", path, lambda p: fast_parser.converter.convert(p).document, chunker, args.rows)
+
+    if args.pdf:
+        pages = Parser.page_count(args.pdf)
+        for profile in ("accurate", "balanced", "auto", "fast"):
+            run(f"pdf {profile}", args.pdf, lambda p: fast_parser.parse(p, use_cache=False, profile=profile), chunker, pages)
+            print(f"{'':<14}   {fast_parser.last_timings}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: page-numbered markdown export, legacy replace loop vs. single-pass page splitting.
+
+Builds a synthetic DoclingDocument of N pages (a heading and a few paragraphs per page) and times:
+    - legacy: export with a placeholder, then one str.replace per page break (O(pages x size))
+    - single pass: Parser.export_to_markdown_with_page_numbers (one split over the serialization)
+    - first page: time until Parser.iter_markdown_pages yields its first page
+
+Run from apps/backend with src on the path:
+    PYTHONPATH=src python benchmarks/bench_markdown_export.py --pages 100 500 1000
+"""
+
+import argparse
+import time
+
+from docling_core.types.doc import BoundingBox, DocItemLabel, DoclingDocument, ProvenanceItem, Size
+
+from core.parser import Parser
+
+PARAGRAPH = (
+    "The maintenance interval of the hydraulic pump is 500 operating hours. "
+    "Replace the filter cartridge and check the pressure relief valve before restarting the unit. "
+) * 3
+
+
+def synthetic_document(pages: int, paragraphs: int) -> DoclingDocument:
+    doc = DoclingDocument(name=f"synthetic-{pages}")
+    for page_no in range(1, pages + 1):
+        doc.add_page(page_no=page_no, size=Size(width=595, height=842))
+        items = [(DocItemLabel.SECTION_HEADER, f"Section {page_no}")] + [(DocItemLabel.TEXT, PARAGRAPH)] * paragraphs
+        for i, (label, text) in enumerate(items):
+            prov = ProvenanceItem(page_no=page_no, bbox=BoundingBox(l=50, t=50 + 60 * i, r=545, b=100 + 60 * i), charspan=(0, len(text)))
+            if label == DocItemLabel.SECTION_HEADER:
+                doc.add_heading(text=text, prov=prov)
+            else:
+                doc.add_text(label=label, text=text, prov=prov)
+    return doc
+
+
+def legacy_export(doc, first_page_idx=1) -> str:
+    """The former Parser.export_to_markdown_with_page_numbers."""
+    resp = f"\n{'='*80}\n[START OF PAGE {first_page_idx}]\n{'='*80}\n\n"+doc.export_to_markdown(page_break_placeholder="<-- Page Break -->")
+    page_index = first_page_idx
+    while "<-- Page Break -->" in resp:
+        resp = resp.replace("<-- Page Break -->", f"\n\n{'='*80}\n[END OF PAGE {page_index}]\n[START OF PAGE {page_index+1}]\n{'='*80}\n\n", 1)
+        page_index += 1
+    resp +=f"\n\n{'='*80}\n[END OF PAGE {page_index}]\n{'='*80}\n"
+    return resp
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--paragraphs", type=int, default=6, help="Paragraphs per page")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Only the export is benchmarked, no converter needed
+    exporter = Parser.__new__(Parser)
+
+    print(f"{'pages':>6} | {'legacy (s)':>10} {'single pass (s)':>15} {'speedup':>8} | {'first page (s)':>14}")
+    for pages in args.pages:
+        doc = synthetic_document(pages, args.paragraphs)
+        exported = exporter.export_to_markdown_with_page_numbers(doc)
+        assert exported.count("[START OF PAGE") == pages and f"[END OF PAGE {pages}]" in exported
+
+        legacy = timed(lambda: legacy_export(doc), args.repeat)
+        single = timed(lambda: exporter.export_to_markdown_with_page_numbers(doc), args.repeat)
+        first = timed(lambda: next(exporter.iter_markdown_pages(doc)), args.repeat)
+        print(f"{pages:>6} | {legacy:>10.3f} {single:>15.3f} {legacy / single:>7.1f}x | {first:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
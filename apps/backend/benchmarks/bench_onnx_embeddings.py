@@ -0,0 +1,92 @@
+"""
+Parity check & benchmark: ONNX Runtime (fp32 / dynamic int8) embedding backends vs. the PyTorch backend.
+
+Reports, against the PyTorch ("hf") reference:
+    - cosine agreement of document vectors (mean / min)
+    - recall@k of each query's top-k documents
+    - single-query latency (p50 / p95) and document throughput
+
+Run from apps/backend with src on the path:
+    PYTHONPATH=src python benchmarks/bench_onnx_embeddings.py --backends onnx-int8 --docs 300 --queries 50 -k 5
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from core.registry import registry
+
+WORDS = (
+    "invoice contract clause delivery payment warranty liability section annex report revenue "
+    "quarter customer product service agreement termination notice party obligation schedule "
+    "turbine pressure valve maintenance inspection safety manual procedure torque calibration"
+).split()
+
+
+def make_texts(n: int, min_words: int, max_words: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))) for _ in range(n)]
+
+
+def embed_docs(embeddings, texts):
+    start = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+    return vectors, time.perf_counter() - start
+
+
+def query_latencies(embeddings, queries):
+    latencies = []
+    vectors = []
+    for query in queries:
+        start = time.perf_counter()
+        vectors.append(embeddings.embed_query(query))
+        latencies.append(time.perf_counter() - start)
+    return np.asarray(vectors, dtype=np.float32), np.asarray(latencies)
+
+
+def top_k(query_vectors, doc_vectors, k):
+    return np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="BAAI/bge-m3")
+    parser.add_argument("--backends", nargs="+", default=["onnx-int8"], help="Backends compared against 'hf'")
+    parser.add_argument("--docs", type=int, default=300)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    docs = make_texts(args.docs, 20, 300, seed=0)
+    queries = make_texts(args.queries, 3, 12, seed=1)
+
+    results = {}
+    for backend in ["hf", *args.backends]:
+        # Uncached so every run measures the model, batched like the ragify path
+        embeddings = registry.get_embeddings(args.model, cached=False, backend=backend)
+        embeddings.embed_documents(docs[:2])
+        doc_vectors, docs_elapsed = embed_docs(embeddings, docs)
+        query_vectors, latencies = query_latencies(embeddings, queries)
+        results[backend] = (doc_vectors, query_vectors)
+        print(
+            f"{backend:<10} docs: {len(docs) / docs_elapsed:7.1f}/s   "
+            f"query latency p50 {np.percentile(latencies, 50) * 1000:7.1f}ms  p95 {np.percentile(latencies, 95) * 1000:7.1f}ms"
+        )
+
+    ref_docs, ref_queries = results["hf"]
+    ref_top = top_k(ref_queries, ref_docs, args.k)
+    for backend in args.backends:
+        doc_vectors, query_vectors = results[backend]
+        cosine = np.sum(ref_docs * doc_vectors, axis=1)
+        top = top_k(query_vectors, doc_vectors, args.k)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(ref_top, top)])
+        print(
+            f"{backend:<10} cosine vs hf: mean {cosine.mean():.4f}  min {cosine.min():.4f}   "
+            f"recall@{args.k} vs hf: {recall:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: /chat request payload and prompt size per turn, full client-side history vs. server-side sessions.
+
+Simulates a 50-turn conversation (user messages, some with attached files, and agent answers made of
+code blocks like the ones the frontend used to keep) and reports, per turn:
+    - bytes posted to /chat: the whole JSON history vs. only the new message
+    - approximate prompt tokens: the whole history interpolated in the prompt vs. the session window
+
+Run from apps/backend with src on the path:
+    PYTHONPATH=src python benchmarks/bench_session_payload.py --turns 50
+"""
+
+import argparse
+import json
+import random
+
+from agent.prompt import PROMPT
+from core.tokens import estimate_tokens
+from services.sessions import SessionStore, assistant_turn
+
+WORDS = "please summarize the contract and compare clause with invoice totals for last quarter report".split()
+
+
+def user_message(rng: random.Random) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+
+
+def code_block(rng: random.Random) -> str:
+    lines = [f"result_{i} = query_collection('reports', '{user_message(rng)}', k=5)" for i in range(rng.randint(2, 8))]
+    return "\n```python\n" + "\n".join(lines) + "\nprint(result_0)\n```\n\n"
+
+
+def prompt_tokens(history) -> int:
+    return estimate_tokens(PROMPT + f"     Current History of Conversation : {history}\n\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--token-budget", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    sessions = SessionStore(token_budget=args.token_budget)
+    session_id = "bench-session"
+    client_history = []
+
+    print(f"{'turn':>4} | {'bytes full':>10} {'bytes new':>9} | {'tokens full':>11} {'tokens window':>13}")
+    totals = [0, 0, 0, 0]
+    for turn in range(1, args.turns + 1):
+        message = user_message(rng)
+        files = [f"/app/sessions/uploads/{session_id}/report_{turn}.pdf"] if rng.random() < 0.2 else []
+
+        # Before: the frontend posts the whole history, the agent prompt embeds all of it
+        client_history.append({"role": "user", "content": message, "files_paths": files})
+        full_bytes = len(json.dumps({"session_id": session_id, "history": json.dumps(client_history)}).encode())
+        full_tokens = prompt_tokens(client_history)
+
+        # After: the frontend posts the new message, the server gives the agent a bounded window
+        sessions.append(session_id, {"role": "user", "content": message, "files_paths": files})
+        new_bytes = len(json.dumps({"session_id": session_id, "message": message}).encode())
+        window_tokens = prompt_tokens(sessions.window(session_id))
+
+        answer = assistant_turn([code_block(rng) for _ in range(rng.randint(1, 3))], "done")
+        client_history.append(answer)
+        sessions.append(session_id, answer)
+
+        for i, value in enumerate((full_bytes, new_bytes, full_tokens, window_tokens)):
+            totals[i] += value
+        if turn == 1 or turn % 5 == 0:
+            print(f"{turn:>4} | {full_bytes:>10} {new_bytes:>9} | {full_tokens:>11} {window_tokens:>13}")
+
+    print(f"{'sum':>4} | {totals[0]:>10} {totals[1]:>9} | {totals[2]:>11} {totals[3]:>13}")
+
+
+if __name__ == "__main__":
+    main()
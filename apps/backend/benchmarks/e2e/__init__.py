@@ -0,0 +1,12 @@
+"""
+Offline end-to-end benchmark: ingestion, retrieval and /chat load, without network or model downloads.
+
+The embedding model, its tokenizer and the LLM are replaced by deterministic stand-ins
+(see stubs.py) and every store lives in a temporary directory with VECTOR_BACKEND=local.
+Everything else (parser, chunker, embedding cache & batching, vector store, BM25 index,
+query cache, agent loop, chat runner, FastAPI app) is the real code.
+
+Run from apps/backend with src on the path:
+    PYTHONPATH=src python -m benchmarks.e2e --out results.json
+    PYTHONPATH=src python -m benchmarks.e2e --out new.json --compare results.json
+"""
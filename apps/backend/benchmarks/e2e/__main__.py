@@ -0,0 +1,140 @@
+"""
+Offline end-to-end benchmark and /chat load test (see benchmarks/e2e/__init__.py).
+
+    PYTHONPATH=src python -m benchmarks.e2e --documents 40 --pages 5 --clients 8 --out results.json
+    PYTHONPATH=src python -m benchmarks.e2e --formats txt --out new.json --compare results.json
+
+PDF documents are converted by Docling, whose layout models are read from the local
+HuggingFace cache: use --formats txt on a machine that never downloaded them.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Dict, Iterator, Tuple
+
+COLLECTION = "bench"
+
+
+def configure_environment(workdir: str, args):
+    """Point every store at the temporary directory, must run before core is imported."""
+    os.environ.update(
+        {
+            "VECTOR_BACKEND": "local",
+            "VECTOR_STORE_PATH": os.path.join(workdir, "vectors"),
+            "CATALOG_PATH": os.path.join(workdir, "catalog.sqlite"),
+            "LEXICAL_INDEX_DIR": os.path.join(workdir, "lexical"),
+            "DEDUP_INDEX_DIR": os.path.join(workdir, "dedup"),
+            "PARSE_CACHE_DIR": os.path.join(workdir, "parse_cache"),
+            "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embeddings.sqlite"),
+            "JOBS_DB_PATH": os.path.join(workdir, "jobs.sqlite"),
+            "SESSIONS_DB_PATH": os.path.join(workdir, "sessions.sqlite"),
+            "EMBEDDING_BACKEND": "hf",
+            "WARMUP_MODELS": "false",
+            "MAX_CONCURRENT_RUNS": str(args.max_concurrent_runs),
+            "HF_HUB_OFFLINE": "1",
+        }
+    )
+
+
+def _numbers(results: Dict, prefix: str = "") -> Iterator[Tuple[str, float]]:
+    for key, value in results.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _numbers(value, name)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield name, value
+
+
+def compare(new: Dict, old: Dict):
+    """Print every numeric result next to its value in a previous run."""
+    old_values = dict(_numbers(old["results"]))
+    print(f"\n{'metric':<52} {'old':>12} {'new':>12} {'change':>9}")
+    for name, value in _numbers(new["results"]):
+        previous = old_values.get(name)
+        if previous is None:
+            print(f"{name:<52} {'-':>12} {value:>12.6g}")
+            continue
+        change = f"{(value - previous) / previous * 100:+8.1f}%" if previous else ""
+        print(f"{name:<52} {previous:>12.6g} {value:>12.6g} {change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=20, help="Documents in the synthetic corpus")
+    parser.add_argument("--pages", type=int, default=5, help="Pages per document")
+    parser.add_argument("--formats", default="txt,pdf", help="Comma-separated document formats: txt, pdf or both")
+    parser.add_argument("--facts", type=int, default=4, help="Facts (and queries) planted per document")
+    parser.add_argument("--workers", type=int, default=2, help="Parsing processes of the ingestion")
+    parser.add_argument("--dimension", type=int, default=1024, help="Dimension of the stand-in embeddings")
+    parser.add_argument("--embed-delay", type=float, default=0.0, help="Seconds of simulated model time per embedded text")
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent /chat clients")
+    parser.add_argument("--requests", type=int, default=3, help="Messages sent by each client, one after the other")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Seconds of simulated LLM time per agent step")
+    parser.add_argument("--max-concurrent-runs", type=int, default=4, help="MAX_CONCURRENT_RUNS of the served app")
+    parser.add_argument("--skip", default="", help="Comma-separated stages to skip: queries, chat")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON file to compare with")
+    args = parser.parse_args()
+
+    formats = {fmt.strip() for fmt in args.formats.split(",") if fmt.strip()}
+    if not formats or formats - {"txt", "pdf"}:
+        parser.error("--formats accepts txt, pdf or txt,pdf")
+    skip = {stage.strip() for stage in args.skip.split(",") if stage.strip()}
+
+    with tempfile.TemporaryDirectory(prefix="autoragent-bench-") as workdir:
+        configure_environment(workdir, args)
+        # Imported after the environment is set: modules read their configuration at import
+        from benchmarks.e2e import corpus, stages, stubs
+
+        stubs.install(
+            collection=COLLECTION, dimension=args.dimension, embed_delay=args.embed_delay, llm_latency=args.llm_latency
+        )
+        data = corpus.generate(
+            os.path.join(workdir, "corpus"),
+            documents=args.documents,
+            pages=args.pages,
+            pdf_share=0.5 if len(formats) == 2 else float("pdf" in formats),
+            facts=args.facts,
+            seed=args.seed,
+        )
+
+        results = {}
+        # Always run: queries and chat need the ingested collection
+        print(f"Ingesting {len(data['paths'])} documents ({data['pages']} pages)...", file=sys.stderr)
+        results["ingestion"] = stages.bench_ingestion(data["paths"], COLLECTION, args.workers)
+        results["rss_mb_after_ingestion"] = stages.peak_rss_mb()
+        if "queries" not in skip:
+            print(f"Running {len(data['queries'])} queries per mode...", file=sys.stderr)
+            results["queries"] = stages.bench_queries(data["queries"], COLLECTION)
+        if "chat" not in skip:
+            print(f"Running {args.clients} chat clients x {args.requests} messages...", file=sys.stderr)
+            results["chat"] = stages.bench_chat(args.clients, args.requests, "What do the supplier contracts say about delivery?")
+        results["peak_rss_mb"] = stages.peak_rss_mb()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
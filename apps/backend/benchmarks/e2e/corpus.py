@@ -0,0 +1,97 @@
+"""Synthetic corpus: TXT and born-digital PDF documents planted with facts, and queries targeting them."""
+
+import os
+import random
+from typing import Dict, List, Tuple
+
+WORDS = (
+    "invoice contract hotel room supplier delivery quantity discount payment warranty clause total report "
+    "quarter budget audit shipment order customer refund policy schedule maintenance inspection tender"
+).split()
+PRODUCTS = "turbine valve pump compressor gasket bearing sensor actuator filter boiler".split()
+
+LINES_PER_PAGE = 45
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 18))]
+    return " ".join(words).capitalize() + "."
+
+
+def _fact(doc_index: int, fact_index: int, rng: random.Random) -> Tuple[str, str]:
+    """A sentence with a unique reference, and a query asking for it."""
+    reference = f"REF-{doc_index:04d}-{fact_index:02d}"
+    product = rng.choice(PRODUCTS)
+    quantity = rng.randint(2, 900)
+    sentence = f"Order {reference} covers {quantity} {product} units delivered under the {rng.choice(WORDS)} clause."
+    return sentence, f"How many {product} units does order {reference} cover?"
+
+
+def _escape_pdf(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: List[List[str]]):
+    """Minimal PDF with a text layer (Helvetica, one line per string), readable without OCR."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for lines in pages:
+        text = "".join(f"({_escape_pdf(line)}) Tj T* " for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 56 790 Td {text}ET".encode("latin-1", "replace")
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {content_ref} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            body = body if isinstance(body, bytes) else body.encode("latin-1")
+            f.write(f"{number} 0 obj\n".encode("latin-1") + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+        f.writelines(f"{offset:010d} 00000 n \n".encode("latin-1") for offset in offsets)
+        f.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+
+
+def generate(folder: str, documents: int = 20, pages: int = 5, pdf_share: float = 0.5, facts: int = 4, seed: int = 0) -> Dict:
+    """
+    Write the corpus into folder.
+
+    Args:
+        documents: Number of documents
+        pages: Pages per document (45 lines each, a TXT "page" being the same amount of text)
+        pdf_share: Fraction of the documents written as PDF, the others as TXT
+        facts: Facts planted per document, each one gets a query
+
+    Returns:
+        {"paths": [...], "pages": total pages, "queries": [{"query", "source"}]}
+    """
+    rng = random.Random(seed)
+    os.makedirs(folder, exist_ok=True)
+    paths, queries = [], []
+    pdf_count = round(documents * pdf_share)
+    for doc_index in range(documents):
+        lines = [_sentence(rng) for _ in range(pages * LINES_PER_PAGE)]
+        for fact_index in range(facts):
+            sentence, query = _fact(doc_index, fact_index, rng)
+            lines[rng.randrange(len(lines))] = sentence
+            queries.append({"query": query, "source": None})
+        is_pdf = doc_index < pdf_count
+        path = os.path.join(folder, f"doc_{doc_index:04d}.{'pdf' if is_pdf else 'txt'}")
+        if is_pdf:
+            write_pdf(path, [lines[i:i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)])
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        for query in queries[-facts:]:
+            query["source"] = os.path.basename(path)
+        paths.append(path)
+    rng.shuffle(queries)
+    return {"paths": paths, "pages": documents * pages, "queries": queries}
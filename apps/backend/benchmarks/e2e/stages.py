@@ -0,0 +1,223 @@
+"""Benchmark stages: ingestion throughput, query latency percentiles and /chat under concurrent clients."""
+
+import asyncio
+import contextlib
+import logging
+import os
+import resource
+import socket
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from core.metrics import CHUNKS, EMBED_SECONDS, EMBEDDED_TOKENS, PAGES, PARSE_SECONDS, WRITE_SECONDS, total
+
+
+def percentiles(samples: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99, mean and max of latencies in seconds, reported in milliseconds."""
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    values = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": len(samples),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(values.mean()), 3),
+        "max_ms": round(float(values.max()), 3),
+    }
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """Peak resident memory so far of this process and of its (finished) children, e.g. parse workers."""
+    # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+    scale = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale, 1),
+    }
+
+
+def _rate(amount: float, seconds: float) -> Optional[float]:
+    return round(amount / seconds, 2) if seconds > 0 else None
+
+
+def bench_ingestion(paths: List[str], collection: str, workers: int, batch_size: Optional[int] = None) -> Dict:
+    """Ragify the corpus with RagifyPipe.ingest_many, per-stage times are read from the process metrics."""
+    from services.ragify import RagifyPipe
+
+    pipe = RagifyPipe()
+    before = {
+        "pages": total(PAGES),
+        "chunks": total(CHUNKS),
+        "tokens": total(EMBEDDED_TOKENS),
+        "parse": total(PARSE_SECONDS, "_sum"),
+        "embed": total(EMBED_SECONDS, "_sum"),
+        "write": total(WRITE_SECONDS, "_sum"),
+    }
+    start = time.perf_counter()
+    report = pipe.ingest_many(paths, collection, workers=workers, batch_size=batch_size)
+    elapsed = time.perf_counter() - start
+
+    pages = total(PAGES) - before["pages"]
+    chunks = total(CHUNKS) - before["chunks"]
+    tokens = total(EMBEDDED_TOKENS) - before["tokens"]
+    return {
+        "seconds": round(elapsed, 3),
+        "files": report["files"],
+        "failed": len(report["failed"]),
+        "pages": int(pages),
+        "chunks": int(chunks),
+        "embedded_tokens": int(tokens),
+        "deduplicated_chunks": report["deduplicated"],
+        "embeds_avoided_pct": report["embeds_avoided_pct"],
+        "files_per_second": _rate(report["files"], elapsed),
+        "pages_per_second": _rate(pages, elapsed),
+        "chunks_per_second": _rate(chunks, elapsed),
+        "tokens_per_second": _rate(tokens, elapsed),
+        # Parse time is only recorded for Docling conversions (parse cache misses, not the fast readers)
+        "stage_seconds": {
+            "parse": round(total(PARSE_SECONDS, "_sum") - before["parse"], 3),
+            "embed": round(total(EMBED_SECONDS, "_sum") - before["embed"], 3),
+            "write": round(total(WRITE_SECONDS, "_sum") - before["write"], 3),
+        },
+        "errors": dict(list(report["failed"].items())[:5]),
+    }
+
+
+def _hit(docs, source: str) -> bool:
+    return any(os.path.basename(str(doc.metadata.get("source", ""))) == source for doc in docs)
+
+
+def bench_queries(queries: List[Dict], collection: str, k: int = 5, modes=("dense", "lexical", "hybrid")) -> Dict:
+    """
+    Query latency per retrieval mode over distinct queries (query cache misses), then the same
+    queries again (cache hits), plus the cross-collection search. The hit rate is the share of
+    queries whose planted fact's document is among the k results.
+    """
+    from core.DBHandler import VectorDBManager
+
+    db = VectorDBManager()
+    results = {}
+    for mode in modes:
+        cold, warm, hits = [], [], 0
+        for query in queries:
+            start = time.perf_counter()
+            docs = db.query(collection, query["query"], k=k, mode=mode)
+            cold.append(time.perf_counter() - start)
+            hits += _hit(docs, query["source"])
+        for query in queries:
+            start = time.perf_counter()
+            db.query(collection, query["query"], k=k, mode=mode)
+            warm.append(time.perf_counter() - start)
+        results[mode] = {
+            **percentiles(cold),
+            "hit_rate": round(hits / len(queries), 3) if queries else None,
+            "cached": percentiles(warm),
+        }
+
+    latencies, hits = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        docs = db.search_collections("*", query["query"], k=k)
+        latencies.append(time.perf_counter() - start)
+        hits += _hit(docs, query["source"])
+    results["search_collections"] = {**percentiles(latencies), "hit_rate": round(hits / len(queries), 3) if queries else None}
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Server:
+    """The FastAPI app served by uvicorn in a background thread of this process."""
+
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, name="bench-server", daemon=True)
+
+    def __enter__(self) -> str:
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("The benchmark server did not start")
+            time.sleep(0.05)
+        return f"http://127.0.0.1:{self.port}"
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=30)
+
+
+async def _client(base_url: str, n_requests: int, message: str, timeout: float, records: List[Dict]):
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout) as client:
+        session_id = None
+        for _ in range(n_requests):
+            data = {"message": message}
+            if session_id:
+                data["session_id"] = session_id
+            start = time.perf_counter()
+            record = {"status": None, "ttfb": None, "total": None, "lines": 0, "final": False}
+            try:
+                async with client.stream("POST", "/chat", data=data) as response:
+                    record["status"] = response.status_code
+                    session_id = response.headers.get("X-Session-ID", session_id)
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        if record["ttfb"] is None:
+                            record["ttfb"] = time.perf_counter() - start
+                        record["lines"] += 1
+                        record["final"] = record["final"] or '"type": "final"' in line
+            except httpx.HTTPError as e:
+                record["status"] = type(e).__name__
+            record["total"] = time.perf_counter() - start
+            records.append(record)
+
+
+def bench_chat(clients: int, requests_per_client: int, message: str, timeout: float = 300.0) -> Dict:
+    """
+    Serve api.app in-process and run clients concurrent sessions, each sending requests_per_client
+    messages to /chat one after the other. TTFB is the time to the first NDJSON line.
+    """
+    from api import app
+
+    records: List[Dict] = []
+
+    async def run_clients(base_url: str):
+        await asyncio.gather(*(_client(base_url, requests_per_client, message, timeout, records) for _ in range(clients)))
+
+    # One log line per client request otherwise
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    # The agents print their steps to stdout, keep it for the JSON report
+    with _Server(app) as base_url, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        asyncio.run(run_clients(base_url))
+        elapsed = time.perf_counter() - start
+
+    ok = [record for record in records if record["status"] == 200 and record["final"]]
+    statuses: Dict[str, int] = {}
+    for record in records:
+        statuses[str(record["status"])] = statuses.get(str(record["status"]), 0) + 1
+    return {
+        "clients": clients,
+        "requests": len(records),
+        "completed": len(ok),
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "turns_per_second": _rate(len(ok), elapsed),
+        "ttfb": percentiles([record["ttfb"] for record in ok]),
+        "total": percentiles([record["total"] for record in ok]),
+    }
@@ -0,0 +1,143 @@
+"""Deterministic stand-ins for the models: hashing embedder, word-level tokenizer and scripted LLM."""
+
+import re
+import time
+import zlib
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from smolagents import ChatMessage, Model
+from smolagents.models import MessageRole
+from smolagents.monitoring import TokenUsage
+
+from core.registry import registry
+
+_WORD_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Bag-of-words feature hashing: every word adds +-1 to a bucket, vectors are L2-normalized.
+    Texts sharing words get close vectors, so retrieval behaves sensibly, at a fraction of
+    a millisecond per text. An optional delay per text simulates the cost of a real model.
+    """
+
+    def __init__(self, dimension: int = 1024, delay_per_text: float = 0.0):
+        self.dimension = dimension
+        self.delay_per_text = delay_per_text
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in _WORD_RE.findall(text.lower()):
+            h = zlib.crc32(word.encode("utf-8"))
+            vector[h % self.dimension] += 1.0 if h & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+        else:
+            vector[0] = 1.0
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self.delay_per_text:
+            time.sleep(self.delay_per_text * len(texts))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def word_tokenizer(model_max_length: int = 8192):
+    """
+    A real HuggingFace fast tokenizer (so Docling's HybridChunker accepts it) built offline:
+    one token per word or punctuation mark, [CLS] / [SEP] around each text.
+    """
+    from tokenizers import Tokenizer, models, pre_tokenizers, processors
+    from transformers import PreTrainedTokenizerFast
+
+    vocab = {"[UNK]": 0, "[CLS]": 1, "[SEP]": 2, "[PAD]": 3}
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="[CLS] $A [SEP]", pair="[CLS] $A [SEP] $B [SEP]", special_tokens=[("[CLS]", 1), ("[SEP]", 2)]
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer,
+        unk_token="[UNK]",
+        cls_token="[CLS]",
+        sep_token="[SEP]",
+        pad_token="[PAD]",
+        model_max_length=model_max_length,
+    )
+
+
+class ScriptedModel(Model):
+    """
+    smolagents model replaying a fixed sequence of code actions, the last one calling final_answer.
+
+    The step is the number of assistant messages already in the conversation, so one instance
+    can be shared by concurrent agents.
+    """
+
+    def __init__(self, script: Sequence[str], latency: float = 0.0, model_id: str = "scripted"):
+        """
+        Args:
+            script: Python code of each step
+            latency: Seconds slept per call, to simulate the LLM
+        """
+        super().__init__(model_id=model_id)
+        self.script = list(script)
+        self.latency = latency
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs) -> ChatMessage:
+        step = sum(1 for message in messages if _role(message) == MessageRole.ASSISTANT)
+        code = self.script[min(step, len(self.script) - 1)]
+        if self.latency:
+            time.sleep(self.latency)
+        content = f"Thought: step {step + 1} of the scripted plan.\n<code>\n{code}\n</code>"
+        prompt_words = sum(len(str(_content(message)).split()) for message in messages)
+        return ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content=content,
+            token_usage=TokenUsage(input_tokens=prompt_words, output_tokens=len(content.split())),
+        )
+
+
+def _role(message):
+    return message["role"] if isinstance(message, dict) else message.role
+
+
+def _content(message):
+    return message["content"] if isinstance(message, dict) else message.content
+
+
+# The chat turn replayed by the load test: one hybrid retrieval, then the answer
+CHAT_SCRIPT = (
+    'hits = query_collection(collection_name="{collection}", query_text="supplier delivery warranty", k=5)\nprint(hits)',
+    'final_answer("Synthetic answer built from the retrieved chunks.")',
+)
+
+
+def install(
+    embedding_model: str = "BAAI/bge-m3",
+    llm_model: str = "gpt-5-mini",
+    collection: str = "bench",
+    dimension: int = 1024,
+    embed_delay: float = 0.0,
+    llm_latency: float = 0.0,
+    script: Optional[Sequence[str]] = None,
+):
+    """
+    Register the stand-ins in the process registry, before anything asks for the real models.
+
+    The raw embedding model is replaced, so the length-bucketed batching and the embedding
+    cache on top of it are still exercised.
+    """
+    registry.provide("tokenizer", f"tokenizer:{embedding_model}", word_tokenizer())
+    for backend in ("hf", "onnx", "onnx-int8"):
+        registry.provide(
+            "embeddings", f"embeddings:{embedding_model}:cpu:{backend}", HashingEmbeddings(dimension, embed_delay)
+        )
+    steps = [code.replace("{collection}", collection) for code in (script or CHAT_SCRIPT)]
+    registry.provide("llm", f"llm:{llm_model}", ScriptedModel(steps, latency=llm_latency))
@@ -1,22 +1,27 @@
-from smolagents import CodeAgent, PythonInterpreterTool, FinalAnswerTool, OpenAIServerModel, ToolCall, FinalAnswerStep
-import os, json
+from smolagents import CodeAgent, PythonInterpreterTool, FinalAnswerTool, ToolCall, FinalAnswerStep, ActionStep
+import json, logging
 
-from agent.tools import ragify_document,parse_document,list_collections,query_collection
+from agent.tools import ragify_document,ragify_documents,ingestion_status,parse_document,list_collections,query_collection,search_collections
 from agent.prompt import PROMPT
+from core.registry import registry
+from core.cancellation import current_token
+from core.metrics import AGENT_STEPS
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class AutoRAGENT:
+    """
+    One conversation turn runner. The CodeAgent keeps memory between runs, so build one
+    instance per request; the LLM client and the tools are shared process-wide.
+    """
     def __init__(self, model="gpt-5-mini", max_steps=12):
-        self.model = OpenAIServerModel(
-            model_id=model,
-            api_base="https://api.openai.com/v1",
-            api_key=os.environ["OPENAI_API_KEY"]
-        )
+        self.model = registry.get_llm(model)
 
-        self.tools = [ragify_document,parse_document,list_collections,query_collection, PythonInterpreterTool(), FinalAnswerTool()]
+        self.tools = [ragify_document,ragify_documents,ingestion_status,parse_document,list_collections,query_collection,search_collections, PythonInterpreterTool(), FinalAnswerTool()]
 
         self.agent = CodeAgent(tools=self.tools, model=self.model,
                                additional_authorized_imports=['pandas', "os", 'matplotlib.*', "numpy.*", "seaborn.*",
@@ -34,17 +39,33 @@ class AutoRAGENT:
 
         if stream:
             return self._stream_generator(prompt)
-        return self.agent.run(prompt, stream=False)
+        try:
+            return self.agent.run(prompt, stream=False)
+        finally:
+            self._record_steps()
+
+    def _record_steps(self):
+        AGENT_STEPS.observe(sum(isinstance(step, ActionStep) for step in self.agent.memory.steps))
 
     def _stream_generator(self, prompt):
-        for step in self.agent.run(prompt, stream=True):
-            content, type_ = self.parse_step(step)
-            if content:
-                yield json.dumps({"type": type_, "content": content}) + "\n"
+        token = current_token()
+        steps = self.agent.run(prompt, stream=True)
+        try:
+            for step in steps:
+                # Stop the agent loop (no more LLM calls) once the client is gone
+                if token is not None and token.cancelled:
+                    self.agent.interrupt()
+                    logger.warning(f"Agent run cancelled: {token.reason}")
+                    return
+                content, type_ = self.parse_step(step)
+                if content:
+                    yield json.dumps({"type": type_, "content": content}) + "\n"
+        finally:
+            steps.close()
+            self._record_steps()
 
     def parse_step(self, step):
         if type(step) == ToolCall and step.name == "python_interpreter":
-            print("happend")
             return f"\n```python\n{step.arguments}\n```\n\n", "code"
         elif type(step) == FinalAnswerStep:
             return f"{step.output}\n", "final"
@@ -1,37 +1,129 @@
 from smolagents import tool
+import json
+import os
 
-from services.ragify import RagifyPipe
-from core.parser import Parser
+from core.parser import Parser, parse_page_range
 from core.DBHandler import VectorDBManager
+from core.registry import registry
+from core.cancellation import OperationCancelled, current_token
+from core.context_packer import pack_results, render
+from core.dedup import describe_duplicates
+from services.chat_runner import current_event_sink, emit_event
 from dotenv import load_dotenv
 load_dotenv()
 
+SEPARATOR = "\n----------------------------\n\n-------------------------\n"
+
+def _source(doc) -> str:
+    """Source & page of a retrieved chunk, plus the sources of the duplicates recorded on it."""
+    header = f"Source: {doc.metadata.get('source', 'Unknown')} (Page {str(doc.metadata.get('page_numbers', 'Unknown'))})"
+    duplicates = describe_duplicates(doc.metadata)
+    return f"{header} | Also in: {duplicates}" if duplicates else header
+
+def _packed(results : list, query_text : str, token_budget : int, header) -> str:
+    """Packs retrieved documents into the token budget (CONTEXT_TOKEN_BUDGET or 4000 when not given)."""
+    budget = token_budget or int(os.getenv("CONTEXT_TOKEN_BUDGET", 4000))
+    return render(pack_results(results, query_text, budget), header, SEPARATOR)
+
+def _run_ingestion(file_paths : list[str], collection_name : str, wait : bool, profile : str = "") -> None:
+    """Submits an ingestion job, streams its progress into the chat and optionally waits for it."""
+    jobs = registry.get_job_manager()
+    sink = current_event_sink()
+    listener = (lambda status: emit_event("progress", status, sink)) if sink else None
+    job_id = jobs.submit(file_paths, collection_name, listener, profile or None)
+    if not wait:
+        print(f"Ingestion job {job_id} queued for {len(file_paths)} document(s) into collection {collection_name}, check it with ingestion_status.")
+        return
+
+    token = current_token()
+    job = jobs.wait(job_id, should_stop=lambda: token is not None and token.cancelled)
+    if token is not None and token.cancelled:
+        jobs.cancel(job_id)
+        raise OperationCancelled(token.reason)
+    if job["status"] != "done":
+        raise RuntimeError(f"Ingestion job {job_id} {job['status']}: {job.get('error')}")
+
+    result = job["result"]
+    print(f"{result['files']} document(s) ({result['chunks']} chunks) have been ragified into collection {collection_name} "
+          f"({result['added']} chunks added, {result['unchanged']} unchanged, {result['removed']} removed, "
+          f"{result.get('deduplicated', 0)} duplicates of stored chunks skipped).")
+    for path, error in result.get("failed", {}).items():
+        print(f"Failed to ragify {path}: {error}")
+
 @tool
-def ragify_document(file_path : str, collection_name: str) -> None:
+def ragify_document(file_path : str, collection_name: str, wait : bool = True, profile : str = "") -> None:
     """
     This is a Tool that is in charge of ragifying a document located at file_path into a vector database collection.
+    The work runs as a background ingestion job, the user sees its progress.
     Args:
         file_path: Path to the document to ragify.
         collection_name: Name of the collection in the vector database to store the document chunks alongside their embeddings & metadata.
+        wait: True (default) to wait for the document to be fully ragified, False to return immediately (for large files) and check later with ingestion_status.
+        profile: PDF parsing profile, empty for the default ("auto": skips OCR when the PDF has a text layer). "fast" (text layer only, no OCR nor table structure), "balanced" or "accurate" (best for scanned documents & complex tables, slowest).
     Returns :
         None
     """
-    ragify = RagifyPipe()
-    ragify(file_path,collection_name)
-    print(f"Document at {file_path} has been ragified into collection {collection_name}.")
+    _run_ingestion([file_path],collection_name,wait,profile)
 
 @tool
-def parse_document(file_path : str) -> str:
+def ragify_documents(file_paths : list[str], collection_name: str, wait : bool = True, profile : str = "") -> None:
     """
-    This is a Tool that is in charge of parsing a document (PDF,PPTX,DOCX) located at file_path into markdown text with pages numbered.
+    This is a Tool that is in charge of ragifying several documents at once into a vector database collection.
+    Prefer it over calling ragify_document repeatedly when multiple files go into the same collection, documents are processed in parallel.
+    Args:
+        file_paths: List of paths to the documents to ragify.
+        collection_name: Name of the collection in the vector database to store the documents chunks alongside their embeddings & metadata.
+        wait: True (default) to wait for all documents to be ragified, False to return immediately and check later with ingestion_status.
+        profile: PDF parsing profile, empty for the default ("auto": skips OCR when the PDF has a text layer). "fast" (text layer only, no OCR nor table structure), "balanced" or "accurate" (best for scanned documents & complex tables, slowest).
+    Returns :
+        None
+    """
+    _run_ingestion(file_paths,collection_name,wait,profile)
+
+@tool
+def ingestion_status(job_id : str) -> str:
+    """
+    This is a Tool that is in charge of checking the status of a background ingestion job started with wait=False.
+    Args:
+        job_id: ID of the ingestion job.
+    Returns :
+        JSON string with the job status (queued, running, done, failed, cancelled, interrupted), progress and result.
+    """
+    job = registry.get_job_manager().status(job_id)
+    if job is None:
+        return f"No ingestion job with ID {job_id}."
+    return json.dumps(job)
+
+@tool
+def parse_document(file_path : str, pages : str = "", outline : bool = False, profile : str = "") -> str:
+    """
+    This is a Tool that is in charge of parsing a document (PDF,PPTX,DOCX,TXT,CSV,XLSX) located at file_path into markdown text with pages numbered.
+    Large documents are read in slices of pages: start with outline=True to see the table of contents & page count, then read the pages you need.
     Args:
         file_path: Path to the document to parse.
+        pages: Pages to read, 1-based & inclusive, e.g. "1-10", "7" or "20-" (to the end). Empty (default) reads the whole document, or only its first pages if it is long.
+        outline: True to only return the outline (headings/bookmarks with their page numbers) & the page count, which is much faster than parsing.
+        profile: PDF parsing profile, empty for the default ("auto": skips OCR when the PDF has a text layer). "fast" (text layer only, no OCR nor table structure), "balanced" or "accurate" (best for scanned documents & complex tables, slowest).
     Returns :
-        String content of the parsed document in markdown format with page numbers.
+        String content of the parsed document (or of the requested pages) in markdown format with page numbers.
     """
     parser = Parser()
-    doc = parser.parse(file_path)
-    markdown_with_pages = parser.export_to_markdown_with_page_numbers(doc)
+    if outline:
+        return parser.outline(file_path)
+
+    page_count = parser.page_count(file_path)
+    max_pages = int(os.getenv("PARSE_MAX_PAGES", 20))
+    if pages:
+        page_range = parse_page_range(pages, page_count)
+    elif page_count and page_count > max_pages:
+        page_range = (1, max_pages)
+    else:
+        page_range = None
+
+    doc = parser.parse(file_path, page_range=page_range, profile=profile or None)
+    markdown_with_pages = parser.export_to_markdown_with_page_numbers(doc, first_page_idx=page_range[0] if page_range else 1)
+    if page_range and page_count and page_range[1] < page_count:
+        markdown_with_pages += f"\n[Pages {page_range[0]}-{page_range[1]} of {page_count}. Read the next ones with pages=\"{page_range[1]+1}-{min(page_range[1]+max_pages, page_count)}\", or use outline=True to find the relevant pages.]"
     return markdown_with_pages
 
 
@@ -47,20 +139,39 @@ def list_collections() -> list[str]:
     return collections
 
 @tool
-def query_collection(collection_name : str, query_text : str, k : int =5) -> str:
+def query_collection(collection_name : str, query_text : str, k : int =5, mode : str = "hybrid", token_budget : int = 0) -> str:
     """
     This is a Tool that is in charge of querying a specific collection in the vector database with a text query.
     Args:
         collection_name: Name of the collection to query.
         query_text: The text query to search for.
         k: Number of top similar documents to retrieve.
+        mode: "hybrid" (default, semantic + exact keyword matching), "dense" (semantic only) or "lexical" (keywords only, best for exact identifiers such as invoice numbers, part codes or clause numbers).
+        token_budget: Approximate maximum tokens of the returned content, 0 for the default (4000). Results are trimmed to their passages most relevant to the query to fit it.
+    Returns :
+        String content of the retrieved documents concatenated, each with its source & page, followed by a note of what was trimmed.
+    """
+    db_manager = VectorDBManager()
+    results = db_manager.query(collection_name,query_text,k,mode=mode)
+    return _packed(results,query_text,token_budget,_source)
+
+@tool
+def search_collections(query_text : str, collection_names : str = "*", k : int = 5, token_budget : int = 0) -> str:
+    """
+    This is a Tool that is in charge of querying several collections of the vector database at once with a text query.
+    Use it when you are unsure which collection holds the answer, instead of querying collections one by one.
+    Args:
+        query_text: The text query to search for.
+        collection_names: "*" to search every collection, or a comma-separated list of collection names (e.g. "hotels,contracts").
+        k: Number of top similar documents to retrieve overall.
+        token_budget: Approximate maximum tokens of the returned content, 0 for the default (4000). Results are trimmed to their passages most relevant to the query to fit it.
     Returns :
-        String content of the retrieved documents concatenated.
+        String content of the retrieved documents concatenated, each with its collection, source & page, followed by a note of what was trimmed.
     """
+    names = "*" if collection_names.strip() == "*" else [name.strip() for name in collection_names.split(",") if name.strip()]
     db_manager = VectorDBManager()
-    results = db_manager.query(collection_name,query_text,k)
-    combined_content = "\n----------------------------\n\n-------------------------\n".join([f"Source: {doc.metadata.get('source', 'Unknown')} (Page {str(doc.metadata.get('page_numbers', 'Unknown'))})\nContent:\n{doc.page_content}" for doc in results])
-    return combined_content
+    results = db_manager.search_collections(names,query_text,k)
+    return _packed(results,query_text,token_budget,lambda doc: f"Collection: {doc.metadata.get('collection', 'Unknown')} | {_source(doc)}")
 
 #@tool
 #def provide_images_filepaths(filepaths : list[str],session_id : str) -> None:
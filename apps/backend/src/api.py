@@ -1,97 +1,300 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Header, Query
+from fastapi.responses import StreamingResponse, Response
+from contextlib import asynccontextmanager
 from typing import Optional, List
 import uvicorn
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
 from agent.agent import AutoRAGENT
 from core.DBHandler import VectorDBManager
-import os,shutil,json
+from core.log_config import configure_logging
+from core.parser import PARSE_PROFILES
+from core.registry import registry
+from services.chat_runner import ChatRunner
+from services.sessions import assistant_turn
+import os,json,asyncio,uuid
+import anyio
+import logging
 from dotenv import load_dotenv
 load_dotenv()
+configure_logging()
+logger = logging.getLogger(__name__)
 
-app = FastAPI()
-agent = AutoRAGENT()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Optionally load the embedding model, tokenizer & Docling converter before serving the first request
+    if os.getenv("WARMUP_MODELS", "false").lower() in ("1", "true", "yes"):
+        await asyncio.to_thread(registry.warm_up)
+    yield
+
+app = FastAPI(lifespan=lifespan)
+# Each chat request gets its own agent, run in a bounded worker pool (MAX_CONCURRENT_RUNS)
+chat_runner = ChatRunner()
 try:
     db_manager = VectorDBManager()
 except Exception as e:
-    print(f"Warning: Could not connect to VectorDBManager. Collections endpoint may fail. Error: {e}")
+    logger.warning(f"Could not connect to VectorDBManager. Collections endpoint may fail. Error: {e}")
+
+class RuntimeMetrics:
+    """Counters kept by the model registry, the caches & the chat runner, read when /metrics is scraped."""
+
+    def describe(self):
+        # Registration would otherwise call collect(), building the caches at import
+        return []
+
+    def collect(self):
+        registry_stats = registry.stats()
+        loads = CounterMetricFamily("autoragent_model_loads", "Shared models & clients built", labels=["kind"])
+        reuses = CounterMetricFamily("autoragent_model_reuses", "Shared models & clients served from the registry", labels=["kind"])
+        for kind, counts in registry_stats.items():
+            loads.add_metric([kind], counts["loads"])
+            reuses.add_metric([kind], counts["hits"])
+        yield from (loads, reuses)
+        caches = {"parse": [registry.get_parse_cache().stats()], "query": [registry.get_query_cache().stats()]}
+        caches["embedding"] = [cache.stats() for cache in registry.loaded("cached_embeddings")]
+        for outcome in ("hits", "misses"):
+            family = CounterMetricFamily(f"autoragent_cache_{outcome}", f"Cache {outcome}", labels=["cache"])
+            for name, stats_list in caches.items():
+                family.add_metric([name], sum(stats[outcome] for stats in stats_list))
+            yield family
+        runs = chat_runner.stats()
+        family = GaugeMetricFamily("autoragent_chat_runs", "Agent runs executing or waiting for a slot", labels=["state"])
+        for state in ("active", "queued"):
+            family.add_metric([state], runs[state])
+        yield family
+
+REGISTRY.register(RuntimeMetrics())
 
 @app.get("/")
 async def root():
     # return status okay
     return {"status": "API is running."}
 
+@app.get("/stats")
+async def get_stats():
+    """
+    Returns runtime statistics: shared model loads vs. reuses, parse, embedding & query cache hits/misses, chat runs.
+    """
+    return {
+        "registry": registry.stats(),
+        "parse_cache": registry.get_parse_cache().stats(),
+        "embedding_cache": [cache.stats() for cache in registry.loaded("cached_embeddings")],
+        "query_cache": registry.get_query_cache().stats(),
+        "chat_runs": chat_runner.stats(),
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics: parse / chunk / embed / write and query latency histograms, pages / chunks / tokens
+    counters (rate() gives the throughput), /chat queue, time-to-first-byte and duration, agent steps per turn,
+    model loads and cache hits.
+    """
+    return Response(content=await asyncio.to_thread(generate_latest), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/collections")
-async def get_collections():
+async def get_collections(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    sources: bool = True,
+    refresh: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    ):
     """
-    Returns a list of all available collections and their first 5 documents.
+    Returns a page of the collections catalog: chunk count, source files and first 5 chunks of each collection.
+    Served from the cached catalog, with an ETag: send it back in If-None-Match to get a 304 when nothing changed.
+    refresh=true rescans the collections from the database (e.g. after writes made by another process).
     Structure:
-    [
-        {
-            "name": "collection_name",
-            "preview": ["doc1_content", "doc2_content", ...]
-        },
-        ...
-    ]
+    {
+        "collections": [
+            {
+                "name": "collection_name",
+                "count": 42,
+                "sources": ["file.pdf", ...],
+                "preview": ["doc1_content", "doc2_content", ...],
+                "generation": 7,
+                "updated_at": 1700000000.0
+            },
+            ...
+        ],
+        "total": 120, "offset": 0, "limit": 50
+    }
     """
+    catalog = registry.get_catalog()
     try:
-        collections = db_manager.list_collections()
-        result = []
-        
-        for col_name in collections:
-            collection = db_manager.client.get_collection(col_name)
-            peek_data = collection.peek(limit=5)            
-            documents = peek_data.get("documents", [])
-            
-            result.append({
-                "name": col_name,
-                "preview": documents
-            })
-            
-        return {"collections": result}
+        if refresh:
+            await asyncio.to_thread(catalog.refresh)
+        version, total, collections = await asyncio.to_thread(catalog.page, offset, limit, sources)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching collections: {str(e)}")
 
+    etag = f'W/"{version}-{offset}-{limit}-{int(sources)}"'
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return {"collections": collections, "total": total, "offset": offset, "limit": limit}
+
+async def save_upload(file: UploadFile, file_path: str, chunk_size: int = 1024 * 1024):
+    """Streams an uploaded file to disk without blocking the event loop."""
+    async with await anyio.open_file(file_path, "wb") as buffer:
+        while chunk := await file.read(chunk_size):
+            await buffer.write(chunk)
+
+async def save_uploads(files: List[UploadFile], session_id: Optional[str]) -> List[str]:
+    """Saves uploaded files in the session's upload folder and returns their paths."""
+    sid = session_id if session_id else "temp"
+    upload_dir = os.path.abspath(os.path.join(os.environ["SESSIONS_FOLDER"], sid))
+    await anyio.Path(upload_dir).mkdir(parents=True, exist_ok=True)
+
+    saved_file_paths = []
+    for file in files:
+        file_path = os.path.join(upload_dir, os.path.basename(file.filename))
+        await save_upload(file, file_path)
+        saved_file_paths.append(file_path)
+    return saved_file_paths
+
+def ingest_roots() -> List[str]:
+    """Folders server-side paths may be ingested from: SESSIONS_FOLDER (uploads) and INGEST_ROOTS (os.pathsep separated)."""
+    roots = [os.getenv("SESSIONS_FOLDER", "")] + os.getenv("INGEST_ROOTS", "").split(os.pathsep)
+    return [os.path.realpath(root) for root in roots if root]
+
+def resolve_ingest_paths(file_paths) -> List[str]:
+    """Resolved paths of a client's file_paths, raising a 400 unless it's a list of strings inside the ingest roots."""
+    if not isinstance(file_paths, list) or not all(isinstance(path, str) and path for path in file_paths):
+        raise HTTPException(status_code=400, detail="Invalid file_paths format. Must be a JSON list of strings.")
+    roots = ingest_roots()
+    resolved = []
+    for path in file_paths:
+        # realpath follows symlinks, so a link in an upload folder can't point outside of it
+        real = os.path.realpath(path)
+        if not any(os.path.commonpath([real, root]) == root for root in roots):
+            raise HTTPException(status_code=400, detail=f"Path {path} is outside of the folders allowed for ingestion.")
+        resolved.append(real)
+    return resolved
+
+def run_session_turn(session_id: str, history: list):
+    """Runs one agent turn over the session window and records the answer in the session store."""
+    code_blocks, final_answer, completed = [], "", False
+    try:
+        for line in AutoRAGENT()(history=history, session_id=session_id, stream=True):
+            event = json.loads(line)
+            if event["type"] == "code":
+                code_blocks.append(event["content"])
+            elif event["type"] == "final":
+                final_answer = event["content"]
+            yield line
+        completed = True
+    finally:
+        # A failed or cancelled run still answers the user turn, the session never gets two user turns in a row
+        turn = assistant_turn(code_blocks, final_answer)
+        if not completed:
+            turn["content"] = f"{turn['content']}\n[Answer interrupted before completion]".strip()
+        registry.get_session_store().append(session_id, turn)
+
 @app.post("/chat")
 async def chat_endpoint(
+    request: Request,
+    message: Optional[str] = Form(None),
     history: Optional[str] = Form(None), # Received as JSON string
     session_id: Optional[str] = Form(None),
     files: List[UploadFile] = File(None)
     ):
     """
-    Chat endpoint that accepts conversation history, optional session ID, and file uploads.
-    - history: JSON string representing the conversation history.
-    - session_id: Optional session identifier.
+    Chat endpoint that accepts the new user message (or a full conversation history), optional session ID, and file uploads.
+    - message: The new user message. The conversation is kept on the server under session_id,
+      the agent sees a token-budgeted window of it (recent turns + compacted older ones).
+    - history: (Legacy) JSON string representing the whole conversation history, used when no message is sent.
+    - session_id: Optional session identifier, generated and returned in the X-Session-ID header when missing.
     - files: Optional list of uploaded files.
     """
-    if history:
+    if message is None and history:
             try:
                 history = json.loads(history)
             except Exception as e:
-                raise HTTPException(status_code=400, detail="Invalid history format. Must be a valid JSON string.")
-    if files:
-        sid = session_id if session_id else "temp"
-        upload_dir = os.path.abspath(os.path.join(os.environ["SESSIONS_FOLDER"], sid))
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        
-        saved_file_paths = []
-        for file in files:
-            file_path = os.path.join(upload_dir, file.filename)
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            saved_file_paths.append(file_path)
-        history[-1]["files_paths"] = saved_file_paths
-        
+                raise HTTPException(status_code=400, detail="Invalid history format. Must be a valid JSON string.") from e
+
+    session_id = session_id or str(uuid.uuid4())
+    saved_file_paths = await save_uploads(files, session_id) if files else []
+
+    # The user turn is only recorded once the run has a slot: a rejected request leaves the session untouched
+    if not await chat_runner.acquire():
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent chats, please retry shortly.",
+            headers={"Retry-After": str(int(chat_runner.queue_timeout))},
+        )
+
+    try:
+        if message is not None:
+            sessions = registry.get_session_store()
+            await asyncio.to_thread(sessions.append, session_id, {"role": "user", "content": message, "files_paths": saved_file_paths})
+            history = await asyncio.to_thread(sessions.window, session_id)
+            make_generator = lambda: run_session_turn(session_id, history)
+        else:
+            if saved_file_paths:
+                history[-1]["files_paths"] = saved_file_paths
+            make_generator = lambda: AutoRAGENT()(history=history, session_id=session_id, stream=True)
+    except BaseException:
+        chat_runner.release()
+        raise
+
+    # The agent (and its memory) is private to this request, the LLM client & tools are shared
     return StreamingResponse(
-        agent(
-            history=history,
-            session_id=session_id,
-            stream=True
-        ),
-        media_type="application/x-ndjson"
+        chat_runner.start(make_generator, is_disconnected=request.is_disconnected),
+        media_type="application/x-ndjson",
+        headers={"X-Session-ID": session_id},
     )
 
 
+@app.post("/ingest")
+async def submit_ingestion(
+    collection_name: str = Form(...),
+    file_paths: Optional[str] = Form(None), # JSON list of paths already on the server
+    session_id: Optional[str] = Form(None),
+    profile: Optional[str] = Form(None), # Docling parsing profile: auto, fast, balanced or accurate
+    files: List[UploadFile] = File(None)
+    ):
+    """
+    Queues a background ingestion job ragifying server-side file paths and/or uploaded files into a collection.
+    Server-side paths must be inside SESSIONS_FOLDER or one of the INGEST_ROOTS folders.
+    Returns the job ID, to poll with GET /ingest/{job_id}.
+    """
+    paths = []
+    if file_paths:
+        try:
+            paths = json.loads(file_paths)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail="Invalid file_paths format. Must be a JSON list of strings.") from e
+        paths = resolve_ingest_paths(paths)
+    if files:
+        paths += await save_uploads(files, session_id)
+    if not paths:
+        raise HTTPException(status_code=400, detail="No files to ingest.")
+
+    if profile is not None and profile not in PARSE_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown profile '{profile}', expected one of {list(PARSE_PROFILES)}.")
+
+    job_id = await asyncio.to_thread(registry.get_job_manager().submit, paths, collection_name, None, profile)
+    return {"job_id": job_id, "status": "queued"}
+
+@app.get("/ingest/{job_id}")
+def get_ingestion(job_id: str):
+    """Returns the status, progress and result of an ingestion job."""
+    job = registry.get_job_manager().status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job {job_id}")
+    return job
+
+@app.delete("/ingest/{job_id}")
+def cancel_ingestion(job_id: str):
+    """Cancels a queued or running ingestion job."""
+    jobs = registry.get_job_manager()
+    if jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingestion job {job_id}")
+    return {"job_id": job_id, "cancelled": jobs.cancel(job_id)}
 
 
 if __name__ == "__main__":
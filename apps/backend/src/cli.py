@@ -0,0 +1,60 @@
+"""
+Command line tools for the vector database.
+
+    uv run src/cli.py list
+    uv run src/cli.py export <collection> <snapshot_dir> [--float16]
+    uv run src/cli.py import <snapshot_dir> [--collection NAME] [--batch-size N] [--workers N]
+"""
+
+import argparse
+import json
+
+from dotenv import load_dotenv
+
+from core.DBHandler import VectorDBManager
+from core.log_config import configure_logging
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List the collections")
+
+    export = commands.add_parser("export", help="Write a collection snapshot (chunks, metadata & embeddings)")
+    export.add_argument("collection", help="Name of the collection to export")
+    export.add_argument("path", help="Folder to write the snapshot into")
+    export.add_argument("--float16", action="store_true", help="Store embeddings as float16 (half the size)")
+
+    restore = commands.add_parser("import", help="Restore a collection snapshot without re-embedding")
+    restore.add_argument("path", help="Snapshot folder")
+    restore.add_argument("--collection", default=None, help="Target collection (defaults to the exported name)")
+    restore.add_argument("--batch-size", type=int, default=None, help="Chunks per upsert request")
+    restore.add_argument("--workers", type=int, default=None, help="Concurrent upsert requests")
+    restore.add_argument("--allow-model-mismatch", action="store_true", help="Import embeddings of another model or precision")
+
+    args = parser.parse_args()
+    configure_logging()
+    db_manager = VectorDBManager()
+
+    if args.command == "list":
+        for name in db_manager.list_collections():
+            print(name)
+    elif args.command == "export":
+        manifest = db_manager.export_collection(args.collection, args.path, dtype="float16" if args.float16 else "float32")
+        print(json.dumps(manifest, indent=2))
+    elif args.command == "import":
+        report = db_manager.import_collection(
+            args.path,
+            collection_name=args.collection,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            allow_model_mismatch=args.allow_model_mismatch,
+        )
+        print(json.dumps(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,102 @@
+import gzip
+import hashlib
+import json
+import logging
 import os
-import chromadb
-from chromadb.config import Settings
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import numpy as np
 from langchain_chroma import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
-from typing import List, Optional, Dict
+from langchain_core.embeddings import Embeddings
+from typing import List, Optional, Dict, Tuple, Union
 from dotenv import load_dotenv
+
+from core.dedup import DUPLICATES_FIELD, MAX_RECORDS, dedup_enabled, duplicate_records, embeds_avoided_pct
+from core.metrics import DEDUPLICATED_CHUNKS, EMBED_SECONDS, QUERY_EMBED_SECONDS, QUERY_SEARCH_SECONDS, WRITE_SECONDS, WRITTEN_CHUNKS
+from core.registry import EMBEDDING_PRECISIONS, registry
 load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Shared pool running dense & lexical retrieval, and multi-collection searches, concurrently
+_RETRIEVAL_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="retrieval")
+
+# Reciprocal rank fusion constant
+RRF_K = 60
+QUERY_MODES = ("dense", "lexical", "hybrid")
+
+# Collection snapshots: manifest + one gzipped JSON value per line for each column + embeddings matrix
+# (version 1 columns were plain JSONL, still importable)
+SNAPSHOT_VERSION = 2
+SNAPSHOT_VERSIONS = (1, 2)
+SNAPSHOT_COLUMNS = ("ids", "documents", "metadatas")
+SNAPSHOT_DTYPES = ("float32", "float16")
+
+
+def reciprocal_rank_fusion(rankings: List[List[Document]], k: int) -> List[Document]:
+    """Merge ranked lists: each document scores sum(1 / (RRF_K + rank)) over the lists it appears in."""
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            doc_id = doc.id or VectorDBManager.chunk_id(doc)
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (RRF_K + rank)
+            docs.setdefault(doc_id, doc)
+    best = sorted(scores, key=scores.get, reverse=True)[:k]
+    return [docs[doc_id] for doc_id in best]
+
+
 class VectorDBManager:
     """
-    Central Manager for the ChromaDB Server.
+    Central Manager for the vector database: the ChromaDB Server, or the in-process
+    memory-mapped store when VECTOR_BACKEND=local (see core.vector_store).
     Allows interacting with multiple collections dynamically.
     """
     
-    def __init__(self, embedding_model: str = "BAAI/bge-m3"):
-        # 1. Initialize Embedding Function (Shared across all collections)
-        self.embedding_function = HuggingFaceEmbeddings(
-            model_name=embedding_model,
-            model_kwargs={"device": "cpu"}, 
-            encode_kwargs={"normalize_embeddings": True}
+    def __init__(
+        self,
+        embedding_model: str = "BAAI/bge-m3",
+        embedding_function: Optional[Embeddings] = None,
+        embedding_backend: Optional[str] = None,
+    ):
+        # 1. Embedding Function (Shared across all collections & all managers of the process, cached on disk)
+        #    embedding_backend: "hf" (PyTorch), "onnx" or "onnx-int8" (onnxruntime), defaults to EMBEDDING_BACKEND
+        #    Loaded on first use, so listing, exporting or importing collections never loads the model
+        self._embedding_function = embedding_function
+        self.embedding_model = embedding_model
+        # Unknown (None) for a custom embedding function unless embedding_backend describes it
+        self.embedding_backend = embedding_backend or (os.getenv("EMBEDDING_BACKEND", "hf") if embedding_function is None else None)
+        # Identifies the embedding space in the query cache key
+        self._embedding_key = (
+            f"{embedding_model}@{embedding_backend or os.getenv('EMBEDDING_BACKEND', 'hf')}"
+            if embedding_function is None else f"custom-{id(embedding_function)}"
         )
 
-        # 2. Connect to ChromaDB Server
-        chroma_host = os.getenv("DATABASE_HOST", "localhost")
-        chroma_port = int(os.getenv("DATABASE_PORT", 1989))
-        print(f"Connecting to ChromaDB at {chroma_host}:{chroma_port}...")
-        self.client = chromadb.HttpClient(
-            host=chroma_host, 
-            port=chroma_port,
-            settings=Settings(allow_reset=True, anonymized_telemetry=False)
-        )
+        # 2. Vector database client, ChromaDB server or in-process store (Shared across the process)
+        self.client = registry.get_vector_client()
         
         # Cache for collection objects to avoid re-initializing
         self._collections: Dict[str, Chroma] = {}
-        
-        print(f"✅ Connected to ChromaDB Manager at {chroma_host}:{chroma_port}")
+
+        # 3. BM25 lexical indexes kept next to each collection (Shared across the process)
+        self.lexical = registry.get_lexical_store()
+
+        # 4. Query results cache, invalidated on writes (Shared across the process)
+        self.query_cache = registry.get_query_cache()
+
+        # 5. Collections catalog (counts, sources, previews), updated on writes (Shared across the process)
+        self.catalog = registry.get_catalog()
+
+        # 6. Exact & near-duplicate chunk indexes, duplicates are not embedded nor stored (Shared across the process)
+        self.dedup = registry.get_dedup_store()
+
+    @property
+    def embedding_function(self) -> Embeddings:
+        """Embedding function of the manager, the shared model is loaded on first access."""
+        if self._embedding_function is None:
+            self._embedding_function = registry.get_embeddings(self.embedding_model, backend=self.embedding_backend)
+        return self._embedding_function
 
     def _get_collection_store(self, collection_name: str) -> Chroma:
         """
@@ -48,29 +110,627 @@ class VectorDBManager:
             )
         return self._collections[collection_name]
 
-    def add_documents(self, collection_name: str, documents: List[Document]):
+    @staticmethod
+    def source_key(metadata: Optional[dict]) -> str:
+        """
+        Identity of the document a chunk comes from: the full path of the ingested file (source_path),
+        or its file name (source) for chunks added without a path. Two files sharing a name are different documents.
+        """
+        metadata = metadata or {}
+        return str(metadata.get("source_path") or metadata.get("source", ""))
+
+    @staticmethod
+    def chunk_id(document: Document) -> str:
+        """
+        Deterministic ID of a chunk: hash of its document (see source_key) followed by a hash of its content & metadata.
+        The same chunk of the same file always maps to the same ID, so re-ingestion is idempotent.
+        """
+        source = VectorDBManager.source_key(document.metadata)
+        source_hash = hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+        content = document.page_content + json.dumps(document.metadata, sort_keys=True, default=str)
+        content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+        return f"{source_hash}-{content_hash}"
+
+    def _unique_with_ids(self, documents: List[Document]) -> Dict[str, Document]:
+        """Map each chunk ID to its document, dropping exact duplicate chunks."""
+        by_id: Dict[str, Document] = {}
+        for doc in documents:
+            by_id.setdefault(self.chunk_id(doc), doc)
+        return by_id
+
+    def _existing_ids(self, store: Chroma, ids: List[str]) -> set:
+        if not ids:
+            return set()
+        return set(store._collection.get(ids=ids, include=[])["ids"])
+
+    def _source_ids(self, store: Chroma, metadata: dict) -> List[str]:
+        """IDs of the stored chunks of the document a chunk with this metadata comes from."""
+        if metadata.get("source_path"):
+            return store._collection.get(where={"source_path": metadata["source_path"]}, include=[])["ids"]
+        # Chunks with a source_path come from another file that only shares the name
+        found = store._collection.get(where={"source": str(metadata.get("source", ""))}, include=["metadatas"])
+        return [doc_id for doc_id, other in zip(found["ids"], found["metadatas"]) if not (other or {}).get("source_path")]
+
+    def _load_all(self, collection_name: str, page_size: int = 5000) -> Tuple[List[str], List[Document]]:
+        """All chunk IDs and documents of a collection, fetched page by page."""
+        # Straight from the client: reading needs no embedding function
+        collection = self.client.get_or_create_collection(collection_name)
+        ids, documents = [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                ids.append(doc_id)
+                documents.append(Document(page_content=text or "", metadata=metadata or {}, id=doc_id))
+            if len(page["ids"]) < page_size:
+                return ids, documents
+            offset += page_size
+
+    def _write(
+        self, collection_name: str, store: Chroma, by_id: Dict[str, Document], ids: List[str], vectors: Optional[np.ndarray] = None
+    ):
+        """Embeds (unless their vectors are given) and writes the given chunk IDs, then indexes them lexically."""
+        if ids:
+            docs = [by_id[i] for i in ids]
+            if vectors is None:
+                with EMBED_SECONDS.time():
+                    vectors = np.asarray(self.embedding_function.embed_documents([doc.page_content for doc in docs]), dtype=np.float32)
+            batch = {"ids": ids, "documents": [doc.page_content for doc in docs], "metadatas": [doc.metadata for doc in docs]}
+            with WRITE_SECONDS.time():
+                self._upsert_batch(store._collection, batch, vectors)
+            WRITTEN_CHUNKS.inc(len(ids))
+            self.lexical.update(collection_name, lambda: self._load_all(collection_name), add=(ids, docs))
+            self.query_cache.invalidate(collection_name)
+            self.catalog.record_added(collection_name, ids, docs)
+
+    def _remove(self, collection_name: str, store: Chroma, ids: List[str]):
+        """Deletes the given chunk IDs from the collection and its lexical index."""
+        if ids:
+            removed = store._collection.get(ids=ids, include=["metadatas"])["metadatas"]
+            store._collection.delete(ids=ids)
+            self.lexical.update(collection_name, lambda: self._load_all(collection_name), remove=ids)
+            self.query_cache.invalidate(collection_name)
+            sources = {str(metadata["source"]) for metadata in removed if metadata and metadata.get("source")}
+            self.catalog.record_removed(collection_name, ids, sources)
+
+    def _update_records(self, collection_name: str, store: Chroma, records: Dict[str, List[Dict]]) -> Tuple[List[str], List[Document]]:
+        """Rewrites the duplicates recorded on stored chunks, reusing their embeddings. Returns the rewritten chunks."""
+        if not records:
+            return [], []
+        stored = store._collection.get(ids=list(records), include=["embeddings", "documents", "metadatas"])
+        ids, docs, vectors = [], [], []
+        for doc_id, vector, text, metadata in zip(stored["ids"], stored["embeddings"], stored["documents"], stored["metadatas"]):
+            metadata = {key: value for key, value in (metadata or {}).items() if key != DUPLICATES_FIELD}
+            if records[doc_id]:
+                metadata[DUPLICATES_FIELD] = json.dumps(records[doc_id])
+            ids.append(doc_id)
+            docs.append(Document(page_content=text or "", metadata=metadata, id=doc_id))
+            vectors.append(vector)
+        batch = {"ids": ids, "documents": [doc.page_content for doc in docs], "metadatas": [doc.metadata for doc in docs]}
+        self._upsert_batch(store._collection, batch, np.asarray(vectors, dtype=np.float32))
+        self.lexical.update(collection_name, lambda: self._load_all(collection_name), add=(ids, docs))
+        self.query_cache.invalidate(collection_name)
+        return ids, docs
+
+    def _deduplicated_write(
+        self,
+        collection_name: str,
+        store: Chroma,
+        by_id: Dict[str, Document],
+        new_ids: List[str],
+        stale_ids: Optional[List[str]] = None,
+        sources: Optional[set] = None,
+    ) -> Dict[str, int]:
+        """
+        Removes stale_ids, then embeds and writes the new chunks that don't duplicate a chunk of the collection.
+
+        An exact duplicate is not written but recorded (ID, source, pages) in the duplicates metadata of the chunk it
+        duplicates (up to MAX_RECORDS). A near duplicate (DEDUP=near) is written with its own text, so it stays
+        searchable, and the embedding of the chunk it matched instead of its own. Records of the synced sources are recomputed from their new chunks. A removed chunk
+        still holding duplicates of other sources is replaced by the first of them, with the same
+        text & embedding, so those sources stay retrievable.
+
+        Returns:
+            Counts of added (embedded), deduplicated, removed and promoted chunks
+        """
+        loader = lambda: self._load_all(collection_name)
+        index = self.dedup.get(collection_name, loader)
+        collection = store._collection
+        stale = set(stale_ids or ())
+
+        # 1. Duplicates previously recorded for the synced sources are dropped, the new chunks are checked again
+        dropped: Dict[str, set] = {}
+        for alias, survivor in index.aliases_of_sources(sources or ()).items():
+            dropped.setdefault(survivor, set()).add(alias)
+        current: Dict[str, List[Dict]] = {}
+        if dropped:
+            stored = collection.get(ids=list(dropped), include=["metadatas"])
+            current = {doc_id: duplicate_records(metadata) for doc_id, metadata in zip(stored["ids"], stored["metadatas"])}
+
+        # 2. Stale chunks holding duplicates of other sources hand over to the first of them
+        promoted_ids, promoted_docs, promoted_vectors, promoted_fingerprints = [], [], [], []
+        if stale:
+            stored = collection.get(ids=list(stale), include=["embeddings", "documents", "metadatas"])
+            for doc_id, vector, text, metadata in zip(stored["ids"], stored["embeddings"], stored["documents"], stored["metadatas"]):
+                kept = [record for record in duplicate_records(metadata) if record["id"] not in dropped.get(doc_id, ())]
+                if not kept:
+                    continue
+                first, rest = kept[0], kept[1:]
+                metadata = {key: value for key, value in (metadata or {}).items() if key != DUPLICATES_FIELD}
+                metadata.update(source=first["source"], page_numbers=first["page_numbers"])
+                metadata.pop("source_path", None)
+                if first.get("source_path"):
+                    metadata["source_path"] = first["source_path"]
+                if rest:
+                    metadata[DUPLICATES_FIELD] = json.dumps(rest)
+                promoted_ids.append(first["id"])
+                promoted_docs.append(Document(page_content=text or "", metadata=metadata, id=first["id"]))
+                promoted_vectors.append(vector)
+                promoted_fingerprints.append(index.fingerprints.get(doc_id) or index.fingerprint(text or ""))
+        self._remove(collection_name, store, list(stale))
+        self.dedup.update(collection_name, loader, remove=list(stale))
+        if promoted_ids:
+            batch = {
+                "ids": promoted_ids,
+                "documents": [doc.page_content for doc in promoted_docs],
+                "metadatas": [doc.metadata for doc in promoted_docs],
+            }
+            self._upsert_batch(collection, batch, np.asarray(promoted_vectors, dtype=np.float32))
+            self.lexical.update(collection_name, lambda: self._load_all(collection_name), add=(promoted_ids, promoted_docs))
+            self.catalog.record_added(collection_name, promoted_ids, promoted_docs)
+            self.dedup.update(collection_name, loader, add=(promoted_ids, promoted_docs, promoted_fingerprints))
+
+        # 3. New chunks duplicating a stored chunk, or an earlier chunk of this batch, are not embedded
+        #    (indexed in memory as they go, persisted with their records in step 4)
+        added: Dict[str, List[Dict]] = {}
+        # Near duplicate ID -> chunk whose embedding it reuses
+        reused: Dict[str, str] = {}
+        to_write, fingerprints, matches = [], {}, {"exact": 0, "near": 0}
+        for doc_id in new_ids:
+            doc = by_id[doc_id]
+            fingerprint = index.fingerprint(doc.page_content)
+            survivor = index.find(fingerprint)
+            if survivor is None:
+                index.add([doc_id], [doc], [fingerprint])
+                to_write.append(doc_id)
+                fingerprints[doc_id] = fingerprint
+                continue
+            if index.fingerprints[survivor][0] != fingerprint[0]:
+                matches["near"] += 1
+                reused[doc_id] = survivor
+                fingerprints[doc_id] = fingerprint
+                continue
+            matches["exact"] += 1
+            record = {"id": doc_id, "source": str(doc.metadata.get("source", "")), "page_numbers": doc.metadata.get("page_numbers")}
+            if doc.metadata.get("source_path"):
+                record["source_path"] = doc.metadata["source_path"]
+            added.setdefault(survivor, []).append(record)
+
+        # 4. Record the duplicates on the chunks written now, then on the stored ones whose records changed
+        for doc_id in to_write:
+            if doc_id in added:
+                doc = by_id[doc_id]
+                records = added.pop(doc_id)[:MAX_RECORDS]
+                by_id[doc_id] = Document(page_content=doc.page_content, metadata={**doc.metadata, DUPLICATES_FIELD: json.dumps(records)})
+        self._write(collection_name, store, by_id, to_write)
+        if reused:
+            stored = collection.get(ids=list(set(reused.values())), include=["embeddings"])
+            vectors = dict(zip(stored["ids"], stored["embeddings"]))
+            self._write(
+                collection_name, store, by_id, list(reused), np.asarray([vectors[survivor] for survivor in reused.values()], dtype=np.float32)
+            )
+        written = to_write + list(reused)
+
+        missing = [survivor for survivor in added if survivor not in current]
+        if missing:
+            stored = collection.get(ids=missing, include=["metadatas"])
+            current.update({doc_id: duplicate_records(metadata) for doc_id, metadata in zip(stored["ids"], stored["metadatas"])})
+        changed: Dict[str, List[Dict]] = {}
+        for survivor in (set(dropped) | set(added)) - stale:
+            before = current.get(survivor, [])
+            records = [record for record in before if record["id"] not in dropped.get(survivor, ())]
+            known = {record["id"] for record in records}
+            records += [record for record in added.get(survivor, []) if record["id"] not in known]
+            records = records[:MAX_RECORDS]
+            if records != before:
+                changed[survivor] = records
+        updated_ids, updated_docs = self._update_records(collection_name, store, changed)
+        self.dedup.update(
+            collection_name,
+            loader,
+            add=(
+                written + updated_ids,
+                [by_id[doc_id] for doc_id in written] + updated_docs,
+                [fingerprints[doc_id] for doc_id in written] + [index.fingerprints[doc_id] for doc_id in updated_ids],
+            ),
+        )
+
+        deduplicated = matches["exact"] + matches["near"]
+        for match, count in matches.items():
+            if count:
+                DEDUPLICATED_CHUNKS.labels(match=match).inc(count)
+        return {"added": len(to_write), "deduplicated": deduplicated, "removed": len(stale), "promoted": len(promoted_ids)}
+
+    def _store_new(
+        self,
+        collection_name: str,
+        store: Chroma,
+        by_id: Dict[str, Document],
+        new_ids: List[str],
+        stale_ids: Optional[List[str]] = None,
+        sources: Optional[set] = None,
+    ) -> Dict[str, int]:
+        """Removes stale_ids and writes new_ids, skipping duplicates unless DEDUP is disabled."""
+        if not dedup_enabled():
+            self._remove(collection_name, store, list(stale_ids or ()))
+            self._write(collection_name, store, by_id, new_ids)
+            return {"added": len(new_ids), "deduplicated": 0, "removed": len(stale_ids or ()), "promoted": 0}
+        with self.dedup.lock(collection_name):
+            try:
+                return self._deduplicated_write(collection_name, store, by_id, new_ids, stale_ids, sources)
+            except BaseException:
+                # The in-memory index may list chunks that were never written, rebuild it from the collection
+                self.dedup.drop(collection_name)
+                raise
+
+    def add_documents(self, collection_name: str, documents: List[Document]) -> Dict[str, int]:
         """
         Embeds and adds documents to a specific collection.
         Creates the collection if it doesn't exist.
+        Chunks already stored (same deterministic ID) are not embedded again, nor are chunks
+        duplicating a stored chunk (see _deduplicated_write).
         """
         if not documents:
-            return
+            return {"added": 0, "unchanged": 0, "deduplicated": 0}
         
         store = self._get_collection_store(collection_name)
-        store.add_documents(documents)
-        print(f"Added {len(documents)} documents to collection '{collection_name}'")
+        by_id = self._unique_with_ids(documents)
+        existing = self._existing_ids(store, list(by_id))
+        new_ids = [i for i in by_id if i not in existing]
+        written = self._store_new(collection_name, store, by_id, new_ids)
+        report = {"added": written["added"], "unchanged": len(existing), "deduplicated": written["deduplicated"]}
+        logger.info(
+            f"Added {report['added']} documents to collection '{collection_name}' ({len(existing)} already present, "
+            f"{report['deduplicated']} duplicates not embedded, {embeds_avoided_pct(report)}% of the embeddings avoided)",
+            extra={"collection": collection_name, **report, "embeds_avoided_pct": embeds_avoided_pct(report)},
+        )
+        return report
+
+    def sync_documents(self, collection_name: str, documents: List[Document]) -> Dict[str, int]:
+        """
+        Makes the collection content of every source present in documents match documents exactly.
+        Only new or changed chunks are embedded, chunks of these sources that are no longer produced are deleted,
+        chunks duplicating a chunk of the collection are not embedded (see _deduplicated_write).
+
+        Returns:
+            Counts of added, unchanged, removed and deduplicated chunks
+        """
+        report = {"added": 0, "unchanged": 0, "removed": 0, "deduplicated": 0}
+        if not documents:
+            return report
+
+        store = self._get_collection_store(collection_name)
+        by_id = self._unique_with_ids(documents)
+        # One chunk's metadata per document (see source_key)
+        sources = {self.source_key(doc.metadata): doc.metadata for doc in by_id.values()}
+
+        existing = set()
+        for metadata in sources.values():
+            existing.update(self._source_ids(store, metadata))
+
+        new_ids = [i for i in by_id if i not in existing]
+        stale_ids = [i for i in existing if i not in by_id]
+
+        written = self._store_new(collection_name, store, by_id, new_ids, stale_ids, set(sources))
 
-    def query(self, collection_name: str, query_text: str, k: int = 5, filter_metadata: Optional[dict] = None) -> List[Document]:
+        report["added"] = written["added"]
+        report["unchanged"] = len(by_id) - len(new_ids)
+        report["removed"] = written["removed"]
+        report["deduplicated"] = written["deduplicated"]
+        logger.info(
+            f"Synced {len(sources)} source(s) into collection '{collection_name}': {report}, "
+            f"{embeds_avoided_pct(report)}% of the embeddings avoided",
+            extra={"collection": collection_name, "sources": len(sources), **report, "embeds_avoided_pct": embeds_avoided_pct(report)},
+        )
+        return report
+
+    def query(
+        self,
+        collection_name: str,
+        query_text: str,
+        k: int = 5,
+        filter_metadata: Optional[dict] = None,
+        mode: str = "dense",
+    ) -> List[Document]:
         """
-        Semantic search within a specific collection.
+        Search within a specific collection.
+
+        Args:
+            collection_name: Name of the collection to search
+            query_text: The text query
+            k: Number of documents to return
+            filter_metadata: Optional Chroma-style metadata filter
+            mode: "dense" (semantic similarity), "lexical" (BM25) or "hybrid"
+                  (both run concurrently, fused with reciprocal rank fusion)
         """
+        if mode not in QUERY_MODES:
+            raise ValueError(f"Unknown query mode '{mode}', expected one of {QUERY_MODES}")
+
+        cache_key = self.query_cache.make_key(collection_name, query_text, k, filter_metadata, mode, self._embedding_key)
+        results = self.query_cache.get(cache_key)
+        if results is None:
+            results = self._search(collection_name, query_text, k, filter_metadata, mode)
+            self.query_cache.put(cache_key, results)
+        return results
+
+    def _search(self, collection_name: str, query_text: str, k: int, filter_metadata: Optional[dict], mode: str) -> List[Document]:
+        if mode == "dense":
+            return self._dense_search(collection_name, query_text, k, filter_metadata)
+        if mode == "lexical":
+            return self._lexical_search(collection_name, query_text, k, filter_metadata)
+
+        # Fuse deeper candidate lists than k so documents ranked well by only one retriever still surface
+        n_candidates = max(k * 4, 20)
+        dense = _RETRIEVAL_POOL.submit(self._dense_search, collection_name, query_text, n_candidates, filter_metadata)
+        lexical = _RETRIEVAL_POOL.submit(self._lexical_search, collection_name, query_text, n_candidates, filter_metadata)
+        return reciprocal_rank_fusion([dense.result(), lexical.result()], k)
+
+    def _dense_search(self, collection_name: str, query_text: str, k: int, filter_metadata: Optional[dict]) -> List[Document]:
         store = self._get_collection_store(collection_name)
-        return store.similarity_search(
-            query=query_text,
-            k=k,
-            filter=filter_metadata
+        with QUERY_EMBED_SECONDS.time():
+            query_embedding = self.embedding_function.embed_query(query_text)
+        with QUERY_SEARCH_SECONDS.labels(collection=collection_name, retriever="dense").time():
+            return store.similarity_search_by_vector(query_embedding, k=k, filter=filter_metadata)
+
+    def _lexical_search(self, collection_name: str, query_text: str, k: int, filter_metadata: Optional[dict]) -> List[Document]:
+        loader = lambda: self._load_all(collection_name)
+        with QUERY_SEARCH_SECONDS.labels(collection=collection_name, retriever="lexical").time():
+            return self.lexical.search(collection_name, loader, query_text, k, filter_metadata)
+
+    def _scored_search(self, collection_name: str, query_embedding: List[float], k: int, filter_metadata: Optional[dict]):
+        with QUERY_SEARCH_SECONDS.labels(collection=collection_name, retriever="dense").time():
+            return self._get_collection_store(collection_name).similarity_search_by_vector_with_relevance_scores(
+                query_embedding, k, filter_metadata
+            )
+
+    def search_collections(
+        self,
+        collection_names: Union[List[str], str],
+        query_text: str,
+        k: int = 5,
+        filter_metadata: Optional[dict] = None,
+        timeout: Optional[float] = 10.0,
+    ) -> List[Document]:
+        """
+        Semantic search across several collections at once.
+        The query is embedded once, every collection is searched concurrently and the hits
+        are merged by distance. Each hit's metadata gets a "collection" field.
+
+        Args:
+            collection_names: Names of the collections to search, or "*" for all of them
+            query_text: The text query
+            k: Number of documents to return overall
+            filter_metadata: Optional Chroma-style metadata filter
+            timeout: Seconds to wait for the collections, slower ones are skipped (None waits forever)
+        """
+        existing = self.list_collections()
+        if collection_names == "*":
+            names = existing
+        else:
+            # Never create empty collections by searching a name that doesn't exist
+            names = [name for name in collection_names if name in existing]
+            for name in set(collection_names) - set(names):
+                logger.warning(f"Collection '{name}' does not exist, skipped", extra={"collection": name})
+        if not names:
+            return []
+
+        with QUERY_EMBED_SECONDS.time():
+            query_embedding = self.embedding_function.embed_query(query_text)
+        futures = {
+            _RETRIEVAL_POOL.submit(self._scored_search, name, query_embedding, k, filter_metadata): name
+            for name in names
+        }
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+            logger.warning(
+                f"Search in collection '{futures[future]}' timed out after {timeout}s, skipped",
+                extra={"collection": futures[future], "timeout": timeout},
+            )
+
+        hits = []
+        for future in done:
+            name = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                logger.error(f"Search in collection '{name}' failed: {e}", extra={"collection": name})
+                continue
+            for doc, distance in results:
+                doc.metadata["collection"] = name
+                hits.append((distance, doc))
+
+        hits.sort(key=lambda hit: hit[0])
+        return [doc for _, doc in hits[:k]]
+
+    def export_collection(self, collection_name: str, path: str, dtype: str = "float32", batch_size: int = 5000) -> Dict:
+        """
+        Write a snapshot of a collection to a folder, to restore it elsewhere without re-parsing nor re-embedding.
+
+        The folder holds manifest.json, one gzip-compressed column per field, ids.jsonl.gz /
+        documents.jsonl.gz / metadatas.jsonl.gz (one JSON value per line, row i of each file is
+        chunk i), and embeddings.npy, a (count, dim) matrix that can be memory-mapped with
+        np.load(..., mmap_mode="r"). The columns are not Parquet: pyarrow is not a dependency of the backend.
+
+        Args:
+            collection_name: Name of the collection to export
+            path: Folder to write the snapshot into (created if needed)
+            dtype: "float32" (exact) or "float16" (half the size, for cosine / normalized embeddings)
+            batch_size: Chunks fetched from the vector database per request
+
+        Returns:
+            The snapshot manifest
+        """
+        if dtype not in SNAPSHOT_DTYPES:
+            raise ValueError(f"Unknown dtype '{dtype}', expected one of {SNAPSHOT_DTYPES}")
+        if collection_name not in self.list_collections():
+            raise ValueError(f"Collection '{collection_name}' does not exist")
+
+        start = time.perf_counter()
+        collection = self.client.get_collection(collection_name)
+        count = collection.count()
+        os.makedirs(path, exist_ok=True)
+
+        embeddings = None
+        columns = {
+            name: gzip.open(os.path.join(path, f"{name}.jsonl.gz"), "wt", encoding="utf-8", compresslevel=6)
+            for name in SNAPSHOT_COLUMNS
+        }
+        written = 0
+        try:
+            while written < count:
+                page = collection.get(include=["documents", "metadatas", "embeddings"], limit=batch_size, offset=written)
+                if not page["ids"]:
+                    break
+                vectors = np.asarray(page["embeddings"], dtype=np.float32)
+                if embeddings is None:
+                    # Written in place page by page, the whole matrix is never held in memory
+                    embeddings = np.lib.format.open_memmap(
+                        os.path.join(path, "embeddings.npy"), mode="w+", dtype=dtype, shape=(count, vectors.shape[1])
+                    )
+                rows = min(len(page["ids"]), count - written)
+                embeddings[written:written + rows] = vectors[:rows]
+                for name in SNAPSHOT_COLUMNS:
+                    columns[name].writelines(json.dumps(value, ensure_ascii=False) + "\n" for value in page[name][:rows])
+                written += rows
+        finally:
+            for f in columns.values():
+                f.close()
+            if embeddings is not None:
+                embeddings.flush()
+                del embeddings
+
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "collection": collection_name,
+            "collection_metadata": collection.metadata,
+            "count": written,
+            "dimension": int(vectors.shape[1]) if written else None,
+            "dtype": dtype,
+            "embedding_model": self.embedding_model,
+            "embedding_backend": self.embedding_backend,
+            "embedding_precision": EMBEDDING_PRECISIONS.get(self.embedding_backend),
+            "created_at": time.time(),
+        }
+        with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(
+            f"Exported {written} chunks of collection '{collection_name}' to {path} in {time.perf_counter() - start:.1f}s",
+            extra={"collection": collection_name, "chunks": written, "path": path},
         )
-    
+        return manifest
+
+    def import_collection(
+        self,
+        path: str,
+        collection_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        allow_model_mismatch: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Restore a snapshot written by export_collection, upserting the stored embeddings (nothing is re-embedded).
+
+        Args:
+            path: Snapshot folder
+            collection_name: Target collection (defaults to the exported collection's name), created if needed
+            batch_size: Chunks per upsert request (defaults to the server's maximum, capped at 5000)
+            workers: Concurrent upsert requests (defaults to IMPORT_WORKERS or 4)
+            allow_model_mismatch: Import even if the snapshot was embedded with another model, or at another
+                precision (fp32 vs ONNX int8), than this manager's
+
+        Returns:
+            Number of imported chunks
+        """
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") not in SNAPSHOT_VERSIONS:
+            raise ValueError(f"Unsupported snapshot version {manifest.get('version')}")
+        if not allow_model_mismatch:
+            self._check_embedding_space(manifest)
+
+        start = time.perf_counter()
+        collection_name = collection_name or manifest["collection"]
+        collection = self.client.get_or_create_collection(collection_name, metadata=manifest.get("collection_metadata"))
+        batch_size = batch_size or min(self.client.get_max_batch_size(), 5000)
+        workers = workers or int(os.getenv("IMPORT_WORKERS", 4))
+        count = manifest["count"]
+        embeddings = np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r") if count else None
+
+        if manifest["version"] == 1:
+            columns = {name: open(os.path.join(path, f"{name}.jsonl"), "r", encoding="utf-8") for name in SNAPSHOT_COLUMNS}
+        else:
+            columns = {name: gzip.open(os.path.join(path, f"{name}.jsonl.gz"), "rt", encoding="utf-8") for name in SNAPSHOT_COLUMNS}
+        imported = 0
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot-import") as pool:
+                pending = set()
+                for offset in range(0, count, batch_size):
+                    rows = min(batch_size, count - offset)
+                    batch = {name: [json.loads(next(columns[name])) for _ in range(rows)] for name in SNAPSHOT_COLUMNS}
+                    vectors = np.asarray(embeddings[offset:offset + rows], dtype=np.float32)
+                    # Bound the batches held in memory to the ones being sent
+                    if len(pending) >= workers:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            imported += future.result()
+                    pending.add(pool.submit(self._upsert_batch, collection, batch, vectors))
+                for future in pending:
+                    imported += future.result()
+        finally:
+            for f in columns.values():
+                f.close()
+
+        # Rebuilt now from the imported chunks, rather than by the first lexical or hybrid query
+        self._collections.pop(collection_name, None)
+        self.lexical.rebuild(collection_name, lambda: self._load_all(collection_name))
+        self.dedup.drop(collection_name)
+        self.query_cache.invalidate(collection_name)
+        self.catalog.refresh(collection_name)
+        logger.info(
+            f"Imported {imported} chunks into collection '{collection_name}' in {time.perf_counter() - start:.1f}s",
+            extra={"collection": collection_name, "chunks": imported, "path": path},
+        )
+        return {"imported": imported}
+
+    def _check_embedding_space(self, manifest: Dict):
+        """Raise ValueError if a snapshot's vectors don't come from this manager's model and precision."""
+        if manifest["embedding_model"] != self.embedding_model:
+            raise ValueError(
+                f"Snapshot embedded with '{manifest['embedding_model']}', this manager uses '{self.embedding_model}'"
+            )
+        theirs, ours = manifest.get("embedding_precision"), EMBEDDING_PRECISIONS.get(self.embedding_backend)
+        if theirs is None or ours is None:
+            logger.warning(
+                f"Embedding precision of the snapshot ({theirs or 'unknown'}) or of this manager ({ours or 'unknown'}) "
+                "is unknown, the vectors are assumed compatible"
+            )
+        elif theirs != ours:
+            raise ValueError(
+                f"Snapshot embedded at {theirs} precision (backend '{manifest.get('embedding_backend')}'), "
+                f"this manager uses {ours} (backend '{self.embedding_backend}')"
+            )
+
+    @staticmethod
+    def _upsert_batch(collection, batch: Dict[str, list], vectors: np.ndarray) -> int:
+        collection.upsert(
+            ids=batch["ids"],
+            embeddings=vectors,
+            documents=batch["documents"],
+            metadatas=[metadata or None for metadata in batch["metadatas"]],
+        )
+        return len(batch["ids"])
+
     def list_collections(self) -> List[str]:
         """Returns a list of all collection names in the DB."""
         return [col.name for col in self.client.list_collections()]
@@ -81,9 +741,13 @@ class VectorDBManager:
             self.client.delete_collection(collection_name)
             if collection_name in self._collections:
                 del self._collections[collection_name]
-            print(f"Deleted collection '{collection_name}'")
+            self.lexical.drop(collection_name)
+            self.dedup.drop(collection_name)
+            self.query_cache.invalidate(collection_name)
+            self.catalog.record_dropped(collection_name)
+            logger.info(f"Deleted collection '{collection_name}'", extra={"collection": collection_name})
         except Exception as e:
-            print(f"Error deleting collection '{collection_name}': {e}")
+            logger.error(f"Error deleting collection '{collection_name}': {e}", extra={"collection": collection_name})
 
 if __name__ == "__main__":
     db_manager = VectorDBManager()
@@ -0,0 +1,56 @@
+"""Cooperative cancellation of agent runs and ingestion work."""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class OperationCancelled(Exception):
+    """Raised at a cancellation checkpoint once the surrounding operation was cancelled."""
+
+
+class CancelToken:
+    """Thread-safe flag shared between the request that may cancel and the worker doing the job."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled(self.reason)
+
+
+_current_token: ContextVar[Optional[CancelToken]] = ContextVar("cancel_token", default=None)
+
+
+def current_token() -> Optional[CancelToken]:
+    """Token of the operation running in the current context, if any."""
+    return _current_token.get()
+
+
+def check_cancelled():
+    """Cancellation checkpoint: raises OperationCancelled if the current operation was cancelled."""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+@contextmanager
+def cancellation_scope(token: CancelToken) -> Iterator[CancelToken]:
+    """Make token the current one for the code (and the tools it calls) run inside the block."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
@@ -0,0 +1,231 @@
+"""Cached catalog of the vector database collections, kept up to date by the writes of VectorDBManager."""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Chunks kept as preview of each collection, and characters kept of each
+PREVIEW_SIZE = 5
+PREVIEW_CHARS = 500
+
+
+class CollectionCatalog:
+    """
+    Per-collection summary (chunk count, source files, preview chunks) served without touching the vector database.
+
+    Collections are scanned once (then persisted to a JSON file) and every write made through
+    VectorDBManager updates the entries in place. Each change bumps the catalog generation,
+    which clients use as an ETag to revalidate their copy. Writes made by other processes
+    (e.g. the snapshot CLI) are picked up with refresh().
+
+    The JSON file is rewritten at most once per save_delay seconds, however many writes happen
+    in between; flush() writes pending changes right away. Changes lost to a crash only cost
+    a rescan of the collections whose count no longer matches.
+    """
+
+    def __init__(self, client=None, path: Optional[str] = None, save_delay: Optional[float] = None):
+        """
+        Args:
+            client: Vector database client (defaults to the shared one)
+            path: JSON file persisting the catalog (defaults to CATALOG_PATH or .cache/catalog.json)
+            save_delay: Seconds changes are batched before being written (defaults to CATALOG_SAVE_DELAY or 2, 0 writes at once)
+        """
+        if client is None:
+            from core.registry import registry
+
+            client = registry.get_vector_client()
+        self.client = client
+        self.path = path or os.getenv("CATALOG_PATH", os.path.join(".cache", "catalog.json"))
+        self.save_delay = float(os.getenv("CATALOG_SAVE_DELAY", 2)) if save_delay is None else save_delay
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._entries: Dict[str, Dict] = {}
+        self._generation = 0
+        self._loaded = False
+        # Generations restart at 0 with the process, the epoch keeps ETags of different runs apart
+        self._epoch = uuid.uuid4().hex[:8]
+
+    @property
+    def version(self) -> str:
+        """Changes whenever any entry changes, the base of the ETags of the catalog."""
+        return f"{self._epoch}-{self._generation}"
+
+    def _bump(self, entry: Optional[Dict] = None):
+        self._generation += 1
+        if entry is not None:
+            entry["generation"] = self._generation
+            entry["updated_at"] = time.time()
+
+    def _scan(self, name: str, page_size: int = 5000) -> Dict:
+        """Build the entry of a collection from the vector database (one paged pass over its metadata)."""
+        collection = self.client.get_collection(name)
+        peek = collection.peek(limit=PREVIEW_SIZE)
+        sources = set()
+        offset = 0
+        while True:
+            page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            sources.update(str(metadata.get("source")) for metadata in page["metadatas"] if metadata and metadata.get("source"))
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+        return {
+            "name": name,
+            "count": collection.count(),
+            "sources": sorted(sources),
+            "preview": [[doc_id, (text or "")[:PREVIEW_CHARS]] for doc_id, text in zip(peek["ids"], peek["documents"])],
+        }
+
+    def _ensure_loaded(self):
+        """Load the persisted catalog, rescanning only the collections whose chunk count changed."""
+        if self._loaded:
+            return
+        persisted = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                persisted = json.load(f).get("collections", {})
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable collection catalog {self.path}: {e}")
+
+        entries = {}
+        for collection in self.client.list_collections():
+            entry = persisted.get(collection.name)
+            if entry is None or entry.get("count") != collection.count():
+                entry = self._scan(collection.name)
+            entries[collection.name] = entry
+        self._entries = entries
+        self._loaded = True
+        self._bump()
+        for entry in self._entries.values():
+            entry.setdefault("generation", self._generation)
+            entry.setdefault("updated_at", time.time())
+        self._save()
+
+    def _save(self):
+        """Schedule the persistence of the catalog, batching the writes of the next save_delay seconds."""
+        self._dirty = True
+        if self.save_delay <= 0:
+            self.flush()
+        elif self._save_timer is None:
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        """Write the pending changes of the catalog to its JSON file."""
+        with self._lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"collections": self._entries}, f)
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+    def refresh(self, name: Optional[str] = None):
+        """Rescan one collection (or all of them) from the vector database, e.g. after writes made by another process."""
+        with self._lock:
+            if name is None:
+                self._loaded = False
+                self._entries = {}
+                self._ensure_loaded()
+                return
+            self._ensure_loaded()
+            if name in {collection.name for collection in self.client.list_collections()}:
+                self._entries[name] = self._scan(name)
+                self._bump(self._entries[name])
+            else:
+                self._entries.pop(name, None)
+                self._bump()
+            self._save()
+
+    def record_added(self, name: str, ids: List[str], documents: List):
+        """Account for chunks written to a collection (created on its first write)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            entry = self._entries.setdefault(name, {"name": name, "count": 0, "sources": [], "preview": []})
+            entry["count"] += len(ids)
+            sources = set(entry["sources"])
+            sources.update(str(doc.metadata.get("source")) for doc in documents if doc.metadata.get("source"))
+            entry["sources"] = sorted(sources)
+            for doc_id, doc in zip(ids, documents):
+                if len(entry["preview"]) >= PREVIEW_SIZE:
+                    break
+                entry["preview"].append([doc_id, doc.page_content[:PREVIEW_CHARS]])
+            self._bump(entry)
+            self._save()
+
+    def record_removed(self, name: str, ids: List[str], sources: Iterable[str] = ()):
+        """
+        Account for chunks deleted from a collection.
+
+        Args:
+            name: Name of the collection
+            ids: IDs of the deleted chunks
+            sources: Sources of the deleted chunks, dropped from the entry if none of their chunks is left
+        """
+        with self._lock:
+            if not self._loaded or name not in self._entries:
+                return
+            entry = self._entries[name]
+            entry["count"] = max(entry["count"] - len(ids), 0)
+            collection = self.client.get_collection(name)
+            gone = {source for source in set(sources) if not collection.get(where={"source": source}, limit=1, include=[])["ids"]}
+            entry["sources"] = [source for source in entry["sources"] if source not in gone]
+            removed = set(ids)
+            entry["preview"] = [item for item in entry["preview"] if item[0] not in removed]
+            if len(entry["preview"]) < PREVIEW_SIZE:
+                # Refill the preview with the chunks that are left
+                peek = collection.peek(limit=PREVIEW_SIZE)
+                entry["preview"] = [[doc_id, (text or "")[:PREVIEW_CHARS]] for doc_id, text in zip(peek["ids"], peek["documents"])]
+            self._bump(entry)
+            self._save()
+
+    def record_dropped(self, name: str):
+        """Forget a deleted collection."""
+        with self._lock:
+            if self._loaded and self._entries.pop(name, None) is not None:
+                self._bump()
+                self._save()
+
+    def page(self, offset: int = 0, limit: int = 50, with_sources: bool = True) -> Tuple[str, int, List[Dict]]:
+        """
+        A page of the catalog, collections sorted by name.
+
+        Returns:
+            (catalog version, total number of collections, entries of the page)
+        """
+        with self._lock:
+            self._ensure_loaded()
+            names = sorted(self._entries)
+            page = []
+            for name in names[offset:offset + limit]:
+                entry = self._entries[name]
+                item = {
+                    "name": name,
+                    "count": entry["count"],
+                    "preview": [text for _, text in entry["preview"]],
+                    "generation": entry["generation"],
+                    "updated_at": entry["updated_at"],
+                }
+                if with_sources:
+                    item["sources"] = list(entry["sources"])
+                page.append(item)
+            return self.version, len(names), page
@@ -1,18 +1,24 @@
 """Chunker module for splitting documents into manageable pieces."""
 
+import logging
 import os
 import time
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional
 
 from docling.chunking import HybridChunker
 from docling_core.transforms.chunker.tokenizer.huggingface import HuggingFaceTokenizer
 from langchain_core.documents import Document
-from transformers import AutoTokenizer
+
+from core.fast_readers import FastDocument
+from core.metrics import CHUNK_SECONDS, CHUNKS
+from core.registry import registry
+
+logger = logging.getLogger(__name__)
 
 
 class Chunker:
-    """Handles document chunking using Docling's HybridChunker."""
+    """Handles document chunking using Docling's HybridChunker (FastDocuments chunk themselves by rows / lines)."""
 
     def __init__(
         self,
@@ -28,53 +34,83 @@ class Chunker:
             max_tokens: Maximum number of tokens per chunk
             overlap: Number of overlapping tokens between chunks
         """
+        self.tokenizer = registry.get_tokenizer(embedding_model)
+        self.max_tokens = max_tokens
+        self.overlap = overlap
         self.chunker = HybridChunker(
+            # max_tokens set here: otherwise it's read from the model's config on the Hub
             tokenizer=HuggingFaceTokenizer(
-                tokenizer=AutoTokenizer.from_pretrained(embedding_model)
+                tokenizer=self.tokenizer,
+                max_tokens=max_tokens,
             ),
             max_tokens=max_tokens,
             merge_peers=True,
             overlap_tokens=overlap,
         )
 
-    def chunk(self, doc) -> List[Document]:
+    def chunk(self, doc, source_path: Optional[str] = None) -> List[Document]:
         """
         Chunk a single document.
 
         Args:
-            doc: Docling document to chunk
+            doc: Docling document (or FastDocument) to chunk
+            source_path: Path of the parsed file, stored as the chunks' source_path (the identity of
+                their document, "source" being only its file name). Defaults to a FastDocument's path.
 
         Returns:
             List of LangChain Document objects with metadata
         """
         start = time.perf_counter()
-        chunks = list(self.chunker.chunk(dl_doc=doc))
+        if isinstance(doc, FastDocument):
+            documents = doc.chunk(self.tokenizer, self.max_tokens, self.overlap)
+            source_name = doc.filename
+            source_path = source_path or doc.path
+        else:
+            documents = self._transform_to_documents(list(self.chunker.chunk(dl_doc=doc)))
+            source_name = os.path.basename(doc.origin.filename)
+        if source_path:
+            source_path = os.path.abspath(source_path)
+            for document in documents:
+                document.metadata["source_path"] = source_path
         elapsed = time.perf_counter() - start
+        CHUNK_SECONDS.observe(elapsed)
+        CHUNKS.inc(len(documents))
 
-        source_name = os.path.basename(doc.origin.filename)
-        print(
-            f"File '{source_name}' Chunked into {len(chunks)} chunks "
-            f"(took {elapsed:.2f}s)"
+        logger.info(
+            f"File '{source_name}' Chunked into {len(documents)} chunks (took {elapsed:.2f}s)",
+            extra={"file": source_name, "chunks": len(documents), "seconds": round(elapsed, 3)},
         )
 
-        return self._transform_to_documents(chunks)
+        return documents
+
+    def iter_chunks(self, docs: Iterable) -> Iterator[List[Document]]:
+        """
+        Lazily chunk a stream of Docling Documents, one document at a time.
+
+        Args:
+            docs: Iterable (list, generator, ...) of Docling documents
 
-    def chunk_list(self, docs: list) -> List[Document]:
+        Yields:
+            The chunks of each document as LangChain Document objects
+        """
+        for doc in docs:
+            yield self.chunk(doc)
+
+    def chunk_list(self, docs: Iterable) -> List[Document]:
         """
         Chunk multiple Docling Documents.
 
         Args:
-            docs: List of Docling documents to chunk
+            docs: Iterable of Docling documents to chunk
 
         Returns:
             List of all chunks as LangChain Document objects
         """
         final_chunks = []
-        for doc in docs:
-            chunks = self.chunk(doc)
+        for chunks in self.iter_chunks(docs):
             final_chunks.extend(chunks)
 
-        print(f"✅ Finished chunking. Total final chunks: {len(final_chunks)}.")
+        logger.info(f"Finished chunking. Total final chunks: {len(final_chunks)}.", extra={"chunks": len(final_chunks)})
         return final_chunks
 
     def _transform_to_documents(self, chunks: List) -> List[Document]:
@@ -0,0 +1,176 @@
+"""Token-budgeted packing of retrieved chunks into a compact agent observation."""
+
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from langchain_core.documents import Document
+
+from core.lexical_index import tokenize
+from core.tokens import estimate_tokens
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n{2,}|\n(?=[#|\-*] )")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a chunk into sentences / paragraphs / markdown lines."""
+    return [sentence.strip() for sentence in _SENTENCE_RE.split(text) if sentence and sentence.strip()]
+
+
+def _fingerprint(sentence: str) -> str:
+    return hashlib.sha1(" ".join(sentence.lower().split()).encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PackedHit:
+    document: Document
+    text: str
+    trimmed: bool
+
+
+@dataclass
+class PackReport:
+    hits: List[PackedHit] = field(default_factory=list)
+    dropped: int = 0
+    trimmed: int = 0
+    duplicate_sentences: int = 0
+    tokens: int = 0
+    budget: int = 0
+
+
+def pack_results(
+    documents: List[Document],
+    query_text: str,
+    token_budget: int,
+    max_share: float = 0.5,
+    window: int = 1,
+) -> PackReport:
+    """
+    Greedily pack ranked hits into a token budget.
+
+    Hits are taken best first. Sentences already packed from a better hit (chunk overlap)
+    are removed. A hit that doesn't fit its share of the remaining budget is trimmed to its
+    most query-relevant sentences, each kept with `window` neighbouring sentences, in
+    document order. Hits that can't contribute anything are dropped.
+
+    Args:
+        documents: Retrieved documents, best first
+        query_text: The query, used to score sentence relevance
+        token_budget: Approximate token budget of all packed text
+        max_share: Maximum share of the remaining budget one hit may take while others remain
+        window: Neighbouring sentences kept around each relevant sentence when trimming
+
+    Returns:
+        PackReport with the packed hits and what was trimmed, dropped or deduplicated
+    """
+    report = PackReport(budget=token_budget)
+    query_terms = set(tokenize(query_text))
+    seen = set()
+
+    for position, doc in enumerate(documents):
+        remaining = token_budget - report.tokens
+        if remaining <= 0:
+            report.dropped += len(documents) - position
+            break
+
+        sentences = []
+        for sentence in split_sentences(doc.page_content):
+            fingerprint = _fingerprint(sentence)
+            if fingerprint in seen:
+                report.duplicate_sentences += 1
+                continue
+            sentences.append((sentence, fingerprint))
+        if not sentences:
+            report.dropped += 1
+            continue
+
+        # While other hits are waiting, one hit can't eat the whole budget
+        is_last = position == len(documents) - 1
+        allowance = remaining if is_last else max(int(remaining * max_share), 1)
+        costs = [estimate_tokens(sentence) for sentence, _ in sentences]
+
+        if sum(costs) <= allowance:
+            keep = list(range(len(sentences)))
+            trimmed = len(sentences) < len(split_sentences(doc.page_content))
+        else:
+            keep = _select_relevant(sentences, costs, query_terms, allowance, window)
+            trimmed = True
+        if not keep:
+            report.dropped += 1
+            continue
+
+        for i in keep:
+            seen.add(sentences[i][1])
+        report.tokens += sum(costs[i] for i in keep)
+        report.trimmed += int(trimmed)
+        report.hits.append(PackedHit(doc, _join(sentences, keep), trimmed))
+
+    return report
+
+
+def _select_relevant(sentences, costs, query_terms, allowance: int, window: int) -> List[int]:
+    """Indices of the most query-relevant sentences (plus neighbours) fitting in allowance, in document order."""
+    def score(i: int) -> float:
+        terms = tokenize(sentences[i][0])
+        if not terms:
+            return 0.0
+        return len(query_terms.intersection(terms)) / len(set(terms)) ** 0.5
+
+    ranked = sorted(range(len(sentences)), key=lambda i: (score(i), -i), reverse=True)
+    keep = set()
+    used = 0
+    for i in ranked:
+        for j in range(max(i - window, 0), min(i + window, len(sentences) - 1) + 1):
+            if j not in keep and used + costs[j] <= allowance:
+                keep.add(j)
+                used += costs[j]
+        if used >= allowance:
+            break
+    return sorted(keep)
+
+
+def _join(sentences, keep: List[int]) -> str:
+    """Join kept sentences, marking the gaps left by trimmed ones."""
+    parts = []
+    previous: Optional[int] = None
+    for i in keep:
+        if previous is not None and i != previous + 1:
+            parts.append("[…]")
+        parts.append(sentences[i][0])
+        previous = i
+    if keep and keep[0] > 0:
+        parts.insert(0, "[…]")
+    if keep and keep[-1] < len(sentences) - 1:
+        parts.append("[…]")
+    return "\n".join(parts)
+
+
+def render(report: PackReport, header: Callable[[Document], str], separator: str) -> str:
+    """
+    Format packed hits as one observation, each under its citation header, with a note of what was cut.
+
+    Args:
+        report: Result of pack_results
+        header: Builds the citation line of a hit (source, page, ...)
+        separator: Text put between hits
+    """
+    blocks = []
+    for hit in report.hits:
+        note = " [trimmed to query-relevant passages]" if hit.trimmed else ""
+        blocks.append(f"{header(hit.document)}{note}\nContent:\n{hit.text}")
+    content = separator.join(blocks)
+
+    notes = []
+    if report.trimmed:
+        notes.append(f"{report.trimmed} result(s) trimmed")
+    if report.dropped:
+        notes.append(f"{report.dropped} lower-ranked result(s) dropped")
+    if report.duplicate_sentences:
+        notes.append(f"{report.duplicate_sentences} duplicated passage(s) from overlapping chunks removed")
+    if notes:
+        content += (
+            f"\n\n[Context packed to ~{report.tokens}/{report.budget} tokens: {', '.join(notes)}. "
+            "Query again with a more specific query or a larger token_budget for the full text.]"
+        )
+    return content
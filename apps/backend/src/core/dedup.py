@@ -0,0 +1,249 @@
+"""Exact (and opt-in near-duplicate, MinHash + LSH) chunk detection maintained next to each vector database collection."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from core.lexical_index import LexicalIndexStore
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Metadata field of a surviving chunk listing the chunks suppressed as its duplicates (JSON string,
+# Chroma metadata values are scalars): [{"id", "source", "source_path", "page_numbers"}, ...]
+DUPLICATES_FIELD = "duplicates"
+# Records kept per chunk: boilerplate repeated in every file would otherwise bloat its metadata
+MAX_RECORDS = 100
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Multiplier combining the word hashes of a shingle
+_SHINGLE_BASE = np.uint64(1_000_003)
+# Bumped when fingerprints change, indexes holding older ones are rebuilt
+HASH_VERSION = 2
+
+
+def dedup_mode() -> Optional[str]:
+    """
+    DEDUP: "exact" (default) skips chunks whose normalized text is already stored, "near" also
+    matches near duplicates, "false" writes every chunk.
+    """
+    mode = os.getenv("DEDUP", "exact").lower()
+    if mode in ("0", "false", "no", "off"):
+        return None
+    return "near" if mode == "near" else "exact"
+
+
+def dedup_enabled() -> bool:
+    return dedup_mode() is not None
+
+
+def duplicate_records(metadata: Optional[dict]) -> List[Dict]:
+    """Chunks recorded as duplicates of a stored chunk, from its metadata."""
+    raw = (metadata or {}).get(DUPLICATES_FIELD)
+    if not raw:
+        return []
+    try:
+        return json.loads(raw)
+    except (TypeError, ValueError):
+        return []
+
+
+def describe_duplicates(metadata: Optional[dict], limit: int = 5) -> str:
+    """ "a.pdf (Page 3), b.docx (Page 1)" for the duplicates of a chunk, "" if none."""
+    records = duplicate_records(metadata)
+    text = ", ".join(f"{record.get('source')} (Page {record.get('page_numbers') or 'Unknown'})" for record in records[:limit])
+    if len(records) > limit:
+        text += f" and {len(records) - limit} more"
+    return text
+
+
+def embeds_avoided_pct(report: Dict[str, int]) -> float:
+    """Share of the chunks that had to be embedded which were skipped as duplicates, in percent."""
+    candidates = report.get("added", 0) + report.get("deduplicated", 0)
+    return round(100.0 * report.get("deduplicated", 0) / candidates, 1) if candidates else 0.0
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    (bands, rows) of the LSH so that pairs above threshold become candidates, minimizing the
+    false positive and (weighted x2, a missed duplicate costs an embedding) false negative areas.
+    """
+    best, best_error = (1, num_perm), float("inf")
+    similarities = np.linspace(0.0, 1.0, 201)
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        probability = 1.0 - (1.0 - similarities ** rows) ** bands
+        # Areas over [0, 1] sampled uniformly
+        false_positive = np.where(similarities < threshold, probability, 0.0).mean()
+        false_negative = np.where(similarities >= threshold, 1.0 - probability, 0.0).mean()
+        error = false_positive + 2.0 * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Fingerprints of the chunks of a collection.
+
+    Exact duplicates are found by the hash of the normalized text (lowercased, whitespace
+    collapsed, punctuation kept). With near=True, near duplicates are chunks whose word shingles have an
+    estimated Jaccard similarity of at least threshold: each chunk gets a MinHash signature, split
+    into LSH bands so only chunks sharing a band are compared. Otherwise no signature is computed.
+
+    The index also maps each suppressed chunk ID to the chunk it was recorded on.
+    """
+
+    def __init__(self, threshold: float = 0.9, num_perm: int = 128, shingle_size: int = 3, seed: int = 1, near: bool = False):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.near = near
+        self.hash_version = HASH_VERSION
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+        self.exact: Dict[str, str] = {}
+        self.fingerprints: Dict[str, Tuple[str, np.ndarray]] = {}
+        self.buckets: List[Dict[bytes, List[str]]] = [{} for _ in range(self.bands)]
+        # suppressed chunk ID -> (surviving chunk ID, document of the suppressed chunk, see VectorDBManager.source_key)
+        self.aliases: Dict[str, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    @property
+    def params(self) -> Tuple[float, int, int, bool, int]:
+        return self.threshold, self.num_perm, self.shingle_size, self.near, self.hash_version
+
+    def fingerprint(self, text: str) -> Tuple[str, np.ndarray]:
+        """(exact hash of the normalized text, MinHash signature of its word shingles, empty unless near)."""
+        # Only case & whitespace are normalized: signs and number formats ("-500" / "500", "1,000" / "1.000") matter
+        normalized = " ".join(text.lower().split())
+        exact = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        if not self.near:
+            return exact, np.zeros(0, dtype=np.uint32)
+        words = _WORD_RE.findall(normalized)
+        hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint64, count=len(words))
+        if len(hashes) > self.shingle_size:
+            shingles = hashes[: len(hashes) - self.shingle_size + 1].copy()
+            for offset in range(1, self.shingle_size):
+                shingles = shingles * _SHINGLE_BASE + hashes[offset: len(hashes) - self.shingle_size + 1 + offset]
+            hashes = np.unique(shingles)
+        if not len(hashes):
+            hashes = np.zeros(1, dtype=np.uint64)
+        # Wrapping uint64 arithmetic, as in the usual (a * x + b) mod p hash family implementations
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return exact, permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        if not self.near:
+            return []
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def find(self, fingerprint: Tuple[str, np.ndarray]) -> Optional[str]:
+        """ID of an indexed chunk duplicating the fingerprinted text, None if there is none."""
+        exact, signature = fingerprint
+        if exact in self.exact:
+            return self.exact[exact]
+        best, best_similarity = None, self.threshold
+        for band, key in enumerate(self._band_keys(signature)):
+            for doc_id in self.buckets[band].get(key, ()):
+                similarity = float(np.mean(self.fingerprints[doc_id][1] == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = doc_id, similarity
+        return best
+
+    def add(self, ids: Iterable[str], documents: Iterable[Document], fingerprints: Optional[List[Tuple[str, np.ndarray]]] = None):
+        """Index stored chunks and the duplicates recorded on them (re-indexing an ID replaces it)."""
+        ids, documents = list(ids), list(documents)
+        fingerprints = fingerprints or [self.fingerprint(doc.page_content) for doc in documents]
+        self.remove([doc_id for doc_id in ids if doc_id in self.fingerprints])
+        for doc_id, doc, (exact, signature) in zip(ids, documents, fingerprints):
+            self.exact.setdefault(exact, doc_id)
+            self.fingerprints[doc_id] = (exact, signature)
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band].setdefault(key, []).append(doc_id)
+            for record in duplicate_records(doc.metadata):
+                self.aliases[record["id"]] = (doc_id, str(record.get("source_path") or record.get("source", "")))
+
+    def remove(self, ids: Iterable[str]):
+        """Forget chunks, along with the duplicates recorded on them."""
+        removed = set()
+        for doc_id in ids:
+            fingerprint = self.fingerprints.pop(doc_id, None)
+            if fingerprint is None:
+                continue
+            removed.add(doc_id)
+            exact, signature = fingerprint
+            if self.exact.get(exact) == doc_id:
+                del self.exact[exact]
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self.buckets[band].get(key)
+                if bucket is not None:
+                    bucket.remove(doc_id)
+                    if not bucket:
+                        del self.buckets[band][key]
+        if removed:
+            self.aliases = {alias: target for alias, target in self.aliases.items() if target[0] not in removed}
+
+    def aliases_of_sources(self, sources: Iterable[str]) -> Dict[str, str]:
+        """Suppressed chunk ID -> surviving chunk ID, for the duplicates coming from the given documents (source keys)."""
+        sources = set(sources)
+        return {alias: survivor for alias, (survivor, source) in self.aliases.items() if source in sources}
+
+
+def _configured_params() -> Tuple[float, int, int, bool, int]:
+    return float(os.getenv("DEDUP_THRESHOLD", 0.9)), int(os.getenv("DEDUP_NUM_PERM", 128)), 3, dedup_mode() == "near", HASH_VERSION
+
+
+def _configured_index() -> NearDuplicateIndex:
+    threshold, num_perm, shingle_size, near, _ = _configured_params()
+    return NearDuplicateIndex(threshold=threshold, num_perm=num_perm, shingle_size=shingle_size, near=near)
+
+
+class DedupIndexStore(LexicalIndexStore):
+    """
+    Process-wide set of duplicate indexes, one per collection, persisted like the lexical
+    indexes (snapshot + journal) in DEDUP_INDEX_DIR (defaults to .cache/dedup), built from the
+    collection content on first use.
+
+    An index built with another DEDUP mode, DEDUP_THRESHOLD or DEDUP_NUM_PERM is rebuilt.
+    """
+
+    label = "near-duplicate"
+
+    def __init__(self, index_dir: Optional[str] = None):
+        super().__init__(index_dir or os.getenv("DEDUP_INDEX_DIR", os.path.join(".cache", "dedup")))
+
+    def _new_index(self) -> NearDuplicateIndex:
+        return _configured_index()
+
+    def _is_current(self, index) -> bool:
+        return isinstance(index, NearDuplicateIndex) and getattr(index, "params", None) == _configured_params()
+
+    def get(self, collection_name: str, loader) -> NearDuplicateIndex:
+        with self._collection_lock(collection_name):
+            index = super().get(collection_name, loader)
+            if not self._is_current(index):
+                # DEDUP changed since the index was loaded
+                self.drop(collection_name)
+                index = super().get(collection_name, loader)
+            return index
+
+    def lock(self, collection_name: str):
+        """Lock to hold from checking chunks against a collection's index until they are written."""
+        return self._collection_lock(collection_name)
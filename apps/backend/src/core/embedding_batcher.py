@@ -0,0 +1,87 @@
+"""Length-bucketed, token-budgeted batching for document embedding."""
+
+import os
+from typing import Iterator, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+from core.cancellation import check_cancelled
+from core.metrics import EMBEDDED_TOKENS
+
+load_dotenv()
+
+
+class LengthBucketedEmbeddings(Embeddings):
+    """
+    Drop-in Embeddings that sorts documents by token length and embeds them in
+    batches bounded by a padded-token budget instead of a fixed count.
+
+    A batch costs roughly (number of texts x longest text) tokens once padded, so
+    grouping texts of similar length keeps tiny heading-only chunks from being padded
+    to the size of 8k-token chunks. Vectors are returned in the original order.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        tokenizer,
+        token_budget: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            embeddings: The embedding model to wrap
+            tokenizer: HuggingFace tokenizer of the embedding model (the one shared with the Chunker)
+            token_budget: Maximum padded tokens per batch (defaults to EMBED_TOKEN_BUDGET or 16384)
+            max_batch_size: Maximum number of texts per batch (defaults to EMBED_MAX_BATCH_SIZE or 64)
+        """
+        self.embeddings = embeddings
+        self.tokenizer = tokenizer
+        self.token_budget = token_budget or int(os.getenv("EMBED_TOKEN_BUDGET", 16384))
+        self.max_batch_size = max_batch_size or int(os.getenv("EMBED_MAX_BATCH_SIZE", 64))
+
+    def token_lengths(self, texts: List[str]) -> List[int]:
+        """Number of tokens of each text, special tokens included."""
+        encoded = self.tokenizer(texts, add_special_tokens=True, truncation=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+
+    def batches(self, lengths: List[int]) -> Iterator[List[int]]:
+        """
+        Group text indices into batches, longest first, so that
+        len(batch) * longest_in_batch never exceeds the token budget.
+
+        A single text longer than the budget gets a batch of its own.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+        batch: List[int] = []
+        longest = 0
+        for i in order:
+            # Sorted descending: the first text of a batch is its longest one
+            longest = longest or max(lengths[i], 1)
+            if batch and (len(batch) + 1 > self.max_batch_size or (len(batch) + 1) * longest > self.token_budget):
+                yield batch
+                batch, longest = [], max(lengths[i], 1)
+            batch.append(i)
+        if batch:
+            yield batch
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents in length-sorted, token-budgeted batches, returned in input order."""
+        if not texts:
+            return []
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        lengths = self.token_lengths(texts)
+        EMBEDDED_TOKENS.inc(sum(lengths))
+        for batch in self.batches(lengths):
+            # Embedding a large document takes minutes on CPU: stop between batches if cancelled
+            check_cancelled()
+            for i, vector in zip(batch, self.embeddings.embed_documents([texts[i] for i in batch])):
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Queries are single texts, nothing to batch."""
+        return self.embeddings.embed_query(text)
@@ -0,0 +1,153 @@
+"""Persistent embedding cache wrapping any LangChain embedding model."""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+_SQL_BATCH = 900
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Drop-in Embeddings that stores every computed vector in SQLite as packed float32
+    and only calls the wrapped model for texts it has never seen.
+
+    Entries are keyed by (model, normalize flag, kind, text hash) and evicted least
+    recently used first once the cache holds more than max_entries vectors.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        normalize: bool = True,
+        path: Optional[str] = None,
+        max_entries: Optional[int] = None,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embeddings: The embedding model to wrap
+            model_name: Name of the wrapped model, part of the cache key
+            normalize: Whether the wrapped model normalizes its vectors, part of the cache key
+            path: SQLite file (defaults to EMBEDDING_CACHE_PATH or .cache/embeddings.sqlite3)
+            max_entries: Maximum number of cached vectors (defaults to EMBEDDING_CACHE_MAX_ENTRIES or 500000)
+        """
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.normalize = normalize
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", os.path.join(".cache", "embeddings.sqlite3"))
+        self.max_entries = max_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 500_000))
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, text: str, kind: str) -> str:
+        prefix = f"{self.model_name}|{int(self.normalize)}|{kind}|"
+        return hashlib.sha256((prefix + text).encode("utf-8")).hexdigest()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Fetch the cached vectors of keys in batches and refresh their recency."""
+        found: Dict[str, List[float]] = {}
+        now = time.time()
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now, *(key for key, _ in rows)],
+                    )
+            self._conn.commit()
+        return found
+
+    def _store(self, items: Dict[str, List[float]]):
+        """Insert new vectors, then evict the least recently used ones if over capacity."""
+        now = time.time()
+        rows = [(key, np.asarray(vec, dtype=np.float32).tobytes(), now) for key, vec in items.items()]
+        with self._lock:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)", rows
+            )
+            self._count += max(cursor.rowcount, 0)
+            overflow = self._count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self._count -= overflow
+                logger.info(f"Evicted {overflow} entries from the embedding cache")
+            self._conn.commit()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        keys = [self._key(text, kind) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        found = self._lookup(unique_keys)
+
+        # Embed each missing text once, even if it appears several times in the batch
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            if kind == "query":
+                vectors = [self.embeddings.embed_query(text) for text in missing.values()]
+            else:
+                vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing.keys(), vectors))
+            self._store(computed)
+            found.update(computed)
+
+        with self._lock:
+            self._hits += len(unique_keys) - len(missing)
+            self._misses += len(missing)
+        return [found[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, only computing the ones missing from the cache."""
+        if not texts:
+            return []
+        return self._embed(texts, "document")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, served from the cache when it was asked before."""
+        return self._embed([text], "query")[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and number of cached vectors."""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "entries": self._count}
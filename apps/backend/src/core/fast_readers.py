@@ -0,0 +1,263 @@
+"""Lightweight streaming readers for plain text and tabular files, bypassing Docling."""
+
+import csv
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+# Extensions handled without Docling, by kind
+FAST_FORMATS = {".txt": "text", ".csv": "table", ".tsv": "table", ".xlsx": "table"}
+
+# Rows / lines tokenized per tokenizer call
+TOKENIZE_BLOCK = 1024
+
+
+def fast_format(path: str) -> Optional[str]:
+    """Kind of fast reader ("text" or "table") handling a file, None when it needs Docling."""
+    return FAST_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def _escape_cell(value) -> str:
+    if value is None:
+        return ""
+    return " ".join(str(value).split()).replace("|", "\\|")
+
+
+def _markdown_row(cells) -> str:
+    return "| " + " | ".join(_escape_cell(cell) for cell in cells) + " |"
+
+
+class FastDocument:
+    """
+    A text or tabular file read lazily, line by line or row by row.
+
+    It stands in for a DoclingDocument in the Parser / Chunker pipeline: `pages` maps page
+    numbers to their names (the only page of a TXT or CSV file, one page per XLSX sheet,
+    like Docling does), `iter_markdown_pages` renders it and `chunk` splits it directly
+    into LangChain Documents with the usual source / page_numbers / title metadata.
+    """
+
+    def __init__(self, path: str, page_range: Optional[Tuple[int, int]] = None):
+        """
+        Args:
+            path: Path to a .txt, .csv, .tsv or .xlsx file
+            page_range: Optional (first_page, last_page), 1-based and inclusive, to only render these pages
+        """
+        self.path = path
+        self.kind = fast_format(path)
+        if self.kind is None:
+            raise ValueError(f"No fast reader for {path}")
+        self.filename = os.path.basename(path)
+        self.extension = os.path.splitext(path)[1].lower()
+        self.page_range = page_range
+        self.pages: Dict[int, str] = self._read_pages()
+
+    def _read_pages(self) -> Dict[int, str]:
+        if self.extension == ".xlsx":
+            workbook = self._open_workbook()
+            try:
+                return {i: name for i, name in enumerate(workbook.sheetnames, start=1)}
+            finally:
+                workbook.close()
+        return {1: self.filename}
+
+    def _in_range(self, page_no: int) -> bool:
+        return self.page_range is None or self.page_range[0] <= page_no <= self.page_range[1]
+
+    def _open_workbook(self):
+        from openpyxl import load_workbook
+
+        # read_only streams rows from the XML instead of loading the whole sheet
+        return load_workbook(self.path, read_only=True, data_only=True)
+
+    def iter_lines(self) -> Iterator[Tuple[int, str]]:
+        """(page_number, line) of a text file, form feeds starting a new page."""
+        page_no = 1
+        with open(self.path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                parts = line.split("\f")
+                for i, part in enumerate(parts):
+                    if i:
+                        page_no += 1
+                    if part or i == len(parts) - 1:
+                        yield page_no, part.rstrip("\n")
+
+    def iter_tables(self) -> Iterator[Tuple[int, str, List, Iterator[List]]]:
+        """
+        (page_number, title, header, rows) of every table: the CSV file, or each XLSX sheet.
+        The first non-empty row is the header, empty rows are skipped.
+        """
+        if self.extension == ".xlsx":
+            workbook = self._open_workbook()
+            try:
+                for page_no, sheet in enumerate(workbook.worksheets, start=1):
+                    rows = (list(row) for row in sheet.iter_rows(values_only=True) if any(cell is not None for cell in row))
+                    header = next(rows, None)
+                    if header is not None:
+                        yield page_no, sheet.title, header, rows
+            finally:
+                workbook.close()
+            return
+
+        with open(self.path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+            if self.extension == ".tsv":
+                delimiter = "\t"
+            else:
+                try:
+                    delimiter = csv.Sniffer().sniff(f.read(64 * 1024), delimiters=",;\t|").delimiter
+                except csv.Error:
+                    delimiter = ","
+                f.seek(0)
+            rows = (row for row in csv.reader(f, delimiter=delimiter) if any(cell.strip() for cell in row))
+            header = next(rows, None)
+            if header is not None:
+                yield 1, None, header, rows
+
+    def iter_markdown_pages(self) -> Iterator[Tuple[int, str]]:
+        """(page_number, markdown) of every page in range: the text, or the tables as markdown tables."""
+        if self.kind == "text":
+            page_no, lines = 1, []
+            for line_page, line in self.iter_lines():
+                if line_page != page_no:
+                    if self._in_range(page_no):
+                        yield page_no, "\n".join(lines)
+                    if self.page_range is not None and line_page > self.page_range[1]:
+                        return
+                    page_no, lines = line_page, []
+                if self._in_range(line_page):
+                    lines.append(line)
+            if self._in_range(page_no):
+                yield page_no, "\n".join(lines)
+            return
+
+        for page_no, title, header, rows in self.iter_tables():
+            if not self._in_range(page_no):
+                continue
+            lines = [f"## {title}", ""] if title else []
+            lines += [_markdown_row(header), _markdown_row(["---"] * len(header))]
+            lines += [_markdown_row(row) for row in rows]
+            yield page_no, "\n".join(lines)
+
+    def export_to_markdown(self) -> str:
+        """Markdown of the whole document (pages in range)."""
+        return "\n\n".join(markdown for _, markdown in self.iter_markdown_pages())
+
+    def chunk(self, tokenizer, max_tokens: int, overlap: int) -> List[Document]:
+        """
+        Split the file into chunks of at most max_tokens tokens.
+
+        Tables are cut into batches of whole rows, each chunk repeating the header so it reads
+        on its own. Text is cut into windows of whole lines, consecutive windows sharing about
+        overlap tokens of lines. A line or row longer than a chunk is first cut into windows of
+        whole words (see _fitting).
+
+        Args:
+            tokenizer: HuggingFace tokenizer of the embedding model
+            max_tokens: Maximum number of tokens per chunk
+            overlap: Number of overlapping tokens between text chunks
+
+        Returns:
+            List of LangChain Document objects with metadata
+        """
+        if self.kind == "text":
+            return list(self._chunk_lines(tokenizer, max_tokens, overlap))
+        return list(self._chunk_rows(tokenizer, max_tokens))
+
+    def _document(self, text: str, page_numbers, title: Optional[str]) -> Document:
+        return Document(
+            page_content=text,
+            metadata={
+                "source": self.filename,
+                "page_numbers": ",".join(str(page_no) for page_no in sorted(set(page_numbers))),
+                "title": title,
+            },
+        )
+
+    @staticmethod
+    def _with_token_counts(tokenizer, items: Iterator[Tuple], text_index: int) -> Iterator[Tuple]:
+        """Append the token count of each item's text, tokenizing in blocks."""
+        block = []
+        for item in items:
+            block.append(item)
+            if len(block) >= TOKENIZE_BLOCK:
+                yield from FastDocument._count_block(tokenizer, block, text_index)
+                block = []
+        if block:
+            yield from FastDocument._count_block(tokenizer, block, text_index)
+
+    @staticmethod
+    def _count_block(tokenizer, block, text_index):
+        encoded = tokenizer([item[text_index] for item in block], add_special_tokens=False)["input_ids"]
+        # +1 for the newline joining it to its neighbours
+        return [(*item, len(ids) + 1) for item, ids in zip(block, encoded)]
+
+    @staticmethod
+    def _fitting(tokenizer, items: Iterator[Tuple], text_index: int, max_tokens: int) -> Iterator[Tuple]:
+        """
+        _with_token_counts, the text of an item over max_tokens being cut into several items of
+        whole words, like the Docling chunker splits oversized text. A single word longer than
+        that (e.g. an encoded blob) is cut into slices of characters, its count being estimated.
+        """
+        for item in FastDocument._with_token_counts(tokenizer, items, text_index):
+            if item[-1] <= max_tokens:
+                yield item
+                continue
+
+            def piece(text: str, tokens: int) -> Tuple:
+                return (*item[:text_index], text, *item[text_index + 1:-1], tokens)
+
+            words, used = [], 0
+            for word, tokens in FastDocument._with_token_counts(tokenizer, ((word,) for word in item[text_index].split()), 0):
+                if tokens > max_tokens:
+                    # Slices of about half a chunk, tokenization of arbitrary cuts is only estimated
+                    size = max(len(word) * max(max_tokens // 2, 1) // tokens, 1)
+                    slices = [(word[i:i + size], -(-tokens * min(size, len(word) - i) // len(word))) for i in range(0, len(word), size)]
+                else:
+                    slices = [(word, tokens)]
+                for text, text_tokens in slices:
+                    if words and used + text_tokens > max_tokens:
+                        yield piece(" ".join(words), used)
+                        words, used = [], 0
+                    words.append(text)
+                    used += text_tokens
+            if words:
+                yield piece(" ".join(words), used)
+
+    def _chunk_lines(self, tokenizer, max_tokens: int, overlap: int) -> Iterator[Document]:
+        window: List[Tuple[int, str, int]] = []
+        used = 0
+        fresh = False
+        for page_no, line, tokens in self._fitting(tokenizer, self.iter_lines(), 1, max_tokens):
+            if window and fresh and used + tokens > max_tokens:
+                yield self._document("\n".join(l for _, l, _ in window), (p for p, _, _ in window), None)
+                # Carry the trailing lines (up to overlap tokens) into the next window
+                kept, kept_tokens = [], 0
+                for entry in reversed(window):
+                    if kept_tokens + entry[2] > overlap or kept_tokens + entry[2] + tokens > max_tokens:
+                        break
+                    kept.insert(0, entry)
+                    kept_tokens += entry[2]
+                window, used, fresh = kept, kept_tokens, False
+            window.append((page_no, line, tokens))
+            used += tokens
+            fresh = fresh or bool(line.strip())
+        if fresh:
+            yield self._document("\n".join(l for _, l, _ in window), (p for p, _, _ in window), None)
+
+    def _chunk_rows(self, tokenizer, max_tokens: int) -> Iterator[Document]:
+        for page_no, title, header, rows in self.iter_tables():
+            header_text = _markdown_row(header) + "\n" + _markdown_row(["---"] * len(header))
+            header_tokens = len(tokenizer(header_text, add_special_tokens=False)["input_ids"]) + 1
+            lines = ((_markdown_row(row),) for row in rows)
+
+            batch: List[str] = []
+            used = header_tokens
+            for line, tokens in self._fitting(tokenizer, lines, 0, max(max_tokens - header_tokens, 1)):
+                if batch and used + tokens > max_tokens:
+                    yield self._document(header_text + "\n" + "\n".join(batch), [page_no], title)
+                    batch, used = [], header_tokens
+                batch.append(line)
+                used += tokens
+            if batch:
+                yield self._document(header_text + "\n" + "\n".join(batch), [page_no], title)
@@ -0,0 +1,271 @@
+"""BM25 lexical index maintained next to each vector database collection."""
+
+import logging
+import math
+import os
+import pickle
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+from core.metadata_filter import matches_filter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Words, plus identifiers joined by - . / (e.g. "INV-2024-0042", "4.2.1", "PN/778")
+_TOKEN_RE = re.compile(r"\w+(?:[-./]\w+)*", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased tokens; compound identifiers are kept whole and also split into their parts."""
+    tokens = []
+    for match in _TOKEN_RE.findall(text.lower()):
+        tokens.append(match)
+        if not match.isalnum():
+            tokens.extend(part for part in re.split(r"[-./]", match) if part)
+    return tokens
+
+
+class BM25Index:
+    """Inverted index scored with Okapi BM25, updated incrementally as chunks are added or removed."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_len: Dict[str, int] = {}
+        self.docs: Dict[str, Tuple[str, dict]] = {}
+        self.total_len = 0
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, ids: List[str], documents: List[Document]):
+        """Index chunks (re-indexing an existing ID replaces it)."""
+        self.remove([i for i in ids if i in self.docs])
+        for doc_id, doc in zip(ids, documents):
+            terms = Counter(tokenize(doc.page_content))
+            for term, tf in terms.items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+            length = sum(terms.values())
+            self.doc_len[doc_id] = length
+            self.total_len += length
+            self.docs[doc_id] = (doc.page_content, dict(doc.metadata))
+
+    def remove(self, ids: List[str]):
+        """Remove chunks from the index."""
+        for doc_id in ids:
+            if doc_id not in self.docs:
+                continue
+            text, _ = self.docs.pop(doc_id)
+            for term in set(tokenize(text)):
+                posting = self.postings.get(term)
+                if posting is not None:
+                    posting.pop(doc_id, None)
+                    if not posting:
+                        del self.postings[term]
+            self.total_len -= self.doc_len.pop(doc_id)
+
+    def search(self, query: str, k: int = 5, filter_metadata: Optional[dict] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k chunks for a query.
+
+        Returns:
+            List of (chunk ID, BM25 score), best first
+        """
+        n_docs = len(self.docs)
+        if not n_docs:
+            return []
+        avg_len = self.total_len / n_docs
+
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                norm = tf + self.k1 * (1 - self.b + self.b * self.doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if filter_metadata:
+            ranked = [(i, s) for i, s in ranked if matches_filter(self.docs[i][1], filter_metadata)]
+        return ranked[:k]
+
+    def get_document(self, doc_id: str) -> Document:
+        text, metadata = self.docs[doc_id]
+        return Document(page_content=text, metadata=metadata, id=doc_id)
+
+
+class LexicalIndexStore:
+    """
+    Process-wide set of BM25 indexes, one per collection, persisted in LEXICAL_INDEX_DIR
+    (defaults to .cache/lexical) as a pickled snapshot plus a journal of the changes made since.
+
+    Each update is appended to the journal, which is folded into a new snapshot once it
+    outgrows it, so a write costs its own size rather than the whole index. An index missing
+    on disk, or whose journal is truncated, is rebuilt from the collection content on first use.
+
+    Indexes are changed in place: reads and writes of a collection hold its lock.
+    """
+
+    label = "lexical"
+
+    def __init__(self, index_dir: Optional[str] = None):
+        self.index_dir = index_dir or os.getenv("LEXICAL_INDEX_DIR", os.path.join(".cache", "lexical"))
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._indexes: Dict[str, BM25Index] = {}
+        self._snapshot_bytes: Dict[str, int] = {}
+        self._locks: Dict[str, threading.RLock] = {}
+        self._lock = threading.Lock()
+
+    def _new_index(self) -> BM25Index:
+        return BM25Index()
+
+    def _is_current(self, index) -> bool:
+        """Whether an index read from disk can be used as is."""
+        return isinstance(index, BM25Index)
+
+    def _path(self, collection_name: str) -> str:
+        return os.path.join(self.index_dir, f"{collection_name}.pkl")
+
+    def _journal_path(self, collection_name: str) -> str:
+        return os.path.join(self.index_dir, f"{collection_name}.journal")
+
+    def _collection_lock(self, collection_name: str) -> threading.RLock:
+        with self._lock:
+            return self._locks.setdefault(collection_name, threading.RLock())
+
+    def get(self, collection_name: str, loader: Callable[[], Tuple[List[str], List[Document]]]):
+        """
+        Index of a collection, loaded from disk or built with loader.
+
+        Args:
+            collection_name: Name of the collection
+            loader: Returns (ids, documents) of the whole collection, used when no index exists yet
+        """
+        if collection_name in self._indexes:
+            return self._indexes[collection_name]
+
+        with self._collection_lock(collection_name):
+            if collection_name in self._indexes:
+                return self._indexes[collection_name]
+
+            index = None
+            path = self._path(collection_name)
+            if os.path.isfile(path):
+                try:
+                    with open(path, "rb") as f:
+                        index = pickle.load(f)
+                    self._snapshot_bytes[collection_name] = os.path.getsize(path)
+                except Exception as e:
+                    logger.warning(f"Rebuilding unreadable {self.label} index {path}: {e}")
+                if index is not None and not self._is_current(index):
+                    logger.info(f"Rebuilding outdated {self.label} index {path}")
+                    index = None
+                if index is not None and not self._replay(index, self._journal_path(collection_name)):
+                    logger.warning(f"Rebuilding {self.label} index {path}, its journal is truncated")
+                    index = None
+
+            if index is None:
+                index = self._new_index()
+                ids, documents = loader()
+                index.add(ids, documents)
+                logger.info(f"Built {self.label} index of '{collection_name}' ({len(index)} chunks)")
+                self._indexes[collection_name] = index
+                self._save(collection_name)
+
+            self._indexes[collection_name] = index
+            return index
+
+    @staticmethod
+    def _replay(index, journal_path: str) -> bool:
+        """Apply the journaled changes to an index read from its snapshot. False if the journal is truncated."""
+        if not os.path.isfile(journal_path):
+            return True
+        with open(journal_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            while f.tell() < size:
+                try:
+                    method, *args = pickle.load(f)
+                except Exception:
+                    return False
+                # Changes are per chunk ID, replaying ones the snapshot already holds is harmless
+                getattr(index, method)(*args)
+        return True
+
+    def _save(self, collection_name: str):
+        """Write a snapshot of a collection's index, replacing its journal."""
+        path = self._path(collection_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self._indexes[collection_name], f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._snapshot_bytes[collection_name] = f.tell()
+        os.replace(tmp_path, path)
+        try:
+            os.remove(self._journal_path(collection_name))
+        except OSError:
+            pass
+
+    def _append(self, collection_name: str, *changes: Tuple):
+        """Persist changes ((method, *args) of the index) applied since the snapshot, compacting when the journal outgrows it."""
+        with open(self._journal_path(collection_name), "ab") as f:
+            for change in changes:
+                pickle.dump(change, f, protocol=pickle.HIGHEST_PROTOCOL)
+            journal_bytes = f.tell()
+        if journal_bytes > self._snapshot_bytes.get(collection_name, 0):
+            self._save(collection_name)
+
+    def update(self, collection_name: str, loader, add: Tuple[List, ...] = ((), ()), remove: List[str] = ()):
+        """
+        Apply added and removed chunks to a collection's index and persist them.
+
+        Args:
+            collection_name: Name of the collection
+            loader: Returns (ids, documents) of the whole collection, used when no index exists yet
+            add: (ids, documents, *extra) arguments of the index's add method
+            remove: IDs of the removed chunks
+        """
+        with self._collection_lock(collection_name):
+            index = self.get(collection_name, loader)
+            changes = []
+            if remove:
+                changes.append(("remove", list(remove)))
+            if add[0]:
+                changes.append(("add", *[list(part) for part in add]))
+            for method, *args in changes:
+                getattr(index, method)(*args)
+            if changes:
+                self._append(collection_name, *changes)
+
+    def search(
+        self, collection_name: str, loader, query: str, k: int = 5, filter_metadata: Optional[dict] = None
+    ) -> List[Document]:
+        """Top-k chunks of a collection for a query (BM25Index.search), read under the collection's lock."""
+        with self._collection_lock(collection_name):
+            index = self.get(collection_name, loader)
+            return [index.get_document(doc_id) for doc_id, _ in index.search(query, k, filter_metadata)]
+
+    def rebuild(self, collection_name: str, loader: Callable[[], Tuple[List[str], List[Document]]]):
+        """Replace the index of a collection by one built with loader, e.g. after a bulk import."""
+        with self._collection_lock(collection_name):
+            self.drop(collection_name)
+            return self.get(collection_name, loader)
+
+    def drop(self, collection_name: str):
+        """Forget the index of a deleted collection."""
+        with self._collection_lock(collection_name):
+            self._indexes.pop(collection_name, None)
+            self._snapshot_bytes.pop(collection_name, None)
+            for path in (self._path(collection_name), self._journal_path(collection_name)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
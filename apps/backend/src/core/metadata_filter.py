@@ -0,0 +1,53 @@
+"""In-process evaluation of Chroma-style `where` metadata filters."""
+
+from typing import Any, Dict, Optional
+
+_OPERATORS = {
+    "$eq": lambda value, target: value == target,
+    "$ne": lambda value, target: value != target,
+    "$gt": lambda value, target: value is not None and value > target,
+    "$gte": lambda value, target: value is not None and value >= target,
+    "$lt": lambda value, target: value is not None and value < target,
+    "$lte": lambda value, target: value is not None and value <= target,
+    "$in": lambda value, target: value in target,
+    "$nin": lambda value, target: value not in target,
+}
+
+
+def matches_filter(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """
+    Check a metadata dict against a Chroma `where` filter.
+
+    Supports field equality ({"source": "a.pdf"}), the comparison operators
+    $eq/$ne/$gt/$gte/$lt/$lte/$in/$nin and the logical operators $and/$or.
+
+    Args:
+        metadata: Metadata of a chunk
+        where: Chroma-style filter, None matches everything
+
+    Returns:
+        True if the metadata satisfies the filter
+    """
+    if not where:
+        return True
+
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, sub) for sub in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, target in condition.items():
+                if op not in _OPERATORS:
+                    raise ValueError(f"Unsupported filter operator '{op}'")
+                try:
+                    if not _OPERATORS[op](value, target):
+                        return False
+                except TypeError:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
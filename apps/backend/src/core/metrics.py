@@ -0,0 +1,55 @@
+"""Process-wide metrics (counters and histograms) exposed with prometheus-client."""
+
+from prometheus_client import Counter, Histogram
+
+# Seconds, from a cached query to a long OCR conversion
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def total(metric, sample: str = "_total") -> float:
+    """
+    Sum of a metric's samples over every label set: the total of a counter, or with
+    sample="_sum" / "_count" the sum / number of the values observed by a histogram.
+    """
+    return sum(s.value for family in metric.collect() for s in family.samples if s.name == family.name + sample)
+
+
+# Ingestion (ragify) path
+PARSE_SECONDS = Histogram(
+    "autoragent_parse_seconds", "Time to convert a document (parse cache misses)", ["profile"], buckets=DEFAULT_BUCKETS
+)
+PAGES = Counter("autoragent_pages_parsed", "Pages converted by Docling or read by the fast readers")
+CHUNK_SECONDS = Histogram("autoragent_chunk_seconds", "Time to chunk a parsed document", buckets=DEFAULT_BUCKETS)
+CHUNKS = Counter("autoragent_chunks_produced", "Chunks produced by the chunker")
+EMBED_SECONDS = Histogram(
+    "autoragent_embed_seconds", "Time to embed a batch of chunks written to a collection", buckets=DEFAULT_BUCKETS
+)
+EMBEDDED_TOKENS = Counter("autoragent_embedded_tokens", "Tokens of the documents embedded by the model (embedding cache misses)")
+WRITE_SECONDS = Histogram(
+    "autoragent_write_seconds", "Time to write a batch of embedded chunks to the vector database", buckets=DEFAULT_BUCKETS
+)
+WRITTEN_CHUNKS = Counter("autoragent_written_chunks", "Chunks written to the vector database")
+DEDUPLICATED_CHUNKS = Counter(
+    "autoragent_deduplicated_chunks", "Chunks neither embedded nor written because they duplicate a chunk of the collection", ["match"]
+)
+
+# Retrieval path
+QUERY_EMBED_SECONDS = Histogram("autoragent_query_embed_seconds", "Time to embed a query", buckets=DEFAULT_BUCKETS)
+QUERY_SEARCH_SECONDS = Histogram(
+    "autoragent_query_search_seconds",
+    "Time to search a collection (query cache misses)",
+    ["collection", "retriever"],
+    buckets=DEFAULT_BUCKETS,
+)
+
+# Chat path
+CHAT_QUEUE_SECONDS = Histogram("autoragent_chat_queue_seconds", "Time a /chat request waited for a run slot", buckets=DEFAULT_BUCKETS)
+CHAT_TTFB_SECONDS = Histogram(
+    "autoragent_chat_ttfb_seconds", "Time from the start of a /chat run to its first streamed line", buckets=DEFAULT_BUCKETS
+)
+CHAT_DURATION_SECONDS = Histogram(
+    "autoragent_chat_duration_seconds", "Total duration of a /chat run", ["outcome"], buckets=DEFAULT_BUCKETS
+)
+AGENT_STEPS = Histogram(
+    "autoragent_agent_steps", "Agent steps (LLM calls) per turn", buckets=(1, 2, 3, 4, 5, 6, 8, 10, 12, 15, 20, 30)
+)
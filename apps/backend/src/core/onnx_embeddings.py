@@ -0,0 +1,133 @@
+"""ONNX Runtime CPU backend for the embedding model, with dynamic int8 quantization."""
+
+import logging
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+from langchain_core.embeddings import Embeddings
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Runs a HuggingFace encoder (bge-m3 by default) through onnxruntime on CPU.
+
+    Output contract matches the HuggingFaceEmbeddings used by VectorDBManager:
+    CLS pooling of the last hidden state, L2-normalized.
+
+    The ONNX graph is exported from the HuggingFace checkpoint on first use and, when
+    quantize is set, converted with dynamic int8 quantization. Exporting needs torch and
+    the optional `onnx` package; a pre-exported model placed in model_dir only needs onnxruntime.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        tokenizer,
+        quantize: bool = True,
+        model_dir: Optional[str] = None,
+        max_length: int = 8192,
+        threads: Optional[int] = None,
+    ):
+        """
+        Initialize the backend, exporting/quantizing the model if needed.
+
+        Args:
+            model_name: Name of the HuggingFace embedding model
+            tokenizer: HuggingFace tokenizer of the model
+            quantize: Use the dynamically int8-quantized graph instead of fp32
+            model_dir: Folder holding the exported graphs (defaults to ONNX_MODEL_DIR or .cache/onnx/<model>)
+            max_length: Maximum number of tokens per text, longer texts are truncated
+            threads: Intra-op threads of the onnxruntime session (defaults to ONNX_THREADS or onnxruntime's choice)
+        """
+        import onnxruntime as ort
+
+        self.model_name = model_name
+        self.tokenizer = tokenizer
+        self.max_length = max_length
+        self.model_dir = model_dir or os.getenv(
+            "ONNX_MODEL_DIR", os.path.join(".cache", "onnx", model_name.replace("/", "--"))
+        )
+
+        path = self._ensure_model(quantize)
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        threads = threads or int(os.getenv("ONNX_THREADS", 0))
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        logger.info(f"Loaded ONNX embedding model from {path}")
+
+    def _ensure_model(self, quantize: bool) -> str:
+        """Return the path of the ONNX graph, exporting and quantizing it on first use."""
+        fp32_path = os.path.join(self.model_dir, "model.onnx")
+        int8_path = os.path.join(self.model_dir, "model_int8.onnx")
+
+        if not os.path.isfile(fp32_path) and not (quantize and os.path.isfile(int8_path)):
+            self._export(fp32_path)
+
+        if not quantize:
+            return fp32_path
+
+        if not os.path.isfile(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            start = time.perf_counter()
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8, use_external_data_format=True)
+            logger.info(f"Quantized {fp32_path} to int8 in {time.perf_counter() - start:.2f}s")
+        return int8_path
+
+    def _export(self, path: str):
+        """Export the HuggingFace checkpoint to ONNX with dynamic batch & sequence axes."""
+        import torch
+        from transformers import AutoModel
+
+        os.makedirs(self.model_dir, exist_ok=True)
+        start = time.perf_counter()
+        model = AutoModel.from_pretrained(self.model_name).eval()
+        sample = self.tokenizer(["export sample"], return_tensors="pt")
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                (sample["input_ids"], sample["attention_mask"]),
+                path,
+                input_names=["input_ids", "attention_mask"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "sequence"},
+                    "attention_mask": {0: "batch", 1: "sequence"},
+                    "last_hidden_state": {0: "batch", 1: "sequence"},
+                },
+                opset_version=17,
+                dynamo=False,
+            )
+        logger.info(f"Exported {self.model_name} to {path} in {time.perf_counter() - start:.2f}s")
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        encoded = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_length, return_tensors="np"
+        )
+        inputs = {name: encoded[name].astype(np.int64) for name in ("input_ids", "attention_mask") if name in self.input_names}
+        last_hidden_state = self.session.run(None, inputs)[0]
+
+        # CLS pooling + L2 normalization, same as bge-m3's sentence-transformers config
+        cls = last_hidden_state[:, 0]
+        cls = cls / np.clip(np.linalg.norm(cls, axis=1, keepdims=True), 1e-12, None)
+        return cls.astype(np.float32).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch of documents (batching is left to LengthBucketedEmbeddings)."""
+        if not texts:
+            return []
+        return self._encode(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._encode([text])[0]
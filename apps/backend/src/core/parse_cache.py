@@ -0,0 +1,154 @@
+"""Content-addressed on-disk cache of parsed Docling documents."""
+
+import hashlib
+import logging
+import os
+import threading
+from importlib.metadata import PackageNotFoundError, version
+from typing import Dict, Optional
+
+from docling_core.types.doc import DoclingDocument
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+try:
+    DOCLING_VERSION = version("docling")
+except PackageNotFoundError:
+    DOCLING_VERSION = "unknown"
+
+
+class ParseCache:
+    """
+    Stores serialized DoclingDocuments keyed by the file content hash plus the
+    converter options, so the same file is never converted twice with the same settings.
+
+    The cache is bounded in size; once over budget the least recently used entries
+    are evicted (recency is tracked with the entry file's modification time, which
+    keeps it valid across processes sharing the same folder).
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir: Folder holding the cache entries (defaults to PARSE_CACHE_DIR or .cache/parse)
+            max_bytes: Maximum total size of the cache (defaults to PARSE_CACHE_MAX_MB, 2048 MB)
+        """
+        self.cache_dir = cache_dir or os.getenv("PARSE_CACHE_DIR", os.path.join(".cache", "parse"))
+        self.max_bytes = max_bytes or int(os.getenv("PARSE_CACHE_MAX_MB", 2048)) * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bytes_saved = 0
+
+    @staticmethod
+    def file_hash(path: str) -> str:
+        """SHA-256 of the file content, read in 1 MB blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def make_key(self, path: str, options: str) -> str:
+        """Cache key of a file for the given converter/pipeline options."""
+        raw = f"{self.file_hash(path)}|docling={DOCLING_VERSION}|{options}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def load(self, path: str, options: str = "default") -> Optional[DoclingDocument]:
+        """
+        Load the cached document of a file.
+
+        Args:
+            path: Path to the source file
+            options: Fingerprint of the converter/pipeline options used to parse it
+
+        Returns:
+            The cached DoclingDocument, or None on a miss
+        """
+        entry = self._entry_path(self.make_key(path, options))
+        try:
+            with open(entry, "r", encoding="utf-8") as f:
+                doc = DoclingDocument.model_validate_json(f.read())
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Dropping unreadable parse cache entry {entry}: {e}")
+            self._remove(entry)
+            with self._lock:
+                self._misses += 1
+            return None
+
+        # Refresh recency for LRU eviction
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        with self._lock:
+            self._hits += 1
+            self._bytes_saved += os.path.getsize(path)
+        return doc
+
+    def store(self, path: str, doc: DoclingDocument, options: str = "default"):
+        """
+        Save a parsed document and evict old entries if the cache is over budget.
+
+        Args:
+            path: Path to the source file
+            doc: Parsed DoclingDocument
+            options: Fingerprint of the converter/pipeline options used to parse it
+        """
+        entry = self._entry_path(self.make_key(path, options))
+        tmp_path = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(doc.model_dump_json())
+        # Atomic swap so concurrent readers (threads or worker processes) never see partial entries
+        os.replace(tmp_path, entry)
+        self._evict()
+
+    def _remove(self, entry: str):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as it:
+            for e in it:
+                if e.is_file() and e.name.endswith(".json"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+                    total += st.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        for _, size, entry in sorted(entries):
+            self._remove(entry)
+            total -= size
+            logger.info(f"Evicted parse cache entry {os.path.basename(entry)}")
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and the number of source bytes that were not reconverted."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "bytes_saved": self._bytes_saved,
+            }
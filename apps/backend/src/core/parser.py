@@ -1,28 +1,222 @@
 """Parser module for converting PDF documents to text/markdown."""
 
-import os,time,logging
-from docling.document_converter import DocumentConverter
+import os,re,sys,time,logging
+from typing import Dict, Iterator, Optional, Tuple
+
+import pypdfium2
+from docling_core.transforms.serializer.common import create_ser_result
+from docling_core.transforms.serializer.markdown import MarkdownDocSerializer, MarkdownParams
+
+from core.fast_readers import FastDocument, fast_format
+from core.metrics import PAGES, PARSE_SECONDS
+from core.registry import registry
 
 logger = logging.getLogger(__name__)
 
+# Docling PDF pipeline settings per profile (PdfPipelineOptions fields, table_mode = TableFormer mode)
+PDF_PROFILES = {
+    # Text layer used as is, no OCR nor table-structure model
+    "fast": {"do_ocr": False, "do_table_structure": False},
+    # OCR where needed, fast TableFormer
+    "balanced": {"do_ocr": True, "do_table_structure": True, "table_mode": "fast"},
+    # OCR, accurate TableFormer with cell matching (Docling's defaults)
+    "accurate": {"do_ocr": True, "do_table_structure": True, "table_mode": "accurate"},
+}
+# "auto" is "balanced", without OCR for born-digital PDFs
+PARSE_PROFILES = ("auto", *PDF_PROFILES)
+
+# Docling timing keys grouped into the stages logged per document
+TIMING_STAGES = {
+    "page_init": "preprocess",
+    "page_parse": "text",
+    "layout": "layout",
+    "ocr": "ocr",
+    "table_structure": "tables",
+    "page_assemble": "assembly",
+    "reading_order": "assembly",
+    "doc_assemble": "assembly",
+    "doc_enrich": "enrichment",
+}
+
+_PAGE_BREAK_RE = re.compile(r"<!-- page-break (\d+)->(\d+) -->")
+# Separator of the plain markdown export, when the page-marking serializer can't be used
+_PAGE_BREAK_PLACEHOLDER = "<!-- page-break -->"
+
+
+class _PageMarkedMarkdownSerializer(MarkdownDocSerializer):
+    """
+    Markdown serializer leaving a marker with the real page numbers at every page break.
+
+    Docling's own export replaces each break with the placeholder one str.replace at a time
+    (a full copy of the document per page); here the markers are kept so the text can be
+    split into pages in a single pass.
+    """
+
+    def _create_page_break(self, node) -> str:
+        return f"<!-- page-break {node.prev_page}->{node.next_page} -->"
+
+    def serialize_doc(self, *, parts, **kwargs):
+        return create_ser_result(text="\n\n".join(p.text for p in parts if p.text), span_source=parts)
+
+
+# _create_page_break is a private docling-core hook (docling-core is pinned to the 2.x series):
+# without it, pages are split on the placeholder of the plain export (see Parser.iter_markdown_pages)
+_PAGE_MARKERS = callable(getattr(MarkdownDocSerializer, "_create_page_break", None))
+
+
+def is_born_digital(path: str, sample_pages: int = 8, min_chars: int = 32, min_share: float = 0.8) -> bool:
+    """
+    Whether a PDF has a usable text layer, so OCR can be skipped.
+
+    Up to sample_pages pages spread over the document are checked with pypdfium2 (no rendering);
+    the PDF is born-digital when at least min_share of them hold min_chars characters or more.
+
+    Args:
+        path: Path to the PDF
+        sample_pages: Number of pages checked
+        min_chars: Characters a page needs in its text layer to count as text
+        min_share: Share of sampled pages that must have text
+    """
+    pdf = pypdfium2.PdfDocument(path)
+    try:
+        count = len(pdf)
+        if count == 0:
+            return False
+        step = max(count / sample_pages, 1)
+        indices = sorted({int(i * step) for i in range(min(sample_pages, count))})
+        with_text = 0
+        for index in indices:
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                if textpage.count_chars() >= min_chars:
+                    with_text += 1
+            finally:
+                textpage.close()
+                page.close()
+        return with_text >= min_share * len(indices)
+    finally:
+        pdf.close()
+
+
+def stage_timings(timings: dict) -> Dict[str, float]:
+    """Seconds spent per stage (layout, ocr, tables, assembly...) from Docling's conversion timings, cumulative over pages."""
+    stages: Dict[str, float] = {}
+    for key, item in timings.items():
+        stage = TIMING_STAGES.get(key)
+        if stage is not None:
+            stages[stage] = stages.get(stage, 0.0) + sum(item.times)
+    return stages
+
+
+def format_timings(stages: Dict[str, float]) -> str:
+    return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items()) or "no timings recorded"
+
+
+def record_conversion(profile: str, seconds: float, pages: int):
+    """Record a Docling conversion in the metrics (also called for conversions made in pool processes)."""
+    PARSE_SECONDS.labels(profile=profile).observe(seconds)
+    PAGES.inc(pages)
+
+
+def parse_page_range(spec: str, page_count: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Parse a 1-based, inclusive page range such as "1-10", "7" or "20-" (to the end).
+
+    Args:
+        spec: The page range
+        page_count: Number of pages of the document, if known, to clamp the range and validate it
+
+    Returns:
+        (first_page, last_page) tuple, as accepted by Docling's page_range
+
+    Raises:
+        ValueError: If the range is malformed or outside the document
+    """
+    first, sep, last = spec.replace(" ", "").partition("-")
+    try:
+        start = int(first)
+        if last:
+            end = int(last)
+        else:
+            end = (page_count or sys.maxsize) if sep else start
+    except ValueError:
+        raise ValueError(f"Invalid page range '{spec}', expected e.g. '1-10', '7' or '20-'")
+    if page_count is not None:
+        end = min(end, page_count)
+        if start > page_count:
+            raise ValueError(f"Page range '{spec}' starts after the last page ({page_count})")
+    if start < 1 or end < start:
+        raise ValueError(f"Invalid page range '{spec}'")
+    return start, end
+
 
 class Parser:
-    """Handles parsing of PDF files into structured documents."""
+    """
+    Handles parsing of documents into structured documents.
+
+    PDF, DOCX, PPTX... go through Docling; plain text and tabular files (TXT, CSV, TSV, XLSX)
+    are read directly as FastDocuments, which is orders of magnitude cheaper.
+    """
+
+    def __init__(self, profile: Optional[str] = None):
+        """
+        Initialize the document converter (shared process-wide through the registry).
+
+        Args:
+            profile: Default parsing profile, one of PARSE_PROFILES (defaults to PARSE_PROFILE or "auto")
+        """
+        self.profile = self._check_profile(profile or os.getenv("PARSE_PROFILE", "auto"))
+        self.converter = self.get_converter(self.profile)
+        self.cache = registry.get_parse_cache()
+        # Per-stage timings of the last conversion, {stage: seconds}
+        self.last_timings = {}
+        # (profile, seconds) of the last parse() call, None when it was served by the parse cache
+        self.last_conversion = None
+
+    @staticmethod
+    def _check_profile(profile: str) -> str:
+        if profile not in PARSE_PROFILES:
+            raise ValueError(f"Unknown parse profile '{profile}', expected one of {list(PARSE_PROFILES)}")
+        return profile
+
+    def resolve_profile(self, path: str, profile: Optional[str] = None) -> Tuple[str, dict]:
+        """
+        Concrete Docling settings to parse a file with.
+
+        Args:
+            path: Path to the document
+            profile: One of PARSE_PROFILES (defaults to the parser's profile)
 
-    def __init__(self):
-        """Initialize the document converter."""
-        self.converter = DocumentConverter()
+        Returns:
+            (name, options) tuple, the name being the converter / parse cache key of the settings
+        """
+        profile = self._check_profile(profile or self.profile)
+        if profile != "auto":
+            return profile, PDF_PROFILES[profile]
+        if path.lower().endswith(".pdf") and is_born_digital(path):
+            return "balanced-text-layer", {**PDF_PROFILES["balanced"], "do_ocr": False}
+        return "balanced", PDF_PROFILES["balanced"]
 
-    def parse(self, path: str, save_to_folder: str = None) -> str:
+    def get_converter(self, profile: str):
+        """Shared converter of a profile ("auto" gets the "balanced" one)."""
+        name = "balanced" if profile == "auto" else profile
+        return registry.get_converter(name, PDF_PROFILES[name])
+
+    def parse(self, path: str, save_to_folder: str = None, use_cache: bool = True, page_range: Optional[Tuple[int, int]] = None,
+              profile: Optional[str] = None) -> str:
         """
         Parse a single PDF file.
 
         Args:
             path: Path to the PDF file to parse
             save_to_folder: Optional folder to save the converted markdown
+            use_cache: Load/store the result from the content-addressed parse cache
+            page_range: Optional (first_page, last_page), 1-based and inclusive, to only convert these pages
+            profile: Parsing profile of this call, one of PARSE_PROFILES (defaults to the parser's profile)
 
         Returns:
-            Parsed document object
+            Parsed document object: a DoclingDocument, or a FastDocument for text and tabular files
 
         Raises:
             FileNotFoundError: If the file doesn't exist
@@ -30,11 +224,44 @@ class Parser:
         if not os.path.isfile(path):
             raise FileNotFoundError(f"File not found: {path}")
 
+        self.last_conversion = None
+        if fast_format(path):
+            # Read lazily when chunked / exported, nothing worth caching
+            doc = FastDocument(path, page_range)
+            PAGES.inc(len(doc.pages))
+            return self._save(doc, path, save_to_folder)
+
         start = time.perf_counter()
-        resp = self.converter.convert(path).document
-        elapsed = time.perf_counter() - start
-        logger.info(f"Parsed {len(resp.export_to_text())} chars in {elapsed:.2f}s")
+        profile = self._check_profile(profile or self.profile)
+        # The profile is part of the cache key, and a slice of the document is a different entry than the whole document.
+        # "auto" entries are keyed as such (its resolution only depends on the file content), so the
+        # born-digital check, which opens the PDF, only runs on a cache miss
+        options = profile if page_range is None else f"{profile}|pages={page_range[0]}-{page_range[1]}"
+        convert_kwargs = {} if page_range is None else {"page_range": page_range}
 
+        resp = self.cache.load(path, options) if use_cache else None
+        if resp is not None:
+            elapsed = time.perf_counter() - start
+            logger.info(f"Loaded {os.path.basename(path)} from parse cache in {elapsed:.2f}s")
+        else:
+            profile_name, profile_options = self.resolve_profile(path, profile)
+            conv_res = registry.get_converter(profile_name, profile_options).convert(path, **convert_kwargs)
+            resp = conv_res.document
+            elapsed = time.perf_counter() - start
+            self.last_timings = stage_timings(conv_res.timings)
+            self.last_conversion = (profile_name, elapsed)
+            record_conversion(profile_name, elapsed, len(resp.pages))
+            logger.info(
+                f"Parsed {os.path.basename(path)} ({len(resp.pages)} pages, profile {profile_name}) in {elapsed:.2f}s "
+                f"[{format_timings(self.last_timings)}]"
+            )
+            if use_cache:
+                self.cache.store(path, resp, options)
+
+        return self._save(resp, path, save_to_folder)
+
+    def _save(self, resp, path: str, save_to_folder: Optional[str]):
+        """Write the markdown of a parsed document to save_to_folder, if given, and return the document."""
         if save_to_folder:
             os.makedirs(save_to_folder, exist_ok=True)
             save_path = os.path.join(
@@ -47,16 +274,126 @@ class Parser:
 
         return resp
     
+    @staticmethod
+    def page_count(path: str) -> Optional[int]:
+        """Number of pages of a PDF, read without converting it (None for other formats)."""
+        if not path.lower().endswith(".pdf"):
+            return None
+        pdf = pypdfium2.PdfDocument(path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def outline(self, path: str) -> str:
+        """
+        Cheap table of contents of a document, to decide which pages to read.
+
+        PDFs are not converted: the page count and bookmarks are read with pypdfium2.
+        Other formats (and PDFs without bookmarks) fall back to the headings of the parsed
+        document, which comes from the parse cache when the file was already parsed.
+
+        Args:
+            path: Path to the document
+
+        Returns:
+            The outline as an indented markdown list, with page numbers
+        """
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"File not found: {path}")
+
+        lines = []
+        pages = None
+        if path.lower().endswith(".pdf"):
+            pdf = pypdfium2.PdfDocument(path)
+            try:
+                pages = len(pdf)
+                for item in pdf.get_toc():
+                    page = "?" if item.page_index is None else item.page_index + 1
+                    lines.append(f"{'  ' * item.level}- {item.title} (page {page})")
+            finally:
+                pdf.close()
+
+        if not lines and fast_format(path):
+            doc = FastDocument(path)
+            pages = len(doc.pages)
+            lines = [f"- {name} (page {page_no})" for page_no, name in doc.pages.items()]
+
+        if not lines:
+            doc = self.parse(path)
+            pages = pages or len(doc.pages) or None
+            for item, _ in doc.iterate_items():
+                if getattr(item, "label", None) in ("title", "section_header"):
+                    page = item.prov[0].page_no if item.prov else "?"
+                    depth = getattr(item, "level", 1) if item.label == "section_header" else 0
+                    lines.append(f"{'  ' * max(depth - 1, 0)}- {item.text} (page {page})")
+
+        header = f"Outline of {os.path.basename(path)}"
+        if pages:
+            header += f" ({pages} pages)"
+        return header + ":\n" + ("\n".join(lines) if lines else "(no headings found)")
+
+    def iter_markdown_pages(self, doc, first_page_idx: int = 1) -> Iterator[Tuple[int, str]]:
+        """
+        Markdown of the document page by page, in one pass over its serialization.
+
+        Page numbers come from the items' provenance, so they stay right for page-range slices
+        and pages without content (yielded with empty markdown) don't shift the numbering.
+
+        Args:
+            doc: Parsed DoclingDocument (or FastDocument)
+            first_page_idx: Page number of the content when the document has no page information
+
+        Yields:
+            (page_number, markdown) tuples, in page order
+        """
+        if isinstance(doc, FastDocument):
+            yield from doc.iter_markdown_pages()
+            return
+
+        text = None
+        if _PAGE_MARKERS:
+            try:
+                serializer = _PageMarkedMarkdownSerializer(doc=doc, params=MarkdownParams(page_break_placeholder=""))
+                text = serializer.serialize().text
+            except (AttributeError, TypeError) as e:
+                logger.warning(f"Page-marked markdown export failed, falling back to the plain export: {e}")
+        if text is None:
+            yield from self._iter_placeholder_pages(doc, first_page_idx)
+            return
+
+        page_no = None
+        position = 0
+        for match in _PAGE_BREAK_RE.finditer(text):
+            prev_page, next_page = int(match.group(1)), int(match.group(2))
+            page_no = prev_page if page_no is None else page_no
+            yield page_no, text[position:match.start()].strip("\n")
+            for empty_page in range(page_no + 1, next_page):
+                yield empty_page, ""
+            page_no, position = next_page, match.end()
+
+        if page_no is None:
+            # No page break: a single page, or a format without pages
+            page_no = min(doc.pages) if doc.pages else first_page_idx
+        yield page_no, text[position:].strip("\n")
+
+    @staticmethod
+    def _iter_placeholder_pages(doc, first_page_idx: int) -> Iterator[Tuple[int, str]]:
+        """
+        Pages of Docling's plain markdown export, split on its page break placeholder.
+        Breaks carry no page numbers there: pages are numbered in order and pages without content are not seen.
+        """
+        page_no = min(doc.pages) if doc.pages else first_page_idx
+        pages = doc.export_to_markdown(page_break_placeholder=_PAGE_BREAK_PLACEHOLDER).split(_PAGE_BREAK_PLACEHOLDER)
+        for offset, markdown in enumerate(pages):
+            yield page_no + offset, markdown.strip("\n")
+
     def export_to_markdown_with_page_numbers(self,doc,first_page_idx=1)-> str:
         """
         Exports the document to markdown including page numbers with clear LLM-friendly separators.
         """
-        resp = f"\n{'='*80}\n[START OF PAGE {first_page_idx}]\n{'='*80}\n\n"+doc.export_to_markdown(page_break_placeholder="<-- Page Break -->")
-        page_index = first_page_idx
-        while "<-- Page Break -->" in resp:
-            resp = resp.replace("<-- Page Break -->", f"\n\n{'='*80}\n[END OF PAGE {page_index}]\n[START OF PAGE {page_index+1}]\n{'='*80}\n\n", 1)
-            page_index += 1
-        resp +=f"\n\n{'='*80}\n[END OF PAGE {page_index}]\n{'='*80}\n"
-        
-        return resp
-    
\ No newline at end of file
+        separator = '='*80
+        return "\n\n".join(
+            f"\n{separator}\n[START OF PAGE {page_no}]\n{separator}\n\n{markdown}\n\n{separator}\n[END OF PAGE {page_no}]\n{separator}\n"
+            for page_no, markdown in self.iter_markdown_pages(doc, first_page_idx)
+        )
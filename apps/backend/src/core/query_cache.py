@@ -0,0 +1,108 @@
+"""In-process TTL/LRU cache of query results with write-aware invalidation."""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+
+load_dotenv()
+
+
+def normalize_query(query_text: str) -> str:
+    """Case, surrounding punctuation and whitespace insensitive form of a query."""
+    return re.sub(r"\s+", " ", query_text).strip().strip("?!.,;:").strip().lower()
+
+
+class QueryCache:
+    """
+    Caches the documents returned by VectorDBManager.query.
+
+    Every collection has a generation counter that is bumped whenever the collection is
+    written to or deleted; the generation is part of the cache key, so results computed
+    before a write can never be served after it. Entries also expire after ttl seconds,
+    which bounds staleness for writes made by other processes.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results (defaults to QUERY_CACHE_MAX_ENTRIES or 1024)
+            ttl: Seconds a result stays valid (defaults to QUERY_CACHE_TTL or 600)
+        """
+        self.max_entries = max_entries or int(os.getenv("QUERY_CACHE_MAX_ENTRIES", 1024))
+        self.ttl = ttl or float(os.getenv("QUERY_CACHE_TTL", 600))
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Document]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def generation(self, collection_name: str) -> int:
+        """Current write generation of a collection."""
+        return self._generations.get(collection_name, 0)
+
+    def make_key(
+        self,
+        collection_name: str,
+        query_text: str,
+        k: int,
+        filter_metadata: Optional[dict] = None,
+        *extra: Hashable,
+    ) -> Tuple:
+        """Cache key of a query against the current generation of the collection."""
+        return (
+            collection_name,
+            self.generation(collection_name),
+            normalize_query(query_text),
+            k,
+            json.dumps(filter_metadata, sort_keys=True, default=str) if filter_metadata else None,
+            *extra,
+        )
+
+    def get(self, key: Tuple) -> Optional[List[Document]]:
+        """Cached documents of key (copies, safe to mutate), or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            documents = entry[1]
+        return [doc.model_copy(deep=True) for doc in documents]
+
+    def put(self, key: Tuple, documents: List[Document]):
+        """Store the documents of key, evicting the least recently used entries if full."""
+        # Results computed before a concurrent write belong to an older generation: drop them
+        if key[1] != self.generation(key[0]):
+            return
+        snapshot = [doc.model_copy(deep=True) for doc in documents]
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, collection_name: str):
+        """Bump the generation of a collection and free its cached results."""
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            stale = [key for key in self._entries if key[0] == collection_name]
+            for key in stale:
+                del self._entries[key]
+            self._stats["invalidations"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction/invalidation counters and current size."""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
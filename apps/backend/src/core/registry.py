@@ -0,0 +1,380 @@
+"""Process-wide registry for the heavy models and clients shared across the backend."""
+
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BACKENDS = ("hf", "onnx", "onnx-int8")
+# Numeric precision of the vectors of each backend: vectors of different precisions are not interchangeable
+EMBEDDING_PRECISIONS = {"hf": "fp32", "onnx": "fp32", "onnx-int8": "int8"}
+VECTOR_BACKENDS = ("chroma", "local")
+
+
+class ModelRegistry:
+    """
+    Lazily builds heavy objects (embedding model, Docling converter, tokenizer,
+    vector database client) once per process and hands the same instance to every caller.
+
+    Creation is guarded per key, so two threads asking for the same object at the
+    same time trigger a single load while unrelated objects can load in parallel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._objects: Dict[str, Any] = {}
+        self._kinds: Dict[str, str] = {}
+        self._loads: Dict[str, int] = {}
+        self._hits: Dict[str, int] = {}
+
+    def _count(self, counter: Dict[str, int], kind: str):
+        with self._lock:
+            counter[kind] = counter.get(kind, 0) + 1
+
+    def _get_or_create(self, kind: str, key: str, factory: Callable[[], Any]) -> Any:
+        """
+        Return the object stored under key, building it with factory on first use.
+
+        Args:
+            kind: Category used for the load/hit counters (e.g. "embeddings")
+            key: Unique cache key of the object
+            factory: Zero-argument callable building the object
+
+        Returns:
+            The shared object
+        """
+        if key in self._objects:
+            self._count(self._hits, kind)
+            return self._objects[key]
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._objects:
+                self._count(self._hits, kind)
+                return self._objects[key]
+
+            start = time.perf_counter()
+            obj = factory()
+            elapsed = time.perf_counter() - start
+            self._objects[key] = obj
+            self._kinds[key] = kind
+            self._count(self._loads, kind)
+            logger.info(f"Loaded {key} in {elapsed:.2f}s")
+            return obj
+
+    def provide(self, kind: str, key: str, obj: Any):
+        """
+        Register a prebuilt object under key, e.g. a stand-in model in benchmarks.
+        Getters building the same key return it instead of loading theirs.
+
+        Args:
+            kind: Category used for the load/hit counters (e.g. "embeddings")
+            key: Cache key of the object, as built by its getter (e.g. "tokenizer:BAAI/bge-m3")
+            obj: The object to share
+        """
+        with self._lock:
+            self._objects[key] = obj
+            self._kinds[key] = kind
+
+    def loaded(self, kind: str) -> List[Any]:
+        """Objects of the given kind that have already been built (never triggers a load)."""
+        return [obj for key, obj in list(self._objects.items()) if self._kinds.get(key) == kind]
+
+    def get_embeddings(
+        self,
+        model_name: str = "BAAI/bge-m3",
+        device: str = "cpu",
+        cached: Optional[bool] = None,
+        backend: Optional[str] = None,
+    ):
+        """
+        Shared embedding function of a HuggingFace model (normalized embeddings).
+
+        Documents are embedded in length-bucketed, token-budgeted batches and, unless
+        disabled, every vector goes through the persistent embedding cache.
+
+        Args:
+            model_name: Name of the HuggingFace embedding model
+            device: Device to run the model on
+            cached: Wrap the model in the persistent embedding cache (defaults to EMBEDDING_CACHE, enabled)
+            backend: "hf" (PyTorch), "onnx" (fp32 onnxruntime) or "onnx-int8" (defaults to EMBEDDING_BACKEND or "hf")
+        """
+        backend = backend or os.getenv("EMBEDDING_BACKEND", "hf")
+        if backend not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}', expected one of {EMBEDDING_BACKENDS}")
+        if cached is None:
+            cached = os.getenv("EMBEDDING_CACHE", "true").lower() in ("1", "true", "yes")
+        if cached:
+            def cached_factory():
+                from core.embedding_cache import CachedEmbeddings
+
+                # Backend is part of the cache key: int8 vectors must not be served to the fp32 backend
+                return CachedEmbeddings(
+                    self.get_embeddings(model_name, device, cached=False, backend=backend),
+                    f"{model_name}@{backend}",
+                )
+
+            return self._get_or_create(
+                "cached_embeddings", f"cached_embeddings:{model_name}:{device}:{backend}", cached_factory
+            )
+
+        def batched_factory():
+            from core.embedding_batcher import LengthBucketedEmbeddings
+
+            return LengthBucketedEmbeddings(
+                self.get_model_embeddings(model_name, device, backend), self.get_tokenizer(model_name)
+            )
+
+        return self._get_or_create(
+            "batched_embeddings", f"batched_embeddings:{model_name}:{device}:{backend}", batched_factory
+        )
+
+    def get_model_embeddings(self, model_name: str = "BAAI/bge-m3", device: str = "cpu", backend: str = "hf"):
+        """Shared raw embedding model (normalized embeddings), without batching or caching."""
+
+        def factory():
+            if backend.startswith("onnx"):
+                from core.onnx_embeddings import OnnxEmbeddings
+
+                return OnnxEmbeddings(model_name, self.get_tokenizer(model_name), quantize=backend == "onnx-int8")
+
+            from langchain_huggingface import HuggingFaceEmbeddings
+
+            return HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={"device": device},
+                encode_kwargs={"normalize_embeddings": True},
+            )
+
+        return self._get_or_create("embeddings", f"embeddings:{model_name}:{device}:{backend}", factory)
+
+    def get_tokenizer(self, model_name: str = "BAAI/bge-m3"):
+        """Shared HuggingFace tokenizer of the embedding model."""
+
+        def factory():
+            from transformers import AutoTokenizer
+
+            return AutoTokenizer.from_pretrained(model_name)
+
+        return self._get_or_create("tokenizer", f"tokenizer:{model_name}", factory)
+
+    def get_converter(self, profile: str = "default", pdf_options: Optional[Dict[str, Any]] = None):
+        """
+        Shared Docling DocumentConverter, one per parsing profile.
+
+        Args:
+            profile: Name of the profile, the cache key of the converter
+            pdf_options: PdfPipelineOptions fields of the profile, plus table_mode ("fast" / "accurate")
+                for TableFormer (None keeps Docling's defaults)
+        """
+
+        def factory():
+            from docling.datamodel.settings import settings
+            from docling.document_converter import DocumentConverter
+
+            # Per-stage timings (layout, OCR, tables...) on every ConversionResult, logged by the Parser
+            settings.debug.profile_pipeline_timings = os.getenv("PARSE_TIMINGS", "true").lower() == "true"
+            if pdf_options is None:
+                return DocumentConverter()
+
+            from docling.datamodel.base_models import InputFormat
+            from docling.datamodel.pipeline_options import PdfPipelineOptions, TableFormerMode, TableStructureOptions
+            from docling.document_converter import PdfFormatOption
+
+            options = dict(pdf_options)
+            table_mode = options.pop("table_mode", None)
+            pipeline_options = PdfPipelineOptions(**options)
+            if table_mode is not None:
+                pipeline_options.table_structure_options = TableStructureOptions(
+                    mode=TableFormerMode(table_mode), do_cell_matching=True
+                )
+            return DocumentConverter(format_options={InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)})
+
+        return self._get_or_create("converter", f"converter:{profile}", factory)
+
+    def get_llm(self, model_id: str = "gpt-5-mini"):
+        """Shared OpenAI LLM client used by the agents (thread-safe, one per model)."""
+
+        def factory():
+            from smolagents import OpenAIServerModel
+
+            return OpenAIServerModel(
+                model_id=model_id,
+                api_base="https://api.openai.com/v1",
+                api_key=os.environ["OPENAI_API_KEY"],
+            )
+
+        return self._get_or_create("llm", f"llm:{model_id}", factory)
+
+    def get_parse_cache(self):
+        """Shared on-disk cache of parsed Docling documents."""
+
+        def factory():
+            from core.parse_cache import ParseCache
+
+            return ParseCache()
+
+        return self._get_or_create("parse_cache", "parse_cache", factory)
+
+    def get_lexical_store(self):
+        """Shared set of per-collection BM25 lexical indexes."""
+
+        def factory():
+            from core.lexical_index import LexicalIndexStore
+
+            return LexicalIndexStore()
+
+        return self._get_or_create("lexical_store", "lexical_store", factory)
+
+    def get_dedup_store(self):
+        """Shared set of per-collection exact & near-duplicate chunk indexes."""
+
+        def factory():
+            from core.dedup import DedupIndexStore
+
+            return DedupIndexStore()
+
+        return self._get_or_create("dedup_store", "dedup_store", factory)
+
+    def get_query_cache(self):
+        """Shared cache of query results."""
+
+        def factory():
+            from core.query_cache import QueryCache
+
+            return QueryCache()
+
+        return self._get_or_create("query_cache", "query_cache", factory)
+
+    def get_catalog(self):
+        """Shared cached catalog of the collections."""
+
+        def factory():
+            from core.catalog import CollectionCatalog
+
+            catalog = CollectionCatalog(self.get_vector_client())
+            # Write the changes still batched when the process exits
+            atexit.register(catalog.flush)
+            return catalog
+
+        return self._get_or_create("catalog", "catalog", factory)
+
+    def get_job_manager(self):
+        """Shared background ingestion job manager."""
+
+        def factory():
+            from services.jobs import IngestionJobManager
+
+            return IngestionJobManager()
+
+        return self._get_or_create("job_manager", "job_manager", factory)
+
+    def get_session_store(self):
+        """Shared server-side conversation store."""
+
+        def factory():
+            from services.sessions import SessionStore
+
+            return SessionStore()
+
+        return self._get_or_create("session_store", "session_store", factory)
+
+    def get_parse_pool(self, workers: int):
+        """
+        Shared process pool used to run Docling conversions outside of the GIL.
+
+        Workers are spawned (not forked) so they don't inherit torch/tokenizer thread state,
+        and each worker keeps its own converter loaded across tasks.
+        """
+
+        def factory():
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+        return self._get_or_create("parse_pool", f"parse_pool:{workers}", factory)
+
+    def get_chroma_client(self):
+        """Shared ChromaDB HTTP client, configured from DATABASE_HOST / DATABASE_PORT."""
+        chroma_host = os.getenv("DATABASE_HOST", "localhost")
+        chroma_port = int(os.getenv("DATABASE_PORT", 1989))
+
+        def factory():
+            import chromadb
+            from chromadb.config import Settings
+
+            logger.info(f"Connecting to ChromaDB at {chroma_host}:{chroma_port}...")
+            client = chromadb.HttpClient(
+                host=chroma_host,
+                port=chroma_port,
+                settings=Settings(allow_reset=True, anonymized_telemetry=False),
+            )
+            logger.info(f"Connected to ChromaDB at {chroma_host}:{chroma_port}", extra={"host": chroma_host, "port": chroma_port})
+            return client
+
+        return self._get_or_create("chroma_client", f"chroma_client:{chroma_host}:{chroma_port}", factory)
+
+    def get_vector_client(self, backend: Optional[str] = None):
+        """
+        Shared client of the vector database, the backend of every VectorDBManager.
+
+        Args:
+            backend: "chroma" (ChromaDB server over HTTP) or "local" (in-process memory-mapped store
+                under VECTOR_STORE_PATH, no server needed), defaults to VECTOR_BACKEND or "chroma"
+        """
+        backend = backend or os.getenv("VECTOR_BACKEND", "chroma")
+        if backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{backend}', expected one of {VECTOR_BACKENDS}")
+        if backend == "chroma":
+            return self.get_chroma_client()
+
+        def factory():
+            from core.vector_store import LocalVectorClient
+
+            return LocalVectorClient()
+
+        return self._get_or_create("vector_client", "vector_client:local", factory)
+
+    def warm_up(self, embedding_model: str = "BAAI/bge-m3", embedding_backend: Optional[str] = None):
+        """
+        Eagerly load every shared object so the first request doesn't pay for it.
+
+        Args:
+            embedding_model: Name of the HuggingFace embedding model to load
+            embedding_backend: Embedding backend to load (defaults to EMBEDDING_BACKEND or "hf")
+        """
+        start = time.perf_counter()
+        self.get_tokenizer(embedding_model)
+        self.get_embeddings(embedding_model, backend=embedding_backend)
+        # Converter of the default parsing profile (local import: the parser module uses this registry)
+        from core.parser import Parser
+        Parser()
+        try:
+            self.get_vector_client()
+        except Exception as e:
+            logger.warning(f"Could not open the vector database during warm-up: {e}")
+        logger.info(f"Model registry warmed up in {time.perf_counter() - start:.2f}s")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Number of loads and cache hits per object kind."""
+        with self._lock:
+            kinds = set(self._loads) | set(self._hits)
+            return {
+                kind: {"loads": self._loads.get(kind, 0), "hits": self._hits.get(kind, 0)}
+                for kind in sorted(kinds)
+            }
+
+
+registry = ModelRegistry()
@@ -0,0 +1,16 @@
+"""Cheap token estimates for prompt budgeting."""
+
+import math
+
+# Average characters per token of OpenAI tokenizers on English prose & code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate number of LLM tokens of a text.
+
+    Used for budgeting only (history windows, context packing), where running the real
+    tokenizer on every candidate would cost more than the precision is worth.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
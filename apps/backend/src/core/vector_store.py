@@ -0,0 +1,653 @@
+"""In-process vector store: memory-mapped embedding segments searched with NumPy, a drop-in for the ChromaDB client."""
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from core.metadata_filter import matches_filter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VECTOR_DTYPES = ("float32", "float16")
+DISTANCE_SPACES = ("l2", "cosine", "ip")
+
+# Same naming rules as ChromaDB (a collection is a folder of the store)
+_NAME_RE = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9._-]{1,510}[a-zA-Z0-9]$")
+
+COLLECTION_FILE = "collection.json"
+LOG_FILE = "log.jsonl"
+
+# Rows scored per matrix product, bounds the float32 copy of float16 segments
+SCORE_BLOCK = 65536
+# Compaction triggers: too many segments to scan, or too many superseded / deleted rows
+MAX_SEGMENTS = 32
+MAX_DEAD_RATIO = 0.3
+# A run of recent segments is merged into its older neighbour unless the neighbour is this many times bigger
+MERGE_FACTOR = 4
+
+
+def _squared_norms(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.empty(len(embeddings), dtype=np.float32)
+    for start in range(0, len(embeddings), SCORE_BLOCK):
+        block = np.asarray(embeddings[start:start + SCORE_BLOCK], dtype=np.float32)
+        norms[start:start + len(block)] = np.einsum("ij,ij->i", block, block)
+    return norms
+
+
+def _dot(embeddings: np.ndarray, rows: Optional[np.ndarray], query: np.ndarray) -> np.ndarray:
+    """Dot products of the query with the given rows (all rows when None), block by block."""
+    count = len(embeddings) if rows is None else len(rows)
+    scores = np.empty(count, dtype=np.float32)
+    for start in range(0, count, SCORE_BLOCK):
+        if rows is None:
+            block = embeddings[start:start + SCORE_BLOCK]
+        else:
+            block = embeddings[rows[start:start + SCORE_BLOCK]]
+        scores[start:start + len(block)] = np.asarray(block, dtype=np.float32) @ query
+    return scores
+
+
+def _smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k smallest values, sorted."""
+    if k < len(values):
+        candidates = np.argpartition(values, k)[:k]
+    else:
+        candidates = np.arange(len(values))
+    return candidates[np.argsort(values[candidates], kind="stable")]
+
+
+class _Segment:
+    """
+    An immutable batch of rows written by one upsert (or one compaction).
+
+    Embeddings live in {name}.npy and are memory-mapped, ids / documents / metadatas in
+    {name}.jsonl are held in memory. Superseded and deleted rows are only masked out.
+    """
+
+    def __init__(self, folder: str, name: str):
+        self.name = name
+        self.files = [os.path.join(folder, f"{name}.npy"), os.path.join(folder, f"{name}.jsonl")]
+        self.embeddings = np.load(self.files[0], mmap_mode="r")
+        self.ids: List[str] = []
+        self.documents: List[Optional[str]] = []
+        self.metadatas: List[Optional[dict]] = []
+        with open(self.files[1], "r", encoding="utf-8") as f:
+            for line in f:
+                doc_id, document, metadata = json.loads(line)
+                self.ids.append(doc_id)
+                self.documents.append(document)
+                self.metadatas.append(metadata)
+        self.norms = _squared_norms(self.embeddings)
+        self.alive = np.ones(len(self.ids), dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def write(folder: str, name: str, ids: Sequence[str], embeddings, documents: Sequence, metadatas: Sequence, dtype: str):
+        """
+        Write the files of a segment.
+
+        Args:
+            embeddings: (rows, dimension) array, or list of (matrix, row indices) pairs copied block by block
+                (compaction never loads the merged segments in memory)
+        """
+        npy_path = os.path.join(folder, f"{name}.npy")
+        if isinstance(embeddings, list):
+            dimension = embeddings[0][0].shape[1]
+            matrix = np.lib.format.open_memmap(npy_path, mode="w+", dtype=dtype, shape=(len(ids), dimension))
+            offset = 0
+            for source, rows in embeddings:
+                matrix[offset:offset + len(rows)] = source[rows]
+                offset += len(rows)
+            matrix.flush()
+            del matrix
+        else:
+            with open(npy_path, "wb") as f:
+                np.save(f, np.asarray(embeddings, dtype=dtype))
+        with open(os.path.join(folder, f"{name}.jsonl"), "w", encoding="utf-8") as f:
+            f.writelines(
+                json.dumps([doc_id, document, metadata], ensure_ascii=False) + "\n"
+                for doc_id, document, metadata in zip(ids, documents, metadatas)
+            )
+
+    def live_rows(self) -> np.ndarray:
+        return np.flatnonzero(self.alive)
+
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are bucketed by their nearest k-means centroid and a query only
+    scores the rows of its n_probe nearest buckets. Built over the segments existing at build time,
+    segments appended afterwards are scanned exhaustively until the next build.
+    """
+
+    def __init__(self, segments: List[_Segment], n_lists: Optional[int] = None, n_probe: Optional[int] = None, iterations: int = 8):
+        start = time.perf_counter()
+        self.segments = list(segments)
+        self.rows = sum(int(segment.alive.sum()) for segment in self.segments)
+        self.n_lists = min(n_lists or int(min(max(np.sqrt(self.rows), 16), 4096)), self.rows)
+        self.n_probe = min(n_probe or max(self.n_lists // 8, 8), self.n_lists)
+
+        # Train the centroids on a sample of the live rows
+        rng = np.random.default_rng(0)
+        sizes = np.array([int(segment.alive.sum()) for segment in self.segments])
+        sample = np.sort(rng.choice(self.rows, size=min(self.rows, self.n_lists * 64), replace=False))
+        owners = np.searchsorted(np.cumsum(sizes), sample, side="right")
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        vectors = np.concatenate([
+            np.asarray(segment.embeddings[segment.live_rows()[sample[owners == i] - starts[i]]], dtype=np.float32)
+            for i, segment in enumerate(self.segments) if (owners == i).any()
+        ])
+        self.centroids = vectors[rng.choice(len(vectors), size=self.n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = self._nearest_lists(vectors, 1)[:, 0]
+            for c in range(self.n_lists):
+                members = vectors[assignment == c]
+                if len(members):
+                    self.centroids[c] = members.mean(axis=0)
+
+        # Bucket every live row: one (segment, row) array pair per list
+        buckets: List[List[Tuple[np.ndarray, np.ndarray]]] = [[] for _ in range(self.n_lists)]
+        for i, segment in enumerate(self.segments):
+            rows = segment.live_rows()
+            for offset in range(0, len(rows), SCORE_BLOCK):
+                block_rows = rows[offset:offset + SCORE_BLOCK]
+                assignment = self._nearest_lists(np.asarray(segment.embeddings[block_rows], dtype=np.float32), 1)[:, 0]
+                for c in np.unique(assignment):
+                    selected = block_rows[assignment == c]
+                    buckets[c].append((np.full(len(selected), i, dtype=np.int32), selected))
+        self.lists = [
+            (np.concatenate([s for s, _ in bucket]), np.concatenate([r for _, r in bucket])) if bucket
+            else (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64))
+            for bucket in buckets
+        ]
+        logger.info(f"Built IVF index of {self.rows} rows ({self.n_lists} lists) in {time.perf_counter() - start:.2f}s")
+
+    def _nearest_lists(self, vectors: np.ndarray, n: int) -> np.ndarray:
+        distances = (self.centroids ** 2).sum(axis=1)[None, :] - 2 * vectors @ self.centroids.T
+        if n >= self.n_lists:
+            return np.argsort(distances, axis=1)
+        nearest = np.argpartition(distances, n, axis=1)[:, :n]
+        return np.take_along_axis(nearest, np.argsort(np.take_along_axis(distances, nearest, axis=1), axis=1), axis=1)
+
+    def candidates(self, query: np.ndarray) -> Dict[int, np.ndarray]:
+        """Rows of the probed lists, grouped by segment position."""
+        probed = self._nearest_lists(query[None, :], self.n_probe)[0]
+        segment_ids = np.concatenate([self.lists[c][0] for c in probed])
+        rows = np.concatenate([self.lists[c][1] for c in probed])
+        return {int(i): np.sort(rows[segment_ids == i]) for i in np.unique(segment_ids)}
+
+
+class LocalCollection:
+    """
+    A collection of the in-process store, with the subset of the ChromaDB Collection API used by the backend
+    (upsert / add / get / query / delete / count / peek), so LangChain's Chroma wrapper works on top of it.
+
+    On disk the collection is a folder of append-only segments and an operation log: every upsert
+    writes a new segment then appends it to log.jsonl, deletes append the deleted IDs. The log
+    line is written last, so a crash never leaves a half-written batch visible. Small segments
+    are merged, and superseded / deleted rows dropped, by compaction.
+    """
+
+    def __init__(self, folder: str, name: str, metadata: Optional[dict] = None, dtype: str = "float32", index_threshold: int = 0):
+        self.name = name
+        self.folder = folder
+        self.index_threshold = index_threshold
+        self._lock = threading.RLock()
+        self._segments: List[_Segment] = []
+        self._locations: Dict[str, Tuple[_Segment, int]] = {}
+        self._sequence = 0
+        self._index: Optional[IVFIndex] = None
+        self._index_build: Optional[threading.Thread] = None
+
+        info_path = os.path.join(folder, COLLECTION_FILE)
+        if os.path.exists(info_path):
+            with open(info_path, "r", encoding="utf-8") as f:
+                self._info = json.load(f)
+            self._replay()
+        else:
+            if dtype not in VECTOR_DTYPES:
+                raise ValueError(f"Unknown vector dtype '{dtype}', expected one of {VECTOR_DTYPES}")
+            space = (metadata or {}).get("hnsw:space", "l2")
+            if space not in DISTANCE_SPACES:
+                raise ValueError(f"Unknown distance space '{space}', expected one of {DISTANCE_SPACES}")
+            os.makedirs(folder, exist_ok=True)
+            self._info = {"name": name, "metadata": metadata or None, "dtype": dtype, "dimension": None, "space": space}
+            self._save_info()
+            open(os.path.join(folder, LOG_FILE), "a").close()
+
+    @property
+    def metadata(self) -> Optional[dict]:
+        return self._info["metadata"]
+
+    @property
+    def configuration(self) -> Dict[str, Any]:
+        return {"hnsw": {"space": self._info["space"]}}
+
+    def _save_info(self):
+        tmp_path = os.path.join(self.folder, f"{COLLECTION_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._info, f)
+        os.replace(tmp_path, os.path.join(self.folder, COLLECTION_FILE))
+
+    def _append_log(self, entry: Dict):
+        with open(os.path.join(self.folder, LOG_FILE), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay(self):
+        """Rebuild the live rows from the log, and delete the files of unlogged (crashed) writes."""
+        with open(os.path.join(self.folder, LOG_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry["op"] == "segment":
+                    segment = _Segment(self.folder, entry["name"])
+                    dead = set(entry.get("dead", ()))
+                    for row in dead:
+                        segment.alive[row] = False
+                    self._register(segment, skip=dead)
+                    self._sequence = max(self._sequence, int(entry["name"].split("-")[1]))
+                elif entry["op"] == "delete":
+                    self._unregister(entry["ids"])
+
+        referenced = {path for segment in self._segments for path in segment.files}
+        for filename in os.listdir(self.folder):
+            path = os.path.join(self.folder, filename)
+            if filename.startswith("seg-") and path not in referenced:
+                os.remove(path)
+
+    def _register(self, segment: _Segment, skip=()):
+        """Make the rows of a segment the live version of their IDs."""
+        for row, doc_id in enumerate(segment.ids):
+            if row in skip:
+                continue
+            previous = self._locations.get(doc_id)
+            if previous is not None:
+                previous[0].alive[previous[1]] = False
+            self._locations[doc_id] = (segment, row)
+        self._segments.append(segment)
+
+    def _unregister(self, ids: Sequence[str]) -> List[str]:
+        deleted = []
+        for doc_id in ids:
+            location = self._locations.pop(doc_id, None)
+            if location is not None:
+                location[0].alive[location[1]] = False
+                deleted.append(doc_id)
+        return deleted
+
+    def _total_rows(self) -> int:
+        return sum(len(segment) for segment in self._segments)
+
+    def count(self) -> int:
+        return len(self._locations)
+
+    def upsert(self, ids: Sequence[str], embeddings=None, metadatas=None, documents=None, **kwargs):
+        """Insert or replace rows. Embeddings are required: the store has no embedding function."""
+        if embeddings is None:
+            raise ValueError(f"Collection '{self.name}' needs embeddings, the local vector store has no embedding function")
+        ids = list(ids)
+        if not ids:
+            return
+        if len(set(ids)) != len(ids):
+            raise ValueError("Expected IDs to be unique within an upsert")
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError(f"Expected {len(ids)} embeddings, got an array of shape {vectors.shape}")
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = [metadata or None for metadata in metadatas] if metadatas is not None else [None] * len(ids)
+
+        with self._lock:
+            if self._info["dimension"] is None:
+                self._info["dimension"] = int(vectors.shape[1])
+                self._save_info()
+            elif vectors.shape[1] != self._info["dimension"]:
+                raise ValueError(
+                    f"Collection '{self.name}' expects embeddings of dimension {self._info['dimension']}, got {vectors.shape[1]}"
+                )
+            self._sequence += 1
+            name = f"seg-{self._sequence:06d}"
+            _Segment.write(self.folder, name, ids, vectors, documents, metadatas, self._info["dtype"])
+            self._append_log({"op": "segment", "name": name})
+            self._register(_Segment(self.folder, name))
+            self._maybe_compact()
+
+    add = upsert
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[dict] = None, **kwargs):
+        """Delete rows by ID and / or metadata filter."""
+        with self._lock:
+            if where:
+                targets = [doc_id for doc_id, _, _, _ in self._iter_live(ids, where)]
+            else:
+                targets = list(ids or [])
+            deleted = self._unregister(targets)
+            if deleted:
+                self._append_log({"op": "delete", "ids": deleted})
+                self._maybe_compact()
+
+    def _iter_live(self, ids: Optional[Sequence[str]], where: Optional[dict]) -> Iterator[Tuple[str, _Segment, int, Optional[dict]]]:
+        """Live rows in insertion order (or in the order of ids), filtered by metadata."""
+        if ids is not None:
+            located = ((doc_id, self._locations.get(doc_id)) for doc_id in ids)
+            rows = ((doc_id, location[0], location[1]) for doc_id, location in located if location is not None)
+        else:
+            rows = ((segment.ids[row], segment, row) for segment in self._segments for row in segment.live_rows())
+        for doc_id, segment, row in rows:
+            metadata = segment.metadatas[row]
+            if where and not matches_filter(metadata or {}, where):
+                continue
+            yield doc_id, segment, row, metadata
+
+    def get(
+        self,
+        ids: Optional[Sequence[str]] = None,
+        where: Optional[dict] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Sequence[str] = ("documents", "metadatas"),
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Rows by ID and / or metadata filter, paged with offset / limit, as a ChromaDB GetResult dict."""
+        if isinstance(ids, str):
+            ids = [ids]
+        with self._lock:
+            selected = []
+            skip = offset or 0
+            for item in self._iter_live(ids, where):
+                if skip:
+                    skip -= 1
+                    continue
+                if limit is not None and len(selected) >= limit:
+                    break
+                selected.append(item)
+
+            result: Dict[str, Any] = {"ids": [doc_id for doc_id, _, _, _ in selected], "include": list(include)}
+            result["documents"] = [s.documents[r] for _, s, r, _ in selected] if "documents" in include else None
+            result["metadatas"] = [m for _, _, _, m in selected] if "metadatas" in include else None
+            if "embeddings" in include:
+                dimension = self._info["dimension"] or 0
+                result["embeddings"] = (
+                    np.stack([np.asarray(s.embeddings[r], dtype=np.float32) for _, s, r, _ in selected])
+                    if selected else np.empty((0, dimension), dtype=np.float32)
+                )
+            else:
+                result["embeddings"] = None
+            return result
+
+    def peek(self, limit: int = 10) -> Dict[str, Any]:
+        return self.get(limit=limit, include=["documents", "metadatas", "embeddings"])
+
+    def _distances(self, segment: _Segment, rows: Optional[np.ndarray], query: np.ndarray, query_norm: float) -> np.ndarray:
+        """Distances in the collection's space, with the same definitions as ChromaDB (l2 is squared)."""
+        dots = _dot(segment.embeddings, rows, query)
+        norms = segment.norms if rows is None else segment.norms[rows]
+        space = self._info["space"]
+        if space == "l2":
+            return np.maximum(norms + query_norm - 2 * dots, 0.0)
+        if space == "ip":
+            return 1.0 - dots
+        return 1.0 - dots / np.maximum(np.sqrt(norms * query_norm), 1e-12)
+
+    def _search(self, query: np.ndarray, k: int, where: Optional[dict]) -> List[Tuple[float, _Segment, int]]:
+        query_norm = float(query @ query)
+        if where:
+            # Filters are usually selective: score only the matching rows, exhaustively
+            candidates = {}
+            for segment in self._segments:
+                rows = np.array(
+                    [row for row in segment.live_rows() if matches_filter(segment.metadatas[row] or {}, where)], dtype=np.int64
+                )
+                if len(rows):
+                    candidates[segment] = rows
+        else:
+            candidates = {}
+            index = self._usable_index()
+            indexed = set()
+            if index is not None:
+                for position, rows in index.candidates(query).items():
+                    segment = index.segments[position]
+                    candidates[segment] = rows[segment.alive[rows]]
+                indexed = set(index.segments)
+            for segment in self._segments:
+                if segment not in indexed:
+                    candidates[segment] = None if segment.alive.all() else segment.live_rows()
+
+        hits = []
+        for segment, rows in candidates.items():
+            if rows is not None and not len(rows):
+                continue
+            distances = self._distances(segment, rows, query, query_norm)
+            for i in _smallest(distances, k):
+                hits.append((float(distances[i]), segment, int(i if rows is None else rows[i])))
+        hits.sort(key=lambda hit: hit[0])
+        return hits[:k]
+
+    def _usable_index(self) -> Optional[IVFIndex]:
+        """
+        The IVF index once the collection reaches index_threshold rows (0 disables it), None until it is built.
+
+        (Re)builds run on a background thread: queries scan exhaustively until the first index is ready,
+        and keep the previous one, whose segments are all still live, while it is rebuilt.
+        """
+        if not self.index_threshold or self.count() < self.index_threshold:
+            self._index = None
+            return None
+        index = self._index
+        if index is not None:
+            segments = set(self._segments)
+            if any(segment not in segments for segment in index.segments):
+                self._index = index = None
+            elif sum(int(segment.alive.sum()) for segment in self._segments if segment not in index.segments) <= index.rows // 5:
+                return index
+        self._start_index_build()
+        return index
+
+    def _start_index_build(self):
+        """Build the IVF index of the current segments on a background thread, unless a build is running."""
+        if self._index_build is not None and self._index_build.is_alive():
+            return
+        segments = [segment for segment in self._segments if segment.alive.any()]
+        self._index_build = threading.Thread(
+            target=self._build_index, args=(segments,), name=f"ivf-index-{self.name}", daemon=True
+        )
+        self._index_build.start()
+
+    def _build_index(self, segments: List[_Segment]):
+        try:
+            index = IVFIndex(segments)
+        except Exception as e:
+            # e.g. a segment compacted away during the build, the next query starts another one
+            logger.warning(f"Could not build the IVF index of collection '{self.name}': {e}")
+            return
+        with self._lock:
+            live = set(self._segments)
+            if all(segment in live for segment in index.segments):
+                self._index = index
+
+    def query(
+        self,
+        query_embeddings=None,
+        n_results: int = 10,
+        where: Optional[dict] = None,
+        include: Sequence[str] = ("documents", "metadatas", "distances"),
+        query_texts=None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Nearest rows of each query embedding, as a ChromaDB QueryResult dict (one list per query)."""
+        if query_embeddings is None:
+            raise ValueError(f"Collection '{self.name}' needs query embeddings, the local vector store has no embedding function")
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        result: Dict[str, Any] = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": [], "include": list(include)}
+        with self._lock:
+            for query in queries:
+                hits = self._search(query, n_results, where) if self._segments else []
+                result["ids"].append([s.ids[r] for _, s, r in hits])
+                result["documents"].append([s.documents[r] for _, s, r in hits])
+                result["metadatas"].append([s.metadatas[r] for _, s, r in hits])
+                result["distances"].append([d for d, _, _ in hits])
+                result["embeddings"].append([np.asarray(s.embeddings[r], dtype=np.float32) for _, s, r in hits])
+        for key in ("documents", "metadatas", "distances", "embeddings"):
+            if key not in include:
+                result[key] = None
+        return result
+
+    def _maybe_compact(self):
+        total = self._total_rows()
+        dead = total - self.count()
+        if total and dead / total > MAX_DEAD_RATIO:
+            self.compact()
+        elif len(self._segments) > MAX_SEGMENTS:
+            # Merge the recent segments while the older neighbour isn't much bigger than the run
+            start = len(self._segments) - 1
+            run = len(self._segments[start])
+            while start > 0 and len(self._segments[start - 1]) <= MERGE_FACTOR * run:
+                start -= 1
+                run += len(self._segments[start])
+            self._merge(min(start, len(self._segments) - MAX_SEGMENTS // 2))
+
+    def compact(self):
+        """Rewrite every live row into a single segment, dropping superseded and deleted rows."""
+        with self._lock:
+            if self._segments:
+                self._merge(0)
+
+    def _merge(self, start: int):
+        """Replace segments[start:] by one segment of their live rows, then rewrite the log."""
+        start_time = time.perf_counter()
+        merged, kept = self._segments[start:], self._segments[:start]
+        ids, documents, metadatas, blocks = [], [], [], []
+        for segment in merged:
+            rows = segment.live_rows()
+            ids.extend(segment.ids[row] for row in rows)
+            documents.extend(segment.documents[row] for row in rows)
+            metadatas.extend(segment.metadatas[row] for row in rows)
+            for offset in range(0, len(rows), SCORE_BLOCK):
+                blocks.append((segment.embeddings, rows[offset:offset + SCORE_BLOCK]))
+
+        entries = [{"op": "segment", "name": s.name, "dead": np.flatnonzero(~s.alive).tolist()} for s in kept]
+        new_segment = None
+        if ids:
+            self._sequence += 1
+            name = f"seg-{self._sequence:06d}"
+            _Segment.write(self.folder, name, ids, blocks, documents, metadatas, self._info["dtype"])
+            entries.append({"op": "segment", "name": name})
+            new_segment = _Segment(self.folder, name)
+
+        tmp_path = os.path.join(self.folder, f"{LOG_FILE}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(entry) + "\n" for entry in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.folder, LOG_FILE))
+
+        self._segments = kept
+        if new_segment is not None:
+            self._register(new_segment)
+        self._index = None
+        if self.index_threshold and self.count() >= self.index_threshold:
+            # The merged rows are indexed again from the new segment, queries scan exhaustively meanwhile
+            self._start_index_build()
+        for segment in merged:
+            segment.embeddings = None
+            for path in segment.files:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    # e.g. still mapped on Windows, removed on the next load as an unlogged file
+                    logger.warning(f"Could not remove compacted segment file {path}: {e}")
+        logger.info(
+            f"Compacted {len(merged)} segment(s) of collection '{self.name}' into {len(ids)} rows "
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+
+
+class LocalVectorClient:
+    """
+    In-process replacement of the ChromaDB client (list / get / create / delete collections),
+    each collection being a folder under path. A store must be opened by a single process at a time.
+    """
+
+    def __init__(self, path: Optional[str] = None, dtype: Optional[str] = None, index_threshold: Optional[int] = None):
+        """
+        Args:
+            path: Root folder of the store (defaults to VECTOR_STORE_PATH or .cache/vectors)
+            dtype: Storage type of new collections' embeddings, "float32" or "float16" (defaults to VECTOR_DTYPE)
+            index_threshold: Rows from which a collection is searched through an IVF index instead of
+                exhaustively, 0 disables it (defaults to VECTOR_INDEX_THRESHOLD or 200000)
+        """
+        self.path = path or os.getenv("VECTOR_STORE_PATH", os.path.join(".cache", "vectors"))
+        self.dtype = dtype or os.getenv("VECTOR_DTYPE", "float32")
+        if self.dtype not in VECTOR_DTYPES:
+            raise ValueError(f"Unknown vector dtype '{self.dtype}', expected one of {VECTOR_DTYPES}")
+        self.index_threshold = int(os.getenv("VECTOR_INDEX_THRESHOLD", 200000)) if index_threshold is None else index_threshold
+        self._lock = threading.Lock()
+        self._collections: Dict[str, LocalCollection] = {}
+        os.makedirs(self.path, exist_ok=True)
+
+    def _folder(self, name: str) -> str:
+        if not _NAME_RE.match(name) or ".." in name:
+            raise ValueError(
+                f"Invalid collection name '{name}': 3-512 characters from [a-zA-Z0-9._-], starting and ending with [a-zA-Z0-9]"
+            )
+        return os.path.join(self.path, name)
+
+    def _open(self, name: str, metadata: Optional[dict] = None, create: bool = False) -> LocalCollection:
+        with self._lock:
+            if name not in self._collections:
+                folder = self._folder(name)
+                if not os.path.exists(os.path.join(folder, COLLECTION_FILE)) and not create:
+                    raise ValueError(f"Collection {name} does not exist.")
+                self._collections[name] = LocalCollection(folder, name, metadata, self.dtype, self.index_threshold)
+            return self._collections[name]
+
+    def list_collections(self) -> List[LocalCollection]:
+        names = sorted(
+            name for name in os.listdir(self.path) if os.path.exists(os.path.join(self.path, name, COLLECTION_FILE))
+        )
+        return [self._open(name) for name in names]
+
+    def get_collection(self, name: str, **kwargs) -> LocalCollection:
+        return self._open(name)
+
+    def get_or_create_collection(self, name: str, metadata: Optional[dict] = None, **kwargs) -> LocalCollection:
+        return self._open(name, metadata, create=True)
+
+    def create_collection(self, name: str, metadata: Optional[dict] = None, **kwargs) -> LocalCollection:
+        if os.path.exists(os.path.join(self._folder(name), COLLECTION_FILE)):
+            raise ValueError(f"Collection {name} already exists.")
+        return self._open(name, metadata, create=True)
+
+    def delete_collection(self, name: str):
+        folder = self._folder(name)
+        with self._lock:
+            if not os.path.exists(os.path.join(folder, COLLECTION_FILE)):
+                raise ValueError(f"Collection {name} does not exist.")
+            collection = self._collections.pop(name, None)
+            if collection is not None:
+                for segment in collection._segments:
+                    segment.embeddings = None
+            shutil.rmtree(folder)
+
+    def get_max_batch_size(self) -> int:
+        return 100000
+
+    def heartbeat(self) -> int:
+        return time.time_ns()
@@ -0,0 +1,213 @@
+"""Runs synchronous agent generators off the event loop with bounded concurrency."""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing, contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+from dotenv import load_dotenv
+
+from core.cancellation import CancelToken, OperationCancelled, cancellation_scope
+from core.metrics import CHAT_DURATION_SECONDS, CHAT_QUEUE_SECONDS, CHAT_TTFB_SECONDS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+# Where NDJSON lines emitted from inside a run (e.g. by tools) are pushed, set per run
+EventSink = Callable[[str], None]
+_event_sink: ContextVar[Optional[EventSink]] = ContextVar("event_sink", default=None)
+
+
+def current_event_sink() -> Optional[EventSink]:
+    """Event sink of the run executing in the current context, if any."""
+    return _event_sink.get()
+
+
+def emit_event(type_: str, content: Any, sink: Optional[EventSink] = None):
+    """
+    Push an extra NDJSON line ({"type": type_, "content": content}) into a run's stream.
+
+    Args:
+        type_: Event type, e.g. "progress"
+        content: JSON-serializable payload
+        sink: Sink to push to (defaults to the current run's), nothing happens without one
+    """
+    sink = sink or _event_sink.get()
+    if sink is not None:
+        sink(json.dumps({"type": type_, "content": content}) + "\n")
+
+
+@contextmanager
+def event_sink_scope(sink: EventSink):
+    reset = _event_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _event_sink.reset(reset)
+
+
+class ChatRunner:
+    """
+    Bounded pool of agent runs.
+
+    Each run executes its (blocking) NDJSON generator in a worker thread and the lines
+    are bridged into an async iterator, so the event loop keeps serving other requests.
+    At most max_concurrent runs execute at once; extra requests wait up to queue_timeout
+    seconds for a slot before being rejected.
+
+    When the client disconnects, the run's CancelToken is cancelled: the agent loop
+    stops at its next step and in-flight ingestion stops at its next checkpoint.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, queue_timeout: Optional[float] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            max_concurrent: Maximum number of concurrent runs (defaults to MAX_CONCURRENT_RUNS or 4)
+            queue_timeout: Seconds a request may wait for a free slot (defaults to RUN_QUEUE_TIMEOUT or 30)
+        """
+        self.max_concurrent = max_concurrent or int(os.getenv("MAX_CONCURRENT_RUNS", 4))
+        self.queue_timeout = queue_timeout or float(os.getenv("RUN_QUEUE_TIMEOUT", 30))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="agent-run")
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._lock = threading.Lock()
+        self._stats = {"active": 0, "queued": 0, "completed": 0, "failed": 0, "rejected": 0, "cancelled": 0}
+
+    def _bump(self, **deltas: int):
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a free run slot.
+
+        Returns:
+            False if no slot freed up within queue_timeout (the caller should answer 429)
+        """
+        self._bump(queued=1)
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self._bump(rejected=1)
+            return False
+        finally:
+            self._bump(queued=-1)
+            CHAT_QUEUE_SECONDS.observe(time.perf_counter() - start)
+
+    def release(self):
+        """Give back a slot obtained with acquire() for a run that won't be started."""
+        self._semaphore.release()
+
+    def start(
+        self,
+        make_generator: Callable[[], Iterator[str]],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Start a run in the worker pool, in a slot previously obtained with acquire().
+        The slot is released when the run finishes, whatever happens to the consumer.
+
+        Args:
+            make_generator: Builds and returns the blocking generator of NDJSON lines (called in the worker thread)
+            is_disconnected: Coroutine function telling whether the client went away (e.g. Request.is_disconnected)
+
+        Returns:
+            Async iterator over the generated lines
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        token = CancelToken()
+        started = time.perf_counter()
+        outcome = {"status": "completed"}
+        self._bump(active=1)
+
+        def push(line: str):
+            loop.call_soon_threadsafe(queue.put_nowait, line)
+
+        def produce():
+            try:
+                with cancellation_scope(token), event_sink_scope(push):
+                    lines = make_generator()
+                    # Generators are closed so their cleanup (e.g. recording the turn) runs in this thread
+                    with closing(lines) if hasattr(lines, "close") else nullcontext():
+                        for line in lines:
+                            if token.cancelled:
+                                break
+                            push(line)
+            except OperationCancelled:
+                pass
+            except Exception as e:
+                logger.exception("Agent run failed")
+                self._bump(failed=1)
+                outcome["status"] = "failed"
+                loop.call_soon_threadsafe(queue.put_nowait, json.dumps({"type": "error", "content": str(e)}) + "\n")
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, _DONE)
+
+        def finished(_):
+            if token.cancelled:
+                self._bump(active=-1, cancelled=1)
+                outcome["status"] = "cancelled"
+                logger.warning(f"Agent run cancelled: {token.reason}")
+            else:
+                self._bump(active=-1, completed=1)
+            CHAT_DURATION_SECONDS.labels(outcome=outcome["status"]).observe(time.perf_counter() - started)
+            self._semaphore.release()
+
+        loop.run_in_executor(self._executor, produce).add_done_callback(finished)
+        return self._drain(queue, token, is_disconnected, started)
+
+    async def _drain(
+        self,
+        queue: asyncio.Queue,
+        token: CancelToken,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+        started: Optional[float] = None,
+        poll_interval: float = 1.0,
+    ) -> AsyncIterator[str]:
+        finished = False
+        pending_get = None
+        first_line = True
+        try:
+            while True:
+                # Reuse the pending get across polls so a line is never lost to a timeout
+                pending_get = pending_get or asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({pending_get}, timeout=poll_interval)
+                if not done:
+                    # Nothing streamed for a while (long LLM call / ingestion): check the client is still there
+                    if is_disconnected is not None and await is_disconnected():
+                        token.cancel("client disconnected")
+                        return
+                    continue
+                line, pending_get = pending_get.result(), None
+                if line is _DONE:
+                    finished = True
+                    return
+                if first_line and started is not None:
+                    CHAT_TTFB_SECONDS.observe(time.perf_counter() - started)
+                first_line = False
+                yield line
+        finally:
+            if pending_get is not None:
+                pending_get.cancel()
+            # The consumer stopped early (disconnect detected by the server, or above): stop the run
+            if not finished:
+                token.cancel("client disconnected")
+
+    def stats(self) -> Dict[str, int]:
+        """Active, queued, completed, failed, cancelled and rejected run counters."""
+        with self._lock:
+            return {**self._stats, "max_concurrent": self.max_concurrent}
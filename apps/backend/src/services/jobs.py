@@ -0,0 +1,247 @@
+"""Background ingestion jobs: bounded worker pool, persistent job table and progress events."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from core.cancellation import CancelToken, OperationCancelled, cancellation_scope
+from core.dedup import embeds_avoided_pct
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# queued -> running -> done | failed | cancelled ; jobs still queued/running at startup become "interrupted"
+FINAL_STATUSES = ("done", "failed", "cancelled", "interrupted")
+
+JobListener = Callable[[Dict], None]
+
+
+class JobStore:
+    """SQLite table of ingestion jobs, so their status survives restarts."""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite file (defaults to JOBS_DB_PATH or .cache/jobs.sqlite3)
+        """
+        self.path = path or os.getenv("JOBS_DB_PATH", os.path.join(".cache", "jobs.sqlite3"))
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                collection TEXT NOT NULL,
+                file_paths TEXT NOT NULL,
+                progress TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        # Jobs that were in flight when the process stopped will never finish
+        self._conn.execute(
+            "UPDATE jobs SET status = 'interrupted', updated_at = ? WHERE status IN ('queued', 'running')",
+            (time.time(),),
+        )
+        self._conn.commit()
+
+    def create(self, job_id: str, collection_name: str, file_paths: List[str], progress: Dict):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, collection, file_paths, progress, created_at, updated_at) "
+                "VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, collection_name, json.dumps(file_paths), json.dumps(progress), now, now),
+            )
+            self._conn.commit()
+
+    def update(self, job_id: str, **fields):
+        """Update status / progress / result / error of a job (dicts are stored as JSON)."""
+        values = {key: json.dumps(value) if isinstance(value, (dict, list)) else value for key, value in fields.items()}
+        values["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in values)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*values.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for key in ("file_paths", "progress", "result"):
+            if job[key] is not None:
+                job[key] = json.loads(job[key])
+        return job
+
+
+class IngestionJobManager:
+    """
+    Runs RagifyPipe ingestion jobs in a bounded pool of worker threads.
+
+    Every job gets a CancelToken (checked by RagifyPipe between stages and embedding
+    batches) and reports progress (pages parsed, chunks produced, chunks embedded) to
+    the job table and to the listener given at submission.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, store: Optional[JobStore] = None):
+        """
+        Args:
+            max_workers: Number of jobs running at once (defaults to INGEST_JOB_WORKERS or 2)
+            store: Job table (defaults to a JobStore at JOBS_DB_PATH)
+        """
+        self.max_workers = max_workers or int(os.getenv("INGEST_JOB_WORKERS", 2))
+        self.store = store or JobStore()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ingest-job")
+        self._tokens: Dict[str, CancelToken] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, file_paths: List[str], collection_name: str, listener: Optional[JobListener] = None,
+               profile: Optional[str] = None) -> str:
+        """
+        Enqueue the ragification of files into a collection.
+
+        Args:
+            file_paths: Paths of the documents to ragify
+            collection_name: Name of the target collection
+            listener: Optional callback receiving the job status dict after every progress event
+            profile: Docling parsing profile (auto / fast / balanced / accurate, defaults to PARSE_PROFILE)
+
+        Returns:
+            The job ID
+        """
+        job_id = uuid.uuid4().hex
+        progress = {
+            "files_total": len(file_paths),
+            "files_parsed": 0,
+            "pages_parsed": 0,
+            "chunks_produced": 0,
+            "chunks_embedded": 0,
+            "fraction": 0.0,
+        }
+        self.store.create(job_id, collection_name, file_paths, progress)
+        token = CancelToken()
+        with self._lock:
+            self._tokens[job_id] = token
+            self._futures[job_id] = self._executor.submit(
+                self._run, job_id, file_paths, collection_name, progress, token, listener, profile
+            )
+        logger.info(f"Queued ingestion job {job_id} ({len(file_paths)} files -> '{collection_name}')")
+        return job_id
+
+    def _run(self, job_id, file_paths, collection_name, progress, token, listener, profile=None):
+        from services.ragify import RagifyPipe
+
+        def publish(status: str):
+            if listener is None:
+                return
+            try:
+                listener({"job_id": job_id, "status": status, "collection": collection_name, **progress})
+            except Exception as e:
+                logger.debug(f"Progress listener of job {job_id} failed: {e}")
+
+        def on_progress(event: Dict):
+            stage = event["stage"]
+            if stage == "parsed":
+                progress["files_parsed"] += 1
+                progress["pages_parsed"] += event.get("pages", 0)
+            elif stage == "chunked":
+                progress["chunks_produced"] += event.get("chunks", 0)
+            elif stage == "embedded":
+                progress["chunks_embedded"] = event.get("chunks", 0)
+            # Parsing counts for the first half of the bar, embedding for the second
+            parsed = progress["files_parsed"] / max(progress["files_total"], 1)
+            embedded = progress["chunks_embedded"] / max(progress["chunks_produced"], 1)
+            progress["fraction"] = round(0.5 * parsed + 0.5 * embedded, 4)
+            self.store.update(job_id, progress=progress)
+            publish("running")
+
+        try:
+            if token.cancelled:
+                raise OperationCancelled(token.reason)
+            self.store.update(job_id, status="running")
+            publish("running")
+            with cancellation_scope(token):
+                pipe = RagifyPipe(profile)
+                if len(file_paths) == 1:
+                    report = pipe(file_paths[0], collection_name, progress=on_progress)
+                    result = {
+                        "files": 1,
+                        "chunks": report["added"] + report["unchanged"] + report["deduplicated"],
+                        **report,
+                        "embeds_avoided_pct": embeds_avoided_pct(report),
+                        "failed": {},
+                    }
+                else:
+                    result = pipe.ingest_many(file_paths, collection_name, progress=on_progress)
+            progress["fraction"] = 1.0
+            self.store.update(job_id, status="done", progress=progress, result=result)
+            publish("done")
+            logger.info(f"Ingestion job {job_id} done: {result}")
+        except OperationCancelled as e:
+            self.store.update(job_id, status="cancelled", error=str(e))
+            publish("cancelled")
+            logger.warning(f"Ingestion job {job_id} cancelled: {e}")
+        except Exception as e:
+            self.store.update(job_id, status="failed", error=str(e))
+            publish("failed")
+            logger.exception(f"Ingestion job {job_id} failed")
+        finally:
+            with self._lock:
+                self._tokens.pop(job_id, None)
+                self._futures.pop(job_id, None)
+
+    def status(self, job_id: str) -> Optional[Dict]:
+        """Current state of a job, None if unknown."""
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job (a running job stops at its next checkpoint).
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        with self._lock:
+            token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        token.cancel("cancelled by user")
+        return True
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_interval: float = 0.5,
+             should_stop: Optional[Callable[[], bool]] = None) -> Optional[Dict]:
+        """
+        Block until a job finishes, timeout expires or should_stop() returns True.
+
+        Returns:
+            The job status at that point
+        """
+        with self._lock:
+            future = self._futures.get(job_id)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while future is not None and not future.done():
+            if should_stop is not None and should_stop():
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            try:
+                future.result(timeout=poll_interval)
+            except Exception:
+                pass
+        return self.status(job_id)
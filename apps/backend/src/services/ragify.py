@@ -1,23 +1,194 @@
-from core.parser import Parser
+import logging
+import os
+from concurrent.futures import as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from docling_core.types.doc import DoclingDocument
+
+from core.parser import Parser, record_conversion
+from core.fast_readers import fast_format
 from core.chunker import Chunker
 from core.DBHandler import VectorDBManager
+from core.registry import registry
+from core.cancellation import OperationCancelled, check_cancelled
+from core.dedup import embeds_avoided_pct
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_in_worker(file_path: str, profile: Optional[str] = None) -> Tuple[str, Optional[Tuple[str, float]]]:
+    """
+    Runs inside a pool process: parse one file and return the serialized Docling document,
+    with the (profile, seconds) of its conversion for the parent's metrics (None on a parse cache hit).
+    """
+    parser = Parser(profile)
+    return parser.parse(file_path).model_dump_json(), parser.last_conversion
+
+
+def _batched(chunk_lists: Iterable[List], batch_size: int) -> Iterator[List]:
+    """
+    Group per-document chunk lists into batches of at least batch_size chunks.
+    A document is never split across batches, so each batch can be synced per source.
+    """
+    batch = []
+    for chunks in chunk_lists:
+        batch.extend(chunks)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# Receives progress events: {"stage": "parsed", "file", "pages"} | {"stage": "chunked", "file", "chunks"}
+# | {"stage": "embedded", "chunks"} (chunks written so far)
+ProgressCallback = Callable[[Dict], None]
+
+
+def _notify(progress: Optional[ProgressCallback], **event):
+    if progress is not None:
+        progress(event)
+
+
 class RagifyPipe:
-    def __init__(self):
-        self.parser = Parser()
+    def __init__(self, profile: Optional[str] = None):
+        # profile: Docling parsing profile (auto / fast / balanced / accurate), see core.parser
+        self.parser = Parser(profile)
         self.chunker = Chunker()
         self.db_manager = VectorDBManager()
-    def __call__(self, file_path :str, collection_name: str):
-        # 1. Parse the document
-        doc = self.parser.parse(file_path)
-        
-        # 2. Chunk the document
-        chunks = self.chunker.chunk(doc)
-        
-        # 3. Add chunks to the vector database
-        self.db_manager.add_documents(collection_name, chunks)
+    def __call__(self, file_path :str, collection_name: str, progress: Optional[ProgressCallback] = None) -> Dict[str, int]:
+        # Between stages, stop if the request that started this work was cancelled (e.g. client disconnected)
+        try:
+            # 1. Parse the document
+            check_cancelled()
+            doc = self.parser.parse(file_path)
+            _notify(progress, stage="parsed", file=file_path, pages=len(doc.pages))
+
+            # 2. Chunk the document
+            check_cancelled()
+            chunks = self.chunker.chunk(doc, file_path)
+            _notify(progress, stage="chunked", file=file_path, chunks=len(chunks))
+
+            # 3. Sync chunks into the vector database (only new/changed chunks are embedded, stale ones removed)
+            check_cancelled()
+            report = self.db_manager.sync_documents(collection_name, chunks)
+            _notify(progress, stage="embedded", chunks=len(chunks))
+            return report
+        except OperationCancelled as e:
+            logger.warning(f"Ragify of {file_path} cancelled: {e}", extra={"file": file_path, "collection": collection_name})
+            raise
+
+    def ingest_many(
+        self,
+        file_paths: List[str],
+        collection_name: str,
+        workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict:
+        """
+        Ragify several documents into a collection at once.
+
+        Documents are parsed in parallel in a process pool; as each one finishes it is
+        chunked in this process and its chunks stream into a single embedding stage
+        that writes to the vector database in large batches.
+
+        Args:
+            file_paths: Paths of the documents to ragify
+            collection_name: Name of the target collection
+            workers: Number of parsing processes (defaults to INGEST_WORKERS or min(4, cpu count))
+            batch_size: Minimum number of chunks embedded & written per batch (defaults to INGEST_BATCH_SIZE or 512)
+            progress: Optional callback receiving parsed/chunked/embedded progress events
+
+        Returns:
+            Summary with the number of ingested files, chunks, added/unchanged/removed/deduplicated chunk
+            counts, the percentage of embeddings avoided by deduplication and the files that failed to parse
+        """
+        workers = workers or int(os.getenv("INGEST_WORKERS", min(4, os.cpu_count() or 1)))
+        batch_size = batch_size or int(os.getenv("INGEST_BATCH_SIZE", 512))
+        failed: Dict[str, str] = {}
+
+        def parsed_docs():
+            if workers <= 1 or len(file_paths) == 1:
+                for path in file_paths:
+                    check_cancelled()
+                    try:
+                        doc = self.parser.parse(path)
+                    except Exception as e:
+                        failed[path] = str(e)
+                        continue
+                    _notify(progress, stage="parsed", file=path, pages=len(doc.pages))
+                    yield path, doc
+                return
+
+            pool = registry.get_parse_pool(workers)
+            futures = {pool.submit(_parse_in_worker, path, self.parser.profile): path for path in file_paths if not fast_format(path)}
+            try:
+                # Text & tabular files are read lazily here while the pool converts the others
+                for path in file_paths:
+                    if fast_format(path):
+                        check_cancelled()
+                        try:
+                            doc = self.parser.parse(path)
+                        except Exception as e:
+                            failed[path] = str(e)
+                            continue
+                        _notify(progress, stage="parsed", file=path, pages=len(doc.pages))
+                        yield path, doc
+                for future in as_completed(futures):
+                    check_cancelled()
+                    try:
+                        doc_json, conversion = future.result()
+                        doc = DoclingDocument.model_validate_json(doc_json)
+                    except Exception as e:
+                        failed[futures[future]] = str(e)
+                        continue
+                    if conversion is not None:
+                        record_conversion(*conversion, len(doc.pages))
+                    _notify(progress, stage="parsed", file=futures[future], pages=len(doc.pages))
+                    yield futures[future], doc
+            finally:
+                # On cancellation/error, drop the files no worker has started yet
+                for future in futures:
+                    future.cancel()
+
+        def chunked_docs():
+            for path, doc in parsed_docs():
+                chunks = self.chunker.chunk(doc, path)
+                source = chunks[0].metadata.get("source") if chunks else None
+                _notify(progress, stage="chunked", file=source, chunks=len(chunks))
+                yield chunks
+
+        total_chunks = 0
+        report = {"added": 0, "unchanged": 0, "removed": 0, "deduplicated": 0}
+        try:
+            for batch in _batched(chunked_docs(), batch_size):
+                check_cancelled()
+                batch_report = self.db_manager.sync_documents(collection_name, batch)
+                total_chunks += len(batch)
+                _notify(progress, stage="embedded", chunks=total_chunks)
+                for key in report:
+                    report[key] += batch_report[key]
+        except OperationCancelled as e:
+            logger.warning(
+                f"Ingestion into collection {collection_name} cancelled after {total_chunks} chunks: {e}",
+                extra={"collection": collection_name, "chunks": total_chunks},
+            )
+            raise
+
+        for path, error in failed.items():
+            logger.error(f"Failed to ragify {path}: {error}", extra={"file": path, "collection": collection_name})
+
+        return {
+            "files": len(file_paths) - len(failed),
+            "chunks": total_chunks,
+            **report,
+            "embeds_avoided_pct": embeds_avoided_pct(report),
+            "failed": failed,
+        }
         
         
 if __name__ == "__main__":
     ragify = RagifyPipe()
     ragify("../../samples/sample2.pdf","test_collection")
-    
\ No newline at end of file
+    
@@ -0,0 +1,157 @@
+"""Server-side conversation store with token-budgeted history windows."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from core.tokens import estimate_tokens
+
+load_dotenv()
+
+# Share of the history budget reserved for verbatim recent turns, the rest goes to the compacted summary
+RECENT_SHARE = 0.75
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = " ".join(str(text).split())
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "…"
+
+
+def assistant_turn(code_blocks: List[str], final_answer: str) -> Dict:
+    """History entry of an agent answer: its last two code blocks, or the final answer when no code ran."""
+    if len(code_blocks) >= 2:
+        content = f"Before Last code block : \n{code_blocks[-2]}\n\nLast code block : \n{code_blocks[-1]}"
+    elif len(code_blocks) == 1:
+        content = code_blocks[-1]
+    else:
+        content = final_answer
+    return {"role": "assistant", "content": content}
+
+
+class SessionStore:
+    """
+    Keeps the turns of every conversation on the server, so clients only send the new message.
+
+    Sessions live in an in-memory LRU of max_sessions entries; when db_path is set they are
+    also persisted to SQLite and reloaded on a cache miss (e.g. after a restart).
+    """
+
+    def __init__(self, max_sessions: Optional[int] = None, db_path: Optional[str] = None, token_budget: Optional[int] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_sessions: Sessions kept in memory (defaults to SESSION_CACHE_SIZE or 256)
+            db_path: Optional SQLite file for persistence (defaults to SESSIONS_DB_PATH, unset = memory only)
+            token_budget: Default token budget of the history window (defaults to SESSION_HISTORY_TOKENS or 2000)
+        """
+        self.max_sessions = max_sessions or int(os.getenv("SESSION_CACHE_SIZE", 256))
+        self.token_budget = token_budget or int(os.getenv("SESSION_HISTORY_TOKENS", 2000))
+        self.db_path = db_path or os.getenv("SESSIONS_DB_PATH")
+        self._sessions: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._conn = None
+        if self.db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_turns ("
+                "session_id TEXT NOT NULL, position INTEGER NOT NULL, turn TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (session_id, position))"
+            )
+            self._conn.commit()
+
+    def _load(self, session_id: str) -> List[Dict]:
+        """Turns of a session from memory, or from SQLite on a miss (lock held)."""
+        if session_id in self._sessions:
+            self._sessions.move_to_end(session_id)
+            return self._sessions[session_id]
+
+        turns = []
+        if self._conn is not None:
+            rows = self._conn.execute(
+                "SELECT turn FROM session_turns WHERE session_id = ? ORDER BY position", (session_id,)
+            ).fetchall()
+            turns = [json.loads(row[0]) for row in rows]
+
+        self._sessions[session_id] = turns
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return turns
+
+    def get_turns(self, session_id: str) -> List[Dict]:
+        """All turns of a session, oldest first."""
+        with self._lock:
+            return list(self._load(session_id))
+
+    def append(self, session_id: str, turn: Dict):
+        """Add a turn ({"role", "content", ...}) at the end of a session."""
+        with self._lock:
+            turns = self._load(session_id)
+            turns.append(turn)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT INTO session_turns (session_id, position, turn, created_at) VALUES (?, ?, ?, ?)",
+                    (session_id, len(turns) - 1, json.dumps(turn), time.time()),
+                )
+                self._conn.commit()
+
+    def window(self, session_id: str, token_budget: Optional[int] = None) -> List[Dict]:
+        """
+        History to give the agent: the most recent turns verbatim within the token budget,
+        preceded by one compacted summary turn of the older ones when they don't fit.
+        The latest turn is always included, whatever its size.
+
+        Args:
+            session_id: The session
+            token_budget: Approximate token budget of the whole window (defaults to self.token_budget)
+        """
+        budget = token_budget or self.token_budget
+        turns = self.get_turns(session_id)
+
+        recent: List[Dict] = []
+        used = 0
+        for turn in reversed(turns):
+            cost = estimate_tokens(json.dumps(turn))
+            if recent and used + cost > budget * RECENT_SHARE:
+                break
+            recent.append(turn)
+            used += cost
+        recent.reverse()
+
+        older = turns[:len(turns) - len(recent)]
+        if older:
+            recent.insert(0, {"role": "system", "content": self._compact(older, max(budget - used, 0))})
+        return recent
+
+    def _compact(self, turns: List[Dict], token_budget: int) -> str:
+        """One-line-per-turn digest of older turns, newest kept first when the budget runs out."""
+        lines = []
+        used = 0
+        for turn in reversed(turns):
+            if turn.get("role") == "user":
+                line = f"- user: {_truncate(turn.get('content', ''), 200)}"
+                if turn.get("files_paths"):
+                    # Full paths: the agent may still need to open these files
+                    line += f" (files: {', '.join(turn['files_paths'])})"
+            else:
+                line = f"- {turn.get('role', 'assistant')}: {_truncate(turn.get('content', ''), 120)}"
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        lines.reverse()
+
+        omitted = len(turns) - len(lines)
+        header = f"Compacted summary of {len(turns)} earlier turns"
+        if omitted:
+            header += f" ({omitted} oldest omitted)"
+        return header + ":\n" + "\n".join(lines)
@@ -0,0 +1,78 @@
+"""
+Shared setup of the offline unit tests (the test_api_* scripts need a running server).
+
+Every store is pointed at a temporary folder before the backend modules are imported, as they
+read their configuration at import time, and chunks are embedded with a small hashing embedder.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from typing import List
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+_WORKDIR = tempfile.mkdtemp(prefix="autoragent-tests-")
+os.environ.update(
+    {
+        "VECTOR_BACKEND": "local",
+        "VECTOR_STORE_PATH": os.path.join(_WORKDIR, "vectors"),
+        "CATALOG_PATH": os.path.join(_WORKDIR, "catalog.json"),
+        "LEXICAL_INDEX_DIR": os.path.join(_WORKDIR, "lexical"),
+        "DEDUP_INDEX_DIR": os.path.join(_WORKDIR, "dedup"),
+        "PARSE_CACHE_DIR": os.path.join(_WORKDIR, "parse_cache"),
+        "EMBEDDING_CACHE_PATH": os.path.join(_WORKDIR, "embeddings.sqlite3"),
+        "JOBS_DB_PATH": os.path.join(_WORKDIR, "jobs.sqlite3"),
+        "SESSIONS_DB_PATH": os.path.join(_WORKDIR, "sessions.sqlite3"),
+        "HF_HUB_OFFLINE": "1",
+    }
+)
+
+
+class HashingEmbeddings(Embeddings):
+    """Bag of words hashed into a normalized vector: texts sharing words are close."""
+
+    def __init__(self, dimension: int = 64):
+        self.dimension = dimension
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode("utf-8")).hexdigest(), 16) % self.dimension] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def chunk(text: str, source: str = "a.pdf", page: str = "1", **metadata) -> Document:
+    return Document(page_content=text, metadata={"source": source, "page_numbers": page, "title": None, **metadata})
+
+
+@pytest.fixture
+def embeddings():
+    return HashingEmbeddings()
+
+
+@pytest.fixture
+def db(embeddings):
+    from core.DBHandler import VectorDBManager
+
+    return VectorDBManager(embedding_function=embeddings)
+
+
+@pytest.fixture
+def collection():
+    """A fresh collection name."""
+    return f"test-{uuid.uuid4().hex[:12]}"
@@ -0,0 +1,123 @@
+"""Collections catalog: incremental updates, persistence, pagination and the /collections ETags."""
+
+import json
+import os
+
+import pytest
+
+from conftest import chunk
+from core.catalog import CollectionCatalog
+from core.vector_store import LocalVectorClient
+
+
+@pytest.fixture
+def client(tmp_path):
+    client = LocalVectorClient(path=str(tmp_path / "vectors"), index_threshold=0)
+    for name, count in (("beta", 3), ("alpha", 2), ("gamma", 1)):
+        client.create_collection(name).upsert(
+            ids=[f"{name}-{i}" for i in range(count)],
+            embeddings=[[float(i), 1.0] for i in range(count)],
+            documents=[f"{name} chunk {i}" for i in range(count)],
+            metadatas=[{"source": f"{name}-{i % 2}.pdf"} for i in range(count)],
+        )
+    return client
+
+
+def test_pages_are_sorted_by_name(client, tmp_path):
+    catalog = CollectionCatalog(client, path=str(tmp_path / "catalog.json"))
+    version, total, page = catalog.page(offset=1, limit=1)
+
+    assert total == 3
+    assert [item["name"] for item in page] == ["beta"]
+    assert page[0]["count"] == 3 and page[0]["sources"] == ["beta-0.pdf", "beta-1.pdf"]
+    assert page[0]["preview"] == ["beta chunk 0", "beta chunk 1", "beta chunk 2"]
+    assert "sources" not in catalog.page(with_sources=False)[2][0]
+    assert catalog.page()[0] == version
+
+
+def test_writes_update_entries_and_the_version(client, tmp_path):
+    catalog = CollectionCatalog(client, path=str(tmp_path / "catalog.json"))
+    version = catalog.page()[0]
+
+    catalog.record_added("alpha", ["alpha-9"], [chunk("new chunk", source="new.pdf")])
+    client.get_collection("beta").delete(ids=["beta-0"])
+    catalog.record_removed("beta", ["beta-0"], ["beta-0.pdf"])
+    catalog.record_dropped("gamma")
+    new_version, total, page = catalog.page()
+
+    assert new_version != version and total == 2
+    alpha, beta = page
+    assert alpha["count"] == 3 and "new.pdf" in alpha["sources"]
+    # Entries carry the generation of their last change
+    assert alpha["generation"] < beta["generation"]
+    assert beta["count"] == 2 and beta["preview"] == ["beta chunk 1", "beta chunk 2"]
+    # beta-2 is still from beta-0.pdf
+    assert beta["sources"] == ["beta-0.pdf", "beta-1.pdf"]
+
+
+def test_removals_drop_emptied_sources_and_refill_the_preview(tmp_path):
+    client = LocalVectorClient(path=str(tmp_path / "vectors"), index_threshold=0)
+    collection = client.create_collection("docs")
+    collection.upsert(
+        ids=[f"c{i}" for i in range(8)],
+        embeddings=[[float(i), 1.0] for i in range(8)],
+        documents=[f"chunk {i}" for i in range(8)],
+        metadatas=[{"source": "old.pdf" if i < 2 else "new.pdf"} for i in range(8)],
+    )
+    catalog = CollectionCatalog(client, path=str(tmp_path / "catalog.json"))
+    assert catalog.page()[2][0]["preview"] == [f"chunk {i}" for i in range(5)]
+
+    collection.delete(ids=["c0", "c1"])
+    catalog.record_removed("docs", ["c0", "c1"], ["old.pdf"])
+    entry = catalog.page()[2][0]
+
+    assert entry["sources"] == ["new.pdf"]
+    assert entry["preview"] == [f"chunk {i}" for i in range(2, 7)]
+
+
+def test_persisted_catalog_only_rescans_changed_collections(client, tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.json")
+    CollectionCatalog(client, path=path, save_delay=0).page()
+    client.get_collection("gamma").upsert(ids=["gamma-1"], embeddings=[[1.0, 1.0]], documents=["late chunk"])
+
+    catalog = CollectionCatalog(client, path=path)
+    scanned = []
+    original = catalog._scan
+    monkeypatch.setattr(catalog, "_scan", lambda name: scanned.append(name) or original(name))
+    page = catalog.page()[2]
+
+    assert scanned == ["gamma"]
+    assert [item["count"] for item in page] == [2, 3, 2]
+
+
+def test_writes_are_persisted_in_batches(client, tmp_path, monkeypatch):
+    path = str(tmp_path / "catalog.json")
+    catalog = CollectionCatalog(client, path=path, save_delay=60)
+    writes = []
+    monkeypatch.setattr("core.catalog.os.replace", lambda src, dst: writes.append(dst) or os.rename(src, dst))
+
+    catalog.page()
+    for i in range(10):
+        catalog.record_added("alpha", [f"alpha-new-{i}"], [chunk(f"chunk {i}")])
+    assert writes == [] and not os.path.exists(path)
+
+    catalog.flush()
+    catalog.flush()
+    assert writes == [path]
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["collections"]["alpha"]["count"] == 12
+
+
+def test_collections_endpoint_revalidates_with_the_etag():
+    from fastapi.testclient import TestClient
+
+    from api import app
+
+    http = TestClient(app)
+    first = http.get("/collections", params={"limit": 10})
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "no-cache"
+    etag = first.headers["ETag"]
+
+    assert http.get("/collections", params={"limit": 10}, headers={"If-None-Match": etag}).status_code == 304
+    # Another page has its own ETag
+    assert http.get("/collections", params={"limit": 5}, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,159 @@
+"""Agent runs off the event loop: streaming, slots, disconnect cancellation and run events."""
+
+import asyncio
+import json
+import threading
+import time
+
+from core.cancellation import check_cancelled
+from services.chat_runner import ChatRunner, emit_event, event_sink_scope
+
+
+def _line(type_, content):
+    return json.dumps({"type": type_, "content": content}) + "\n"
+
+
+async def _collect(lines):
+    return [json.loads(line) async for line in lines]
+
+
+async def _settled(runner, timeout=5.0):
+    """Stats once the run's worker thread is done and its slot was released."""
+    deadline = time.monotonic() + timeout
+    while runner.stats()["active"] and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    return runner.stats()
+
+
+async def _all_slots_free(runner):
+    acquired = [await runner.acquire() for _ in range(runner.max_concurrent)]
+    for _ in acquired:
+        runner.release()
+    return all(acquired)
+
+
+def test_lines_are_streamed_and_the_slot_released():
+    async def scenario():
+        runner = ChatRunner(max_concurrent=1, queue_timeout=0.5)
+        assert await runner.acquire()
+        lines = await _collect(runner.start(lambda: iter([_line("code", "a"), _line("final", "b")])))
+        return lines, await _settled(runner), await _all_slots_free(runner)
+
+    lines, stats, free = asyncio.run(scenario())
+    assert lines == [{"type": "code", "content": "a"}, {"type": "final", "content": "b"}]
+    assert stats["completed"] == 1 and stats["failed"] == 0 and free
+
+
+def test_failed_run_ends_with_an_error_line_and_releases_the_slot():
+    def failing():
+        yield _line("code", "a")
+        raise RuntimeError("LLM unavailable")
+
+    async def scenario():
+        runner = ChatRunner(max_concurrent=1, queue_timeout=0.5)
+        assert await runner.acquire()
+        lines = await _collect(runner.start(failing))
+        return lines, await _settled(runner), await _all_slots_free(runner)
+
+    lines, stats, free = asyncio.run(scenario())
+    assert lines[-1] == {"type": "error", "content": "LLM unavailable"}
+    assert stats["failed"] == 1 and stats["completed"] == 1 and free
+
+
+def test_disconnected_client_cancels_the_run():
+    stopped = threading.Event()
+
+    def blocking():
+        yield _line("code", "a")
+        try:
+            # A long tool call with cancellation checkpoints and nothing streamed
+            while True:
+                check_cancelled()
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    async def scenario():
+        runner = ChatRunner(max_concurrent=1, queue_timeout=0.5)
+        polls = []
+
+        async def is_disconnected():
+            polls.append(True)
+            return True
+
+        assert await runner.acquire()
+        lines = await _collect(runner.start(blocking, is_disconnected))
+        return lines, polls, await _settled(runner), await _all_slots_free(runner)
+
+    lines, polls, stats, free = asyncio.run(scenario())
+    assert lines == [{"type": "code", "content": "a"}] and polls
+    assert stopped.wait(5)
+    assert stats["cancelled"] == 1 and stats["active"] == 0 and free
+
+
+def test_consumer_closing_the_stream_cancels_the_run():
+    stopped = threading.Event()
+
+    def endless():
+        try:
+            while True:
+                yield _line("code", "a")
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+
+    async def scenario():
+        runner = ChatRunner(max_concurrent=1, queue_timeout=0.5)
+        assert await runner.acquire()
+        lines = runner.start(endless)
+        first = await lines.__anext__()
+        await lines.aclose()
+        return first, await _settled(runner), await _all_slots_free(runner)
+
+    first, stats, free = asyncio.run(scenario())
+    assert json.loads(first) == {"type": "code", "content": "a"}
+    assert stopped.wait(5)
+    assert stats["cancelled"] == 1 and free
+
+
+def test_request_waiting_past_the_queue_timeout_is_rejected():
+    async def scenario():
+        runner = ChatRunner(max_concurrent=1, queue_timeout=0.05)
+        assert await runner.acquire()
+        rejected = not await runner.acquire()
+        runner.release()
+        return rejected, runner.stats(), await runner.acquire()
+
+    rejected, stats, acquired_after_release = asyncio.run(scenario())
+    assert rejected and stats["rejected"] == 1 and stats["queued"] == 0
+    assert acquired_after_release
+
+
+def test_events_are_routed_to_the_run_that_emits_them():
+    def with_progress():
+        emit_event("progress", {"stage": "parsed"})
+        yield _line("final", "done")
+
+    async def scenario():
+        runner = ChatRunner(max_concurrent=2, queue_timeout=0.5)
+        assert await runner.acquire() and await runner.acquire()
+        return await asyncio.gather(
+            _collect(runner.start(with_progress)), _collect(runner.start(lambda: iter([_line("final", "other")])))
+        )
+
+    first, second = asyncio.run(scenario())
+    assert first == [{"type": "progress", "content": {"stage": "parsed"}}, {"type": "final", "content": "done"}]
+    assert second == [{"type": "final", "content": "other"}]
+
+
+def test_emit_event_sinks():
+    received, explicit = [], []
+    # Outside a run nothing happens
+    emit_event("progress", 1)
+    with event_sink_scope(received.append):
+        emit_event("progress", 2)
+        emit_event("progress", 3, sink=explicit.append)
+    emit_event("progress", 4)
+
+    assert [json.loads(line)["content"] for line in received] == [2]
+    assert [json.loads(line)["content"] for line in explicit] == [3]
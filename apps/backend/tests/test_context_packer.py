@@ -0,0 +1,61 @@
+"""Packing of retrieved chunks into a token budget."""
+
+from conftest import chunk
+from core.context_packer import pack_results, render, split_sentences
+from core.tokens import estimate_tokens
+
+FILLER = "The committee reviewed routine matters of the previous quarter without any decision."
+
+
+def test_split_sentences():
+    assert split_sentences("First one. Second one!\n\n# Title\n- item") == ["First one.", "Second one!", "# Title", "- item"]
+
+
+def test_hits_within_budget_are_kept_whole():
+    docs = [chunk("Pumps are inspected yearly. Valves monthly."), chunk("Gaskets are replaced when worn.")]
+    report = pack_results(docs, "inspection", token_budget=1000)
+
+    assert [hit.text for hit in report.hits] == ["Pumps are inspected yearly.\nValves monthly.", "Gaskets are replaced when worn."]
+    assert report.trimmed == report.dropped == 0
+    assert report.tokens == sum(estimate_tokens(s) for s in ("Pumps are inspected yearly.", "Valves monthly.", "Gaskets are replaced when worn."))
+
+
+def test_overlapping_sentences_are_removed():
+    docs = [chunk("Shared sentence. Only in the first."), chunk("Shared sentence. Only in the second.")]
+    report = pack_results(docs, "sentence", token_budget=1000)
+
+    assert report.hits[1].text == "Only in the second."
+    assert report.hits[1].trimmed and report.duplicate_sentences == 1
+
+
+def test_long_hit_is_trimmed_to_relevant_sentences():
+    text = " ".join([FILLER] * 6 + ["The warranty of the turbine lasts five years."] + [FILLER] * 6)
+    report = pack_results([chunk(text), chunk("Another result.")], "turbine warranty", token_budget=60, window=0)
+
+    first = report.hits[0]
+    assert first.trimmed and "The warranty of the turbine lasts five years." in first.text
+    assert first.text.startswith("[…]") and first.text.endswith("[…]")
+    assert report.tokens <= 60
+
+
+def test_hit_larger_than_its_share_leaves_room_for_the_others():
+    # A single sentence can't be trimmed to half of the budget
+    report = pack_results([chunk(FILLER), chunk("Short.")], "committee", token_budget=estimate_tokens(FILLER))
+
+    assert [hit.text for hit in report.hits] == ["Short."] and report.dropped == 1
+
+
+def test_exhausted_budget_drops_the_remaining_hits():
+    docs = [chunk(FILLER), chunk(FILLER.replace("committee", "board")), chunk("Last.")]
+    report = pack_results(docs, "committee", token_budget=estimate_tokens(FILLER), max_share=1.0)
+
+    assert len(report.hits) == 1 and report.dropped == 2
+
+
+def test_render_notes_what_was_cut():
+    docs = [chunk(FILLER), chunk(FILLER.replace("committee", "board"))]
+    report = pack_results(docs, "committee", token_budget=estimate_tokens(FILLER), max_share=1.0)
+    text = render(report, lambda doc: f"Source: {doc.metadata['source']}", "\n---\n")
+
+    assert text.startswith(f"Source: a.pdf\nContent:\n{FILLER}")
+    assert "1 lower-ranked result(s) dropped" in text
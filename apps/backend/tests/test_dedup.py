@@ -0,0 +1,89 @@
+"""Duplicate chunk detection: exact matches by default, MinHash near duplicates with DEDUP=near."""
+
+from conftest import chunk
+from core.dedup import NearDuplicateIndex, describe_duplicates
+
+BOILERPLATE = "This document is confidential and intended solely for the use of the addressee. " * 3
+INVOICE = (
+    "Invoice {number} issued by Acme Industrial Supplies for the delivery of forty centrifugal pumps, "
+    "twelve gate valves and spare gaskets to the Rotterdam plant, payable within thirty days of receipt. "
+    "Goods remain the property of the supplier until paid in full. Late payments bear interest at the "
+    "statutory rate plus two percent. Claims regarding damaged or missing items must be reported in writing "
+    "within eight days of delivery, together with the delivery note and photographs of the packaging."
+)
+
+
+def _stored(db, collection):
+    return db._get_collection_store(collection)._collection.get(include=["documents", "metadatas"])
+
+
+def test_exact_index_only_matches_the_normalized_text():
+    index = NearDuplicateIndex()
+    index.add(["a"], [chunk(INVOICE.format(number="INV-2024-0001"))])
+
+    assert index.find(index.fingerprint(INVOICE.format(number="INV-2024-0001").upper() + "  ")) == "a"
+    assert index.find(index.fingerprint(INVOICE.format(number="INV-2024-0002"))) is None
+
+
+def test_signs_and_number_formats_are_not_exact_duplicates(db, collection):
+    texts = ["Balance: -500 EUR", "Balance: 500 EUR", "Total due: 1,000 EUR", "Total due: 1.000 EUR", "TOTAL  due: 1,000 eur"]
+    report = db.add_documents(collection, [chunk(text, page=str(i)) for i, text in enumerate(texts)])
+
+    # Only the last one, differing by case and spacing, is a duplicate
+    assert report == {"added": 4, "unchanged": 0, "deduplicated": 1}
+    assert sorted(_stored(db, collection)["documents"]) == sorted(texts[:4])
+
+
+def test_near_index_matches_similar_text():
+    index = NearDuplicateIndex(near=True)
+    index.add(["a"], [chunk(INVOICE.format(number="INV-2024-0001"))])
+
+    assert index.find(index.fingerprint(INVOICE.format(number="INV-2024-0002"))) == "a"
+    assert index.find(index.fingerprint("Minutes of the quarterly budget review meeting")) is None
+    index.remove(["a"])
+    assert index.find(index.fingerprint(INVOICE.format(number="INV-2024-0002"))) is None
+
+
+def test_exact_duplicates_are_recorded_instead_of_stored(db, embeddings, collection):
+    report = db.add_documents(collection, [chunk(BOILERPLATE, source="a.pdf"), chunk(BOILERPLATE, source="b.pdf", page="4")])
+
+    assert report == {"added": 1, "unchanged": 0, "deduplicated": 1}
+    assert embeddings.calls == 1
+    stored = _stored(db, collection)
+    assert len(stored["ids"]) == 1
+    assert describe_duplicates(stored["metadatas"][0]) == "b.pdf (Page 4)"
+
+
+def test_identifiers_are_not_duplicates_by_default(db, embeddings, collection):
+    docs = [chunk(INVOICE.format(number=number), source=f"{number}.pdf") for number in ("INV-2024-0001", "INV-2024-0002")]
+    report = db.add_documents(collection, docs)
+
+    assert report["added"] == 2 and report["deduplicated"] == 0
+    assert embeddings.calls == 2
+    assert db.query(collection, "INV-2024-0002", k=1, mode="lexical")[0].metadata["source"] == "INV-2024-0002.pdf"
+
+
+def test_near_duplicates_stay_searchable(db, embeddings, collection, monkeypatch):
+    monkeypatch.setenv("DEDUP", "near")
+    docs = [chunk(INVOICE.format(number=number), source=f"{number}.pdf") for number in ("INV-2024-0001", "INV-2024-0002")]
+    report = db.add_documents(collection, docs)
+
+    # The second invoice is stored with its own text, but not embedded
+    assert report["added"] == 1 and report["deduplicated"] == 1
+    assert embeddings.calls == 1
+    assert len(_stored(db, collection)["ids"]) == 2
+    hit = db.query(collection, "INV-2024-0002", k=1, mode="lexical")[0]
+    assert hit.metadata["source"] == "INV-2024-0002.pdf" and "INV-2024-0002" in hit.page_content
+
+
+def test_removed_chunk_hands_its_duplicates_over(db, collection):
+    db.sync_documents(collection, [chunk(BOILERPLATE, source="a.pdf", source_path="/data/a.pdf")])
+    db.sync_documents(collection, [chunk(BOILERPLATE, source="b.pdf", source_path="/data/b.pdf", page="2")])
+    assert len(_stored(db, collection)["ids"]) == 1
+
+    # a.pdf no longer holds the boilerplate: b.pdf's copy takes over the stored chunk
+    report = db.sync_documents(collection, [chunk("Pump maintenance schedule", source="a.pdf", source_path="/data/a.pdf")])
+    assert report["removed"] == 1
+    stored = _stored(db, collection)
+    sources = {metadata["source_path"]: text for text, metadata in zip(stored["documents"], stored["metadatas"])}
+    assert sources == {"/data/a.pdf": "Pump maintenance schedule", "/data/b.pdf": BOILERPLATE}
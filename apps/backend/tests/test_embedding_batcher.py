@@ -0,0 +1,72 @@
+"""Length-bucketed, token-budgeted embedding batches."""
+
+import pytest
+
+from conftest import HashingEmbeddings
+from core.cancellation import CancelToken, OperationCancelled, cancellation_scope
+from core.embedding_batcher import LengthBucketedEmbeddings
+
+
+def word_tokenizer(texts, add_special_tokens=True, truncation=False):
+    """Stand-in for a HuggingFace tokenizer: one token per word, plus [CLS] and [SEP]."""
+    return {"input_ids": [[0] * (len(text.split()) + 2 * add_special_tokens) for text in texts]}
+
+
+class _RecordingEmbeddings(HashingEmbeddings):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def _text(words, tag=""):
+    return " ".join([f"w{tag}"] * words)
+
+
+def test_batches_are_sorted_and_within_the_budget():
+    batcher = LengthBucketedEmbeddings(HashingEmbeddings(), word_tokenizer, token_budget=100, max_batch_size=4)
+    lengths = [10, 50, 5, 30, 5, 5, 5, 5, 5, 60]
+    batches = list(batcher.batches(lengths))
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert [lengths[i] for i in batch] == sorted((lengths[i] for i in batch), reverse=True)
+        assert len(batch) <= 4 and len(batch) * max(lengths[i] for i in batch) <= 100
+    assert [[lengths[i] for i in batch] for batch in batches] == [[60], [50, 30], [10, 5, 5, 5], [5, 5, 5]]
+
+
+def test_text_over_the_budget_gets_its_own_batch():
+    batcher = LengthBucketedEmbeddings(HashingEmbeddings(), word_tokenizer, token_budget=100, max_batch_size=64)
+    assert list(batcher.batches([500, 300, 20, 20])) == [[0], [1], [2, 3]]
+    assert list(batcher.batches([0, 0])) == [[0, 1]]
+
+
+def test_vectors_are_returned_in_input_order():
+    model = _RecordingEmbeddings()
+    batcher = LengthBucketedEmbeddings(model, word_tokenizer, token_budget=60, max_batch_size=8)
+    texts = [_text(3, "a"), _text(30, "b"), _text(1, "c"), _text(12, "d"), _text(3, "e")]
+
+    assert batcher.embed_documents(texts) == HashingEmbeddings().embed_documents(texts)
+    # Short texts are not padded to the longest one
+    assert model.batches == [[texts[1]], [texts[3], texts[0], texts[4], texts[2]]]
+    assert batcher.embed_documents([]) == []
+    assert batcher.embed_query("pump") == HashingEmbeddings().embed_query("pump")
+
+
+def test_cancellation_stops_between_batches():
+    model = _RecordingEmbeddings()
+    batcher = LengthBucketedEmbeddings(model, word_tokenizer, token_budget=10, max_batch_size=1)
+    token = CancelToken()
+    original = model.embed_documents
+
+    def embed_then_cancel(texts):
+        token.cancel("client disconnected")
+        return original(texts)
+
+    model.embed_documents = embed_then_cancel
+    with cancellation_scope(token), pytest.raises(OperationCancelled):
+        batcher.embed_documents(["one", "two", "three"])
+    assert len(model.batches) == 1
@@ -0,0 +1,92 @@
+"""Persistent embedding cache: hits and misses, LRU eviction and the cache key."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from conftest import HashingEmbeddings
+from core.embedding_cache import CachedEmbeddings
+
+
+class _QueryAwareEmbeddings(HashingEmbeddings):
+    """Embeds queries differently from documents, as instruction-tuned models do."""
+
+    def __init__(self):
+        super().__init__()
+        self.queries = 0
+
+    def embed_query(self, text):
+        self.queries += 1
+        return (-np.asarray(self._embed(text))).tolist()
+
+
+@pytest.fixture
+def model():
+    return _QueryAwareEmbeddings()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Strictly increasing time, so the recency of entries written in the same instant is ordered."""
+    ticks = itertools.count(1)
+    monkeypatch.setattr("core.embedding_cache.time.time", lambda: float(next(ticks)))
+
+
+def _cache(model, tmp_path, **kwargs):
+    return CachedEmbeddings(model, "test/model", path=str(tmp_path / "embeddings.sqlite3"), **kwargs)
+
+
+def test_only_missing_texts_are_embedded(model, tmp_path):
+    cache = _cache(model, tmp_path)
+    first = cache.embed_documents(["pump", "valve", "pump"])
+    assert model.calls == 2 and cache.stats() == {"hits": 0, "misses": 2, "entries": 2}
+
+    second = cache.embed_documents(["valve", "gasket", "pump"])
+    assert model.calls == 3 and cache.stats() == {"hits": 2, "misses": 3, "entries": 3}
+    np.testing.assert_allclose(second[0], first[1], rtol=1e-6)
+    np.testing.assert_allclose(second[2], first[0], rtol=1e-6)
+    assert cache.embed_documents([]) == []
+
+
+def test_vectors_are_persisted(model, tmp_path):
+    vector = _cache(model, tmp_path).embed_documents(["pump"])[0]
+    reopened = _cache(model, tmp_path)
+
+    np.testing.assert_allclose(reopened.embed_documents(["pump"])[0], vector, rtol=1e-6)
+    assert model.calls == 1 and reopened.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(model, tmp_path, clock):
+    cache = _cache(model, tmp_path, max_entries=3)
+    cache.embed_documents(["a", "b", "c"])
+    # "a" is used again, "b" becomes the least recently used
+    cache.embed_documents(["a"])
+    cache.embed_documents(["d"])
+    assert cache.stats()["entries"] == 3
+
+    calls = model.calls
+    cache.embed_documents(["a", "c", "d"])
+    assert model.calls == calls
+    cache.embed_documents(["b"])
+    assert model.calls == calls + 1
+
+
+def test_queries_and_documents_are_cached_apart(model, tmp_path):
+    cache = _cache(model, tmp_path)
+    document = cache.embed_documents(["pump"])[0]
+    query = cache.embed_query("pump")
+
+    assert model.queries == 1 and not np.allclose(document, query)
+    np.testing.assert_allclose(cache.embed_query("pump"), query, rtol=1e-6)
+    assert model.queries == 1 and cache.stats()["entries"] == 2
+
+
+def test_models_and_normalization_are_cached_apart(model, tmp_path):
+    path = str(tmp_path / "embeddings.sqlite3")
+    CachedEmbeddings(model, "test/model", path=path).embed_documents(["pump"])
+    CachedEmbeddings(model, "other/model", path=path).embed_documents(["pump"])
+    CachedEmbeddings(model, "test/model", normalize=False, path=path).embed_documents(["pump"])
+
+    assert model.calls == 3
+    assert CachedEmbeddings(model, "test/model", path=path).stats()["entries"] == 3
@@ -0,0 +1,109 @@
+"""Streaming TXT / CSV / XLSX readers: pages, markdown rendering and chunking."""
+
+import pytest
+
+from core.fast_readers import FastDocument, fast_format
+
+
+def word_tokenizer(texts, add_special_tokens=False):
+    """Stand-in for a HuggingFace tokenizer: one token per word."""
+    if isinstance(texts, str):
+        return {"input_ids": list(range(len(texts.split())))}
+    return {"input_ids": [list(range(len(text.split()))) for text in texts]}
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_fast_format():
+    assert fast_format("a/B.TXT") == "text" and fast_format("b.tsv") == "table"
+    assert fast_format("c.pdf") is None
+    with pytest.raises(ValueError):
+        FastDocument("c.pdf")
+
+
+def test_form_feeds_split_text_pages(tmp_path):
+    doc = FastDocument(_write(tmp_path, "notes.txt", "one\ntwo\fthree\n\ffour\n"))
+
+    assert list(doc.iter_lines()) == [(1, "one"), (1, "two"), (2, "three"), (3, "four")]
+    assert list(doc.iter_markdown_pages()) == [(1, "one\ntwo"), (2, "three"), (3, "four")]
+    ranged = FastDocument(doc.path, page_range=(2, 3))
+    assert ranged.export_to_markdown() == "three\n\nfour"
+
+
+def test_csv_is_rendered_as_a_markdown_table(tmp_path):
+    doc = FastDocument(_write(tmp_path, "parts.csv", "part;qty\nvalve;3\n\npipe|elbow;1\n"))
+
+    assert doc.pages == {1: "parts.csv"}
+    assert doc.export_to_markdown() == "| part | qty |\n| --- | --- |\n| valve | 3 |\n| pipe\\|elbow | 1 |"
+
+
+def test_xlsx_sheets_are_pages(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    workbook = openpyxl.Workbook()
+    workbook.active.title = "Orders"
+    workbook.active.append(["id", "total"])
+    workbook.active.append([1, 9.5])
+    workbook.create_sheet("Empty")
+    path = str(tmp_path / "book.xlsx")
+    workbook.save(path)
+
+    doc = FastDocument(path)
+    assert doc.pages == {1: "Orders", 2: "Empty"}
+    assert list(doc.iter_markdown_pages()) == [(1, "## Orders\n\n| id | total |\n| --- | --- |\n| 1 | 9.5 |")]
+    assert [chunk.metadata["title"] for chunk in doc.chunk(word_tokenizer, 50, 0)] == ["Orders"]
+
+
+def test_text_chunks_are_windows_of_whole_lines(tmp_path):
+    lines = [f"line {i} of the report" for i in range(12)]
+    doc = FastDocument(_write(tmp_path, "report.txt", "\n".join(lines[:6]) + "\f" + "\n".join(lines[6:])))
+    chunks = doc.chunk(word_tokenizer, max_tokens=20, overlap=6)
+
+    # 5 words + 1 per line: 3 lines per chunk, the last line carried over
+    assert [chunk.page_content.split("\n") for chunk in chunks[:2]] == [lines[0:3], lines[2:5]]
+    assert chunks[-1].page_content.split("\n")[-1] == lines[-1]
+    assert {chunk.metadata["page_numbers"] for chunk in chunks} == {"1", "1,2", "2"}
+    assert all(chunk.metadata["source"] == "report.txt" for chunk in chunks)
+
+
+def test_table_chunks_repeat_the_header(tmp_path):
+    rows = "\n".join(f"item{i},{i}" for i in range(10))
+    chunks = FastDocument(_write(tmp_path, "items.csv", "name,count\n" + rows)).chunk(word_tokenizer, max_tokens=30, overlap=0)
+
+    assert len(chunks) > 1
+    assert all(chunk.page_content.startswith("| name | count |\n| --- | --- |\n") for chunk in chunks)
+    body = [line for chunk in chunks for line in chunk.page_content.split("\n")[2:]]
+    assert body == [f"| item{i} | {i} |" for i in range(10)]
+
+
+def char_tokenizer(texts, add_special_tokens=False):
+    """Stand-in tokenizer with one token per 4 characters, for text without spaces."""
+    if isinstance(texts, str):
+        return {"input_ids": list(range(-(-len(texts) // 4)))}
+    return {"input_ids": [list(range(-(-len(text) // 4))) for text in texts]}
+
+
+def test_line_longer_than_a_chunk_is_cut_into_word_windows(tmp_path):
+    words = [f"w{i}" for i in range(100)]
+    chunks = FastDocument(_write(tmp_path, "one_line.txt", " ".join(words))).chunk(word_tokenizer, max_tokens=20, overlap=4)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.page_content.split()) <= 20 for chunk in chunks)
+    # Windows overlap, every word is kept in order
+    kept = [word for chunk in chunks for word in chunk.page_content.split()]
+    assert sorted(set(kept), key=kept.index) == words
+
+
+def test_row_and_word_longer_than_a_chunk_are_cut(tmp_path):
+    blob = "x" * 400
+    path = _write(tmp_path, "blob.csv", f"name,data\nitem,{blob}\n")
+    chunks = FastDocument(path).chunk(char_tokenizer, max_tokens=40, overlap=0)
+
+    assert len(chunks) > 1
+    assert all(chunk.page_content.startswith("| name | data |") for chunk in chunks)
+    # Token counts of the character slices are estimated, hence the small margin
+    assert all(len(char_tokenizer(chunk.page_content)["input_ids"]) <= 40 + 5 for chunk in chunks)
+    assert "".join(chunk.page_content.split("\n")[2] for chunk in chunks).count("x") == 400
@@ -0,0 +1,118 @@
+"""Batch ingestion: documents parsed in a worker pool, chunked as they finish and written in large batches."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import chunk
+from services import ragify
+from services.ragify import RagifyPipe, _batched
+
+CHUNKS_PER_FILE = 3
+
+
+class _Doc:
+    def __init__(self, name, pages=2):
+        self.name = name
+        self.pages = {page: None for page in range(1, pages + 1)}
+
+
+class _Parser:
+    """Parses in this process: only text & tabular files get here when a pool is used."""
+
+    profile = "fast"
+
+    def __init__(self):
+        self.parsed = []
+
+    def parse(self, path):
+        self.parsed.append(path)
+        if "broken" in path:
+            raise ValueError("unreadable file")
+        return _Doc(path.rsplit("/", 1)[-1])
+
+
+class _Chunker:
+    def chunk(self, doc, path):
+        name = path.rsplit("/", 1)[-1]
+        return [chunk(f"{name} part {i} about pumps", source=name, source_path=path) for i in range(CHUNKS_PER_FILE)]
+
+
+def _parse_in_worker(path, profile=None):
+    from docling_core.types.doc import DoclingDocument, Size
+
+    if "broken" in path:
+        raise ValueError("unreadable pdf")
+    doc = DoclingDocument(name=path.rsplit("/", 1)[-1])
+    doc.add_page(page_no=1, size=Size(width=600, height=800))
+    # A parse cache hit has no conversion to record
+    return doc.model_dump_json(), None if "cached" in path else (profile, 0.5)
+
+
+@pytest.fixture
+def pipe(db, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=2)
+    pools = []
+    monkeypatch.setattr(ragify, "_parse_in_worker", _parse_in_worker)
+    monkeypatch.setattr(ragify.registry, "get_parse_pool", lambda workers: pools.append(workers) or pool)
+    pipe = RagifyPipe.__new__(RagifyPipe)
+    pipe.parser, pipe.chunker, pipe.db_manager = _Parser(), _Chunker(), db
+    pipe.pools = pools
+    yield pipe
+    pool.shutdown()
+
+
+@pytest.fixture
+def batches(db, monkeypatch):
+    """Chunks of each sync_documents call."""
+    calls = []
+    sync = db.sync_documents
+    monkeypatch.setattr(db, "sync_documents", lambda name, docs: calls.append(docs) or sync(name, docs))
+    return calls
+
+
+def test_batched_never_splits_a_document():
+    docs = [[f"d{d}-{i}" for i in range(size)] for d, size in enumerate((3, 3, 1, 6, 2))]
+    assert [len(batch) for batch in _batched(docs, 5)] == [6, 7, 2]
+    assert [len(batch) for batch in _batched(docs, 100)] == [15]
+
+
+def test_pdfs_are_parsed_in_the_pool_and_written_in_batches(pipe, batches, collection):
+    paths = ["/data/a.pdf", "/data/b.pdf", "/data/cached.pdf", "/data/notes.txt"]
+    events = []
+    report = pipe.ingest_many(paths, collection, workers=2, batch_size=5, progress=events.append)
+
+    assert pipe.pools == [2]
+    # Only the text file is read in this process
+    assert pipe.parser.parsed == ["/data/notes.txt"]
+    assert [len(batch) for batch in batches] == [6, 6]
+    for batch in batches:
+        sources = [doc.metadata["source"] for doc in batch]
+        assert all(sources.count(source) == CHUNKS_PER_FILE for source in sources)
+
+    assert report == {
+        "files": 4, "chunks": 12, "added": 12, "unchanged": 0, "removed": 0, "deduplicated": 0,
+        "embeds_avoided_pct": 0.0, "failed": {},
+    }
+    assert sorted(event["file"] for event in events if event["stage"] == "parsed") == sorted(paths)
+    assert [event["chunks"] for event in events if event["stage"] == "embedded"] == [6, 12]
+    assert pipe.db_manager.client.get_collection(collection).count() == 12
+
+
+def test_failed_files_are_reported_without_stopping_the_others(pipe, batches, collection):
+    report = pipe.ingest_many(["/data/a.pdf", "/data/broken.pdf", "/data/broken.txt"], collection, workers=2, batch_size=100)
+
+    assert report["files"] == 1 and report["chunks"] == CHUNKS_PER_FILE
+    assert report["failed"] == {"/data/broken.pdf": "unreadable pdf", "/data/broken.txt": "unreadable file"}
+    assert len(batches) == 1
+
+
+def test_single_worker_parses_in_process(pipe, batches, collection):
+    report = pipe.ingest_many(["/data/a.pdf", "/data/b.pdf"], collection, workers=1, batch_size=1)
+
+    assert pipe.pools == [] and pipe.parser.parsed == ["/data/a.pdf", "/data/b.pdf"]
+    assert [len(batch) for batch in batches] == [CHUNKS_PER_FILE, CHUNKS_PER_FILE]
+    assert report["added"] == 2 * CHUNKS_PER_FILE
+
+    # Ingesting the same files again embeds nothing
+    assert pipe.ingest_many(["/data/a.pdf", "/data/b.pdf"], collection, workers=1)["unchanged"] == 2 * CHUNKS_PER_FILE
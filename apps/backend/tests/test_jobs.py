@@ -0,0 +1,148 @@
+"""Background ingestion jobs: the job table, the manager and the /ingest endpoints."""
+
+import json
+import threading
+
+import pytest
+
+from core.cancellation import check_cancelled
+from services.jobs import IngestionJobManager, JobStore
+
+
+class _Pipe:
+    """Stand-in for RagifyPipe reporting progress, optionally blocking until released."""
+
+    release = threading.Event()
+    blocking = False
+
+    def __init__(self, profile=None):
+        self.profile = profile
+
+    def __call__(self, path, collection_name, progress):
+        progress({"stage": "parsed", "pages": 2})
+        progress({"stage": "chunked", "chunks": 4})
+        if self.blocking:
+            assert self.release.wait(5)
+            check_cancelled()
+        if path.endswith("broken.pdf"):
+            raise ValueError("unreadable file")
+        progress({"stage": "embedded", "chunks": 4})
+        return {"added": 3, "unchanged": 0, "removed": 0, "deduplicated": 1}
+
+    def ingest_many(self, file_paths, collection_name, progress):
+        for path in file_paths:
+            self(path, collection_name, progress)
+        return {"files": len(file_paths), "failed": {}}
+
+
+@pytest.fixture
+def pipe(monkeypatch):
+    import services.ragify
+
+    monkeypatch.setattr(services.ragify, "RagifyPipe", _Pipe)
+    _Pipe.blocking = False
+    _Pipe.release = threading.Event()
+    return _Pipe
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return IngestionJobManager(max_workers=1, store=JobStore(str(tmp_path / "jobs.sqlite3")))
+
+
+def test_job_runs_and_reports_progress(pipe, manager):
+    events = []
+    job_id = manager.submit(["/data/a.pdf"], "docs", listener=events.append, profile="fast")
+    job = manager.wait(job_id, timeout=5)
+
+    assert job["status"] == "done" and job["collection"] == "docs" and job["file_paths"] == ["/data/a.pdf"]
+    assert job["progress"] == {
+        "files_total": 1, "files_parsed": 1, "pages_parsed": 2, "chunks_produced": 4, "chunks_embedded": 4, "fraction": 1.0,
+    }
+    assert job["result"] == {
+        "files": 1, "chunks": 4, "added": 3, "unchanged": 0, "removed": 0, "deduplicated": 1, "embeds_avoided_pct": 25.0, "failed": {},
+    }
+    assert events[0]["status"] == "running" and events[-1]["status"] == "done"
+    assert manager.status("unknown") is None and not manager.cancel(job_id)
+
+
+def test_failed_job_records_the_error(pipe, manager):
+    job = manager.wait(manager.submit(["/data/broken.pdf"], "docs"), timeout=5)
+    assert job["status"] == "failed" and job["error"] == "unreadable file"
+
+
+def test_running_and_queued_jobs_can_be_cancelled(pipe, manager):
+    pipe.blocking = True
+    running = manager.submit(["/data/a.pdf"], "docs")
+    queued = manager.submit(["/data/b.pdf"], "docs")
+
+    assert manager.cancel(queued) and manager.cancel(running)
+    pipe.release.set()
+    assert manager.wait(running, timeout=5)["status"] == "cancelled"
+    assert manager.wait(queued, timeout=5)["status"] == "cancelled"
+
+
+def test_jobs_in_flight_at_restart_are_interrupted(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    store.create("queued-job", "docs", ["/data/a.pdf"], {})
+    store.create("running-job", "docs", ["/data/b.pdf"], {})
+    store.update("running-job", status="running")
+    store.create("done-job", "docs", ["/data/c.pdf"], {})
+    store.update("done-job", status="done", result={"files": 1})
+
+    restarted = JobStore(path)
+    assert [restarted.get(job_id)["status"] for job_id in ("queued-job", "running-job", "done-job")] == [
+        "interrupted", "interrupted", "done",
+    ]
+    assert restarted.get("done-job")["result"] == {"files": 1}
+
+
+@pytest.fixture
+def http(pipe, manager, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import api
+
+    monkeypatch.setattr(api.registry, "get_job_manager", lambda: manager)
+    monkeypatch.setenv("SESSIONS_FOLDER", str(tmp_path / "uploads"))
+    monkeypatch.setenv("INGEST_ROOTS", str(tmp_path / "shared"))
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "a.txt").write_text("Pump manual", encoding="utf-8")
+    return TestClient(api.app)
+
+
+def test_ingest_endpoints(http, tmp_path):
+    path = str(tmp_path / "shared" / "a.txt")
+    response = http.post("/ingest", data={"collection_name": "docs", "file_paths": json.dumps([path])})
+    assert response.status_code == 200 and response.json()["status"] == "queued"
+    job_id = response.json()["job_id"]
+
+    job = http.get(f"/ingest/{job_id}").json()
+    assert job["file_paths"] == [path]
+    assert http.delete(f"/ingest/{job_id}").json()["job_id"] == job_id
+    assert http.get("/ingest/unknown").status_code == 404
+    assert http.delete("/ingest/unknown").status_code == 404
+
+
+def test_uploads_are_ingested(http, manager, tmp_path):
+    response = http.post(
+        "/ingest", data={"collection_name": "docs", "session_id": "s1"}, files=[("files", ("notes.txt", b"Valve notes"))]
+    )
+    job = manager.wait(response.json()["job_id"], timeout=5)
+    assert job["file_paths"] == [str(tmp_path / "uploads" / "s1" / "notes.txt")]
+
+
+@pytest.mark.parametrize("file_paths", ['"abc"', "{}", "[1]", "not json"])
+def test_ingest_rejects_malformed_paths(http, file_paths):
+    response = http.post("/ingest", data={"collection_name": "docs", "file_paths": file_paths})
+    assert response.status_code == 400 and "JSON list of strings" in response.json()["detail"]
+
+
+def test_ingest_rejects_paths_outside_the_allowed_folders(http, tmp_path):
+    (tmp_path / "secret.txt").write_text("password", encoding="utf-8")
+    (tmp_path / "shared" / "link.txt").symlink_to(tmp_path / "secret.txt")
+
+    for path in ("/etc/passwd", str(tmp_path / "shared" / ".." / "secret.txt"), str(tmp_path / "shared" / "link.txt")):
+        response = http.post("/ingest", data={"collection_name": "docs", "file_paths": json.dumps([path])})
+        assert response.status_code == 400 and "outside" in response.json()["detail"]
@@ -0,0 +1,141 @@
+"""BM25 scoring, the persisted lexical index store and reciprocal rank fusion."""
+
+import math
+import os
+import threading
+
+import pytest
+from langchain_core.documents import Document
+
+from conftest import chunk
+from core.lexical_index import BM25Index, LexicalIndexStore, tokenize
+
+
+def _index(texts, **metadata):
+    index = BM25Index()
+    index.add([f"c{i}" for i in range(len(texts))], [chunk(text, **metadata) for text in texts])
+    return index
+
+
+def test_tokenize_keeps_identifiers_and_their_parts():
+    assert tokenize("Invoice INV-2024-0042, v4.2") == ["invoice", "inv-2024-0042", "inv", "2024", "0042", "v4.2", "v4", "2"]
+
+
+def test_bm25_score_matches_the_formula():
+    index = _index(["pump valve pump", "valve gasket", "boiler"])
+    (doc_id, score), *_ = index.search("pump", k=1)
+
+    n_docs, df, tf, length, avg_len = 3, 1, 2, 3, 6 / 3
+    idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+    expected = idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * length / avg_len))
+    assert doc_id == "c0"
+    assert score == pytest.approx(expected)
+
+
+def test_bm25_ranks_rare_terms_and_matches_identifiers():
+    index = _index(["the valve report", "the valve audit", "the boiler report INV-2024-0042"])
+    assert [doc_id for doc_id, _ in index.search("boiler valve", k=3)][0] == "c2"
+    assert [doc_id for doc_id, _ in index.search("inv-2024-0042")] == ["c2"]
+    assert index.search("turbine") == []
+
+
+def test_bm25_filter_and_remove():
+    index = BM25Index()
+    index.add(["a", "b"], [chunk("pump inspection", source="a.pdf"), chunk("pump warranty", source="b.pdf")])
+    assert [doc_id for doc_id, _ in index.search("pump", filter_metadata={"source": "b.pdf"})] == ["b"]
+
+    index.remove(["b"])
+    assert [doc_id for doc_id, _ in index.search("pump")] == ["a"]
+    assert "warranty" not in index.postings and index.total_len == 2
+
+    # Re-adding an ID replaces it
+    index.add(["a"], [chunk("boiler", source="a.pdf")])
+    assert index.search("pump") == [] and len(index) == 1
+
+
+def test_store_persists_changes_in_a_journal(tmp_path):
+    docs = [chunk(f"chunk {i} about pumps") for i in range(3)]
+    store = LexicalIndexStore(str(tmp_path))
+    store.get("col", lambda: (["c0", "c1"], docs[:2]))
+    store.update("col", None, add=(["c2"], docs[2:]), remove=["c0"])
+    assert os.path.isfile(tmp_path / "col.journal")
+
+    reopened = LexicalIndexStore(str(tmp_path))
+    index = reopened.get("col", lambda: pytest.fail("the index should be read from disk"))
+    assert sorted(index.docs) == ["c1", "c2"]
+
+
+def test_store_compacts_the_journal_once_it_outgrows_the_snapshot(tmp_path):
+    store = LexicalIndexStore(str(tmp_path))
+    store.get("col", lambda: (["c0"], [chunk("a short chunk")]))
+    snapshot_size = os.path.getsize(tmp_path / "col.pkl")
+    store.update("col", None, add=(["c1"], [chunk("a much longer chunk " * 100)]))
+    # Folded into a new snapshot: the journal would have been bigger than the snapshot
+    assert not os.path.exists(tmp_path / "col.journal")
+    assert os.path.getsize(tmp_path / "col.pkl") > snapshot_size
+
+
+def test_store_rebuilds_an_index_with_a_truncated_journal(tmp_path):
+    docs = [chunk("pump " * 200), chunk("valve")]
+    store = LexicalIndexStore(str(tmp_path))
+    store.get("col", lambda: (["c0"], docs[:1]))
+    store.update("col", None, add=(["c1"], docs[1:]))
+    journal = tmp_path / "col.journal"
+    journal.write_bytes(journal.read_bytes()[:-3])
+
+    index = LexicalIndexStore(str(tmp_path)).get("col", lambda: (["c0", "c1"], docs))
+    assert sorted(index.docs) == ["c0", "c1"]
+    assert not journal.exists()
+
+
+def test_store_rebuild_replaces_the_index(tmp_path):
+    store = LexicalIndexStore(str(tmp_path))
+    store.get("col", lambda: (["old"], [chunk("stale pump")]))
+    store.update("col", None, add=(["older"], [chunk("stale valve")]))
+
+    index = store.rebuild("col", lambda: (["c0", "c1"], [chunk("imported pump"), chunk("imported valve")]))
+    assert sorted(index.docs) == ["c0", "c1"] and store.get("col", None) is index
+    assert not (tmp_path / "col.journal").exists()
+    assert sorted(LexicalIndexStore(str(tmp_path)).get("col", None).docs) == ["c0", "c1"]
+
+
+def test_store_search_is_safe_during_writes(tmp_path):
+    store = LexicalIndexStore(str(tmp_path))
+    store.get("col", lambda: ([], []))
+    errors = []
+
+    def write():
+        try:
+            for batch in range(200):
+                ids = [f"b{batch}-{i}" for i in range(20)]
+                store.update("col", None, add=(ids, [chunk(f"pump term{batch}x{i}") for i in range(20)]))
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        while writer.is_alive():
+            store.search("col", None, "pump term1x1", k=5)
+    except Exception as e:
+        errors.append(e)
+    writer.join()
+    assert errors == []
+    assert len(store.search("col", None, "pump", k=10000)) == 4000
+
+
+def test_reciprocal_rank_fusion():
+    from core.DBHandler import reciprocal_rank_fusion
+
+    a, b, c, d = (Document(page_content=name, id=name) for name in "abcd")
+    fused = reciprocal_rank_fusion([[a, b, c], [c, d, a]], k=4)
+    # a: 1/61 + 1/63, c: 1/63 + 1/61 (tie, first seen wins), b: 1/62, d: 1/62
+    assert [doc.id for doc in fused] == ["a", "c", "b", "d"]
+    assert reciprocal_rank_fusion([[a, b], [b]], k=1)[0].id == "b"
+
+
+def test_reciprocal_rank_fusion_identifies_documents_without_id():
+    from core.DBHandler import reciprocal_rank_fusion
+
+    fused = reciprocal_rank_fusion([[chunk("same text")], [chunk("other")], [chunk("same text")]], k=2)
+    assert [doc.page_content for doc in fused] == ["same text", "other"]
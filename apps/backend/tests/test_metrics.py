@@ -0,0 +1,28 @@
+"""Prometheus metrics recorded by the pipeline and their exposition."""
+
+from prometheus_client import REGISTRY, generate_latest
+
+from conftest import chunk
+from core.metrics import DEDUPLICATED_CHUNKS, QUERY_SEARCH_SECONDS, WRITTEN_CHUNKS, total
+
+
+def test_writes_and_queries_are_recorded(db, collection):
+    written = total(WRITTEN_CHUNKS)
+    searches = total(QUERY_SEARCH_SECONDS, "_count")
+    db.add_documents(collection, [chunk("Pump maintenance schedule", page="1"), chunk("Valve inspection report", page="2")])
+    db.query(collection, "valve", k=1, mode="lexical")
+
+    assert total(WRITTEN_CHUNKS) == written + 2
+    assert total(QUERY_SEARCH_SECONDS, "_count") == searches + 1
+    labels = {"collection": collection, "retriever": "lexical"}
+    assert REGISTRY.get_sample_value("autoragent_query_search_seconds_count", labels) == 1
+
+
+def test_exposition_format():
+    DEDUPLICATED_CHUNKS.labels(match="exact").inc(3)
+    text = generate_latest().decode("utf-8")
+
+    assert "# TYPE autoragent_pages_parsed_total counter" in text
+    assert "# TYPE autoragent_parse_seconds histogram" in text
+    assert 'autoragent_deduplicated_chunks_total{match="exact"}' in text
+    assert 'autoragent_agent_steps_bucket{le="+Inf"}' in text
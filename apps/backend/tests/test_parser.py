@@ -0,0 +1,167 @@
+"""Page range parsing of parse_document / Parser.parse."""
+
+import sys
+
+import pytest
+
+from core.parser import parse_page_range
+
+
+@pytest.mark.parametrize(
+    "spec, page_count, expected",
+    [
+        ("1-10", None, (1, 10)),
+        ("7", None, (7, 7)),
+        (" 3 - 5 ", None, (3, 5)),
+        ("20-", None, (20, sys.maxsize)),
+        ("20-", 42, (20, 42)),
+        ("1-100", 42, (1, 42)),
+        ("42", 42, (42, 42)),
+    ],
+)
+def test_parse_page_range(spec, page_count, expected):
+    assert parse_page_range(spec, page_count) == expected
+
+
+@pytest.mark.parametrize("spec", ["", "a-b", "1-2-3", "0", "5-3", "-4"])
+def test_parse_page_range_rejects_malformed_ranges(spec):
+    with pytest.raises(ValueError):
+        parse_page_range(spec)
+
+
+def test_parse_page_range_rejects_ranges_after_the_last_page():
+    with pytest.raises(ValueError, match="starts after the last page"):
+        parse_page_range("43-50", 42)
+
+
+@pytest.fixture(scope="module")
+def parser():
+    from core.parser import Parser
+
+    return Parser()
+
+
+def _docling_document(page_texts):
+    """A DoclingDocument with the given {page_no: [texts]} (pages absent from the dict exist but are empty)."""
+    from docling_core.types.doc import BoundingBox, DocItemLabel, DoclingDocument, ProvenanceItem, Size
+
+    doc = DoclingDocument(name="test")
+    for page_no in range(1, max(page_texts) + 1):
+        doc.add_page(page_no=page_no, size=Size(width=600, height=800))
+    for page_no, texts in page_texts.items():
+        for text in texts:
+            prov = ProvenanceItem(page_no=page_no, bbox=BoundingBox(l=0, t=0, r=10, b=10), charspan=(0, len(text)))
+            doc.add_text(label=DocItemLabel.TEXT, text=text, prov=prov)
+    return doc
+
+
+def test_iter_markdown_pages_keeps_page_numbers(parser):
+    doc = _docling_document({1: ["first page", "still first"], 3: ["third page"]})
+    assert list(parser.iter_markdown_pages(doc)) == [(1, "first page\n\nstill first"), (2, ""), (3, "third page")]
+
+    text = parser.export_to_markdown_with_page_numbers(doc)
+    assert text.index("[START OF PAGE 1]") < text.index("still first") < text.index("[END OF PAGE 1]")
+    assert "[START OF PAGE 2]" in text and text.index("[START OF PAGE 3]") < text.index("third page")
+
+
+def test_iter_markdown_pages_falls_back_to_the_plain_export(parser, monkeypatch):
+    import core.parser
+
+    monkeypatch.setattr(core.parser, "_PAGE_MARKERS", False)
+    doc = _docling_document({1: ["first page"], 2: ["second page"]})
+    assert list(parser.iter_markdown_pages(doc)) == [(1, "first page"), (2, "second page")]
+
+
+def test_auto_profile_cache_hit_does_not_open_the_pdf(parser, tmp_path, monkeypatch):
+    import core.parser
+
+    path = tmp_path / "scan.pdf"
+    path.write_bytes(b"%PDF-1.4 not a real PDF")
+    parser.cache.store(str(path), _docling_document({1: ["cached text"]}), "auto")
+    monkeypatch.setattr(core.parser, "is_born_digital", lambda path: pytest.fail("the PDF was opened on a cache hit"))
+
+    doc = parser.parse(str(path), profile="auto")
+    assert list(parser.iter_markdown_pages(doc)) == [(1, "cached text")]
+    assert parser.last_conversion is None
+
+
+def _pdf(path, page_texts):
+    """Write a minimal PDF with one page per text (None for a page without text layer, like a scan)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = b"" if text is None else f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+            % len(objects)
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(bytes(out))
+    return str(path)
+
+
+TEXT = "The pump must be inspected every year by a certified technician."
+
+
+def test_is_born_digital_checks_the_text_layer(tmp_path):
+    from core.parser import is_born_digital
+
+    assert is_born_digital(_pdf(tmp_path / "digital.pdf", [TEXT] * 3))
+    assert not is_born_digital(_pdf(tmp_path / "scan.pdf", [None] * 3))
+    # Short texts (page numbers, stamps) don't count
+    assert not is_born_digital(_pdf(tmp_path / "stamped.pdf", ["12"] * 3))
+
+    mixed = _pdf(tmp_path / "mixed.pdf", [TEXT, None])
+    assert not is_born_digital(mixed) and is_born_digital(mixed, min_share=0.5)
+
+
+def test_is_born_digital_samples_pages_across_the_document(tmp_path, monkeypatch):
+    import pypdfium2
+
+    from core.parser import is_born_digital
+
+    path = _pdf(tmp_path / "long.pdf", [TEXT] * 40)
+    opened = []
+    get_page = pypdfium2.PdfDocument.__getitem__
+    monkeypatch.setattr(pypdfium2.PdfDocument, "__getitem__", lambda pdf, i: opened.append(i) or get_page(pdf, i))
+
+    assert is_born_digital(path, sample_pages=4)
+    assert opened == [0, 10, 20, 30]
+
+
+def test_resolve_profile(parser, tmp_path):
+    from core.parser import PDF_PROFILES
+
+    digital = _pdf(tmp_path / "digital.pdf", [TEXT])
+    scan = _pdf(tmp_path / "scan.pdf", [None])
+
+    assert parser.resolve_profile(digital, "auto") == ("balanced-text-layer", {**PDF_PROFILES["balanced"], "do_ocr": False})
+    assert parser.resolve_profile(scan, "auto") == ("balanced", PDF_PROFILES["balanced"])
+    # Explicit profiles never open the file, other formats go through the balanced pipeline
+    assert parser.resolve_profile(str(tmp_path / "missing.pdf"), "fast") == ("fast", PDF_PROFILES["fast"])
+    assert parser.resolve_profile(str(tmp_path / "report.docx"), "auto") == ("balanced", PDF_PROFILES["balanced"])
+    with pytest.raises(ValueError, match="Unknown parse profile"):
+        parser.resolve_profile(digital, "fastest")
+
+
+def test_default_profile_comes_from_the_environment(monkeypatch):
+    from core.parser import Parser
+
+    monkeypatch.setenv("PARSE_PROFILE", "accurate")
+    assert Parser().profile == "accurate"
+    assert Parser("fast").resolve_profile("a.pdf")[0] == "fast"
+    monkeypatch.setenv("PARSE_PROFILE", "turbo")
+    with pytest.raises(ValueError):
+        Parser()
@@ -0,0 +1,66 @@
+"""Query result cache: key normalization, generation invalidation, TTL and LRU eviction."""
+
+import time
+
+from conftest import chunk
+from core.query_cache import QueryCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  What is the  Warranty? ") == normalize_query("what is the warranty")
+
+
+def test_hit_returns_copies():
+    cache = QueryCache(max_entries=10, ttl=60)
+    key = cache.make_key("docs", "warranty", 5)
+    assert cache.get(key) is None
+    cache.put(key, [chunk("Two years")])
+
+    hit = cache.get(cache.make_key("docs", "Warranty?", 5))
+    hit[0].page_content = "changed"
+    assert cache.get(key)[0].page_content == "Two years"
+    assert cache.stats() == {"hits": 2, "misses": 1, "evictions": 0, "invalidations": 0, "entries": 1}
+
+
+def test_invalidation_bumps_the_generation_of_one_collection():
+    cache = QueryCache(max_entries=10, ttl=60)
+    docs_key, other_key = cache.make_key("docs", "warranty", 5), cache.make_key("other", "warranty", 5)
+    cache.put(docs_key, [chunk("Two years")])
+    cache.put(other_key, [chunk("One year")])
+
+    cache.invalidate("docs")
+    assert cache.generation("docs") == 1
+    assert cache.get(cache.make_key("docs", "warranty", 5)) is None
+    assert cache.get(other_key)[0].page_content == "One year"
+
+
+def test_results_of_a_concurrent_write_are_not_cached():
+    cache = QueryCache(max_entries=10, ttl=60)
+    key = cache.make_key("docs", "warranty", 5)
+    # The collection is written to while the query runs
+    cache.invalidate("docs")
+    cache.put(key, [chunk("Stale")])
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_and_lru_eviction():
+    cache = QueryCache(max_entries=2, ttl=0.05)
+    keys = [cache.make_key("docs", f"query {i}", 5) for i in range(3)]
+    cache.put(keys[0], [chunk("0")])
+    cache.put(keys[1], [chunk("1")])
+    cache.get(keys[0])
+    cache.put(keys[2], [chunk("2")])
+    assert cache.get(keys[1]) is None and cache.get(keys[0]) is not None
+    assert cache.stats()["evictions"] == 1
+
+    time.sleep(0.06)
+    assert cache.get(keys[2]) is None
+
+
+def test_writes_invalidate_cached_queries(db, collection):
+    db.add_documents(collection, [chunk("Pumps need an inspection every six months")])
+    assert len(db.query(collection, "inspection", k=5, mode="lexical")) == 1
+    assert len(db.query(collection, "inspection", k=5, mode="lexical")) == 1
+
+    db.add_documents(collection, [chunk("Valves need an inspection too", page="2")])
+    assert len(db.query(collection, "inspection", k=5, mode="lexical")) == 2
@@ -0,0 +1,76 @@
+"""Search across several collections: one query embedding, merged and ranked hits."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from conftest import chunk
+
+
+@pytest.fixture
+def collections(db, collection):
+    names = [f"{collection}-manuals", f"{collection}-reports", f"{collection}-empty"]
+    db.add_documents(names[0], [
+        chunk("pump maintenance schedule zq", source="pump.pdf"),
+        chunk("valve torque settings", source="valve.pdf"),
+    ])
+    db.add_documents(names[1], [
+        chunk("pump failure report zq zq", source="failure.pdf"),
+        chunk("quarterly budget review", source="budget.pdf"),
+    ])
+    db.client.get_or_create_collection(names[2])
+    return names
+
+
+def _distance(embeddings, query, text):
+    return float(np.sum((np.asarray(embeddings.embed_query(query)) - np.asarray(embeddings.embed_query(text))) ** 2))
+
+
+def test_hits_are_merged_by_distance(db, embeddings, collections, monkeypatch):
+    embedded = []
+    embed_query = embeddings.embed_query
+    monkeypatch.setattr(embeddings, "embed_query", lambda text: embedded.append(text) or embed_query(text))
+    hits = db.search_collections(collections, "pump zq", k=3)
+
+    # The query is embedded once for all the collections
+    assert embedded == ["pump zq"]
+    texts = [hit.page_content for hit in hits]
+    assert len(texts) == 3 and {"pump maintenance schedule zq", "pump failure report zq zq"} <= set(texts)
+    distances = [_distance(embeddings, "pump zq", text) for text in texts]
+    assert distances == sorted(distances)
+    assert {hit.metadata["collection"] for hit in hits[:2]} == set(collections[:2])
+
+
+def test_every_collection_is_searched_with_a_star(db, collections):
+    hits = db.search_collections("*", "pump zq", k=50)
+    assert {hit.metadata["collection"] for hit in hits} >= set(collections[:2])
+
+
+def test_missing_collections_are_skipped_and_not_created(db, collection, collections):
+    missing = f"{collection}-missing"
+    hits = db.search_collections([missing, collections[1]], "budget", k=1)
+
+    assert [hit.page_content for hit in hits] == ["quarterly budget review"]
+    assert missing not in db.list_collections()
+    assert db.search_collections([missing], "budget") == []
+
+
+def test_failed_and_slow_collections_are_skipped(db, collections, monkeypatch):
+    scored_search = db._scored_search
+    release = threading.Event()
+
+    def flaky(name, *args):
+        if name == collections[0]:
+            raise RuntimeError("server error")
+        if name == collections[2]:
+            release.wait(5)
+        return scored_search(name, *args)
+
+    monkeypatch.setattr(db, "_scored_search", flaky)
+    try:
+        hits = db.search_collections(collections, "pump zq", k=5, timeout=0.5)
+    finally:
+        release.set()
+
+    assert hits and {hit.metadata["collection"] for hit in hits} == {collections[1]}
@@ -0,0 +1,122 @@
+"""Server-side sessions: persistence, LRU and the token-budgeted history window."""
+
+import json
+import uuid
+
+import pytest
+
+from core.tokens import estimate_tokens
+from services.sessions import SessionStore, assistant_turn
+
+
+def _turns(count, size=200):
+    return [{"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i} " + "x" * size} for i in range(count)]
+
+
+def test_turns_are_persisted_and_reloaded(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    store = SessionStore(max_sessions=1, db_path=path)
+    store.append("a", {"role": "user", "content": "hello"})
+    store.append("b", {"role": "user", "content": "other"})
+    # "a" was evicted from memory by "b", it is read back from SQLite
+    assert store.get_turns("a") == [{"role": "user", "content": "hello"}]
+
+    store.append("a", {"role": "assistant", "content": "hi"})
+    assert [turn["content"] for turn in SessionStore(db_path=path).get_turns("a")] == ["hello", "hi"]
+
+
+def test_short_history_is_sent_verbatim():
+    store = SessionStore(db_path=":memory:", token_budget=2000)
+    for turn in _turns(4, size=10):
+        store.append("s", turn)
+
+    assert store.window("s") == _turns(4, size=10)
+
+
+def test_long_history_is_compacted_within_the_budget():
+    store = SessionStore(db_path=":memory:")
+    turns = _turns(30)
+    turns[0]["files_paths"] = ["/uploads/s/report.pdf"]
+    for turn in turns:
+        store.append("s", turn)
+
+    window = store.window("s", token_budget=500)
+    summary, recent = window[0], window[1:]
+    assert summary["role"] == "system" and summary["content"].startswith("Compacted summary of")
+    assert recent == turns[len(turns) - len(recent):]
+    assert sum(estimate_tokens(json.dumps(turn)) for turn in recent) <= 500 * 0.75
+    assert estimate_tokens(summary["content"].split(":\n", 1)[1]) <= 500
+
+
+def test_latest_turn_is_always_included():
+    store = SessionStore(db_path=":memory:")
+    store.append("s", {"role": "user", "content": "first"})
+    store.append("s", {"role": "user", "content": "y" * 10000})
+
+    window = store.window("s", token_budget=100)
+    assert window[-1]["content"] == "y" * 10000
+    # Nothing is left for the summary
+    assert window[0]["content"] == "Compacted summary of 1 earlier turns (1 oldest omitted):\n"
+
+
+def test_assistant_turn_keeps_the_last_code_blocks():
+    assert assistant_turn(["a", "b", "c"], "done")["content"] == "Before Last code block : \nb\n\nLast code block : \nc"
+    assert assistant_turn([], "done") == {"role": "assistant", "content": "done"}
+
+
+class _Agent:
+    """Stand-in for AutoRAGENT streaming a code step, then failing or answering."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+
+    def __call__(self, history, session_id, stream):
+        yield json.dumps({"type": "code", "content": "print(1)"}) + "\n"
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        yield json.dumps({"type": "final", "content": "The answer"}) + "\n"
+
+
+@pytest.fixture
+def api():
+    import api
+
+    return api
+
+
+def _chat(api, session_id, message="hello"):
+    from fastapi.testclient import TestClient
+
+    return TestClient(api.app).post("/chat", data={"message": message, "session_id": session_id})
+
+
+def test_chat_records_the_user_and_assistant_turns(api, monkeypatch):
+    monkeypatch.setattr(api, "AutoRAGENT", lambda: _Agent())
+    session_id = f"s-{uuid.uuid4().hex}"
+    response = _chat(api, session_id)
+
+    assert response.status_code == 200 and response.headers["X-Session-ID"] == session_id
+    turns = api.registry.get_session_store().get_turns(session_id)
+    assert [(turn["role"], turn["content"]) for turn in turns] == [("user", "hello"), ("assistant", "print(1)")]
+
+
+def test_failed_run_still_answers_the_user_turn(api, monkeypatch):
+    monkeypatch.setattr(api, "AutoRAGENT", lambda: _Agent(fail=True))
+    session_id = f"s-{uuid.uuid4().hex}"
+    lines = [json.loads(line) for line in _chat(api, session_id).text.splitlines()]
+
+    assert lines[-1] == {"type": "error", "content": "LLM unavailable"}
+    turns = api.registry.get_session_store().get_turns(session_id)
+    assert [turn["role"] for turn in turns] == ["user", "assistant"]
+    assert turns[1]["content"] == "print(1)\n[Answer interrupted before completion]"
+
+
+def test_rejected_chat_leaves_the_session_untouched(api, monkeypatch):
+    async def no_slot():
+        return False
+
+    monkeypatch.setattr(api.chat_runner, "acquire", no_slot)
+    session_id = f"s-{uuid.uuid4().hex}"
+
+    assert _chat(api, session_id).status_code == 429
+    assert api.registry.get_session_store().get_turns(session_id) == []
@@ -0,0 +1,91 @@
+"""Collection snapshots: export / import round trip and embedding space checks."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from conftest import chunk
+
+
+@pytest.fixture
+def exported(db, collection, tmp_path):
+    db.add_documents(collection, [chunk(f"Chunk {i} about pumps and valves, reference {i * 7}", page=str(i)) for i in range(25)])
+    path = str(tmp_path / "snapshot")
+    manifest = db.export_collection(collection, path, batch_size=10)
+    return path, manifest
+
+
+def test_export_writes_compressed_columns_and_a_manifest(exported):
+    path, manifest = exported
+    assert sorted(os.listdir(path)) == ["documents.jsonl.gz", "embeddings.npy", "ids.jsonl.gz", "manifest.json", "metadatas.jsonl.gz"]
+    assert manifest["count"] == 25 and manifest["dtype"] == "float32"
+    assert np.load(os.path.join(path, "embeddings.npy"), mmap_mode="r").shape == (25, manifest["dimension"])
+
+
+def test_import_restores_the_collection_without_embedding(db, embeddings, collection, exported):
+    path, _ = exported
+    calls = embeddings.calls
+    target = f"{collection}-restored"
+    assert db.import_collection(path, collection_name=target, batch_size=7, workers=2) == {"imported": 25}
+    assert embeddings.calls == calls
+
+    source = db.client.get_collection(collection).get(include=["documents", "metadatas", "embeddings"])
+    restored = db.client.get_collection(target).get(ids=source["ids"], include=["documents", "metadatas", "embeddings"])
+    assert restored["ids"] == source["ids"]
+    assert restored["documents"] == source["documents"] and restored["metadatas"] == source["metadatas"]
+    np.testing.assert_allclose(np.asarray(restored["embeddings"]), np.asarray(source["embeddings"]))
+    # The lexical index of the target is built from the imported chunks during the import
+    assert target in db.lexical._indexes
+    assert db.query(target, "reference 70", k=1, mode="lexical")[0].page_content == "Chunk 10 about pumps and valves, reference 70"
+
+
+def test_import_refuses_another_embedding_space(db, exported):
+    path, _ = exported
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    manifest.update(embedding_model="other/model")
+    with pytest.raises(ValueError, match="other/model"):
+        db._check_embedding_space(manifest)
+
+    manifest.update(embedding_model=db.embedding_model, embedding_backend="onnx-int8", embedding_precision="int8")
+    db.embedding_backend = "hf"
+    with pytest.raises(ValueError, match="int8 precision"):
+        db._check_embedding_space(manifest)
+    # fp32 backends are interchangeable
+    db.embedding_backend = "onnx"
+    manifest.update(embedding_backend="hf", embedding_precision="fp32")
+    db._check_embedding_space(manifest)
+
+
+def test_import_checks_the_precision_unless_allowed(db, collection, exported):
+    path, _ = exported
+    db.embedding_backend = "onnx-int8"
+    with open(os.path.join(path, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    manifest.update(embedding_backend="hf", embedding_precision="fp32")
+    with open(os.path.join(path, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError, match="fp32 precision"):
+        db.import_collection(path, collection_name=f"{collection}-int8")
+    assert db.import_collection(path, collection_name=f"{collection}-int8", allow_model_mismatch=True) == {"imported": 25}
+
+
+def test_snapshots_never_load_the_embedding_model(db, collection, exported, tmp_path, monkeypatch):
+    from core.DBHandler import VectorDBManager, registry
+
+    def no_model(*args, **kwargs):
+        raise AssertionError("the embedding model was loaded")
+
+    monkeypatch.setattr(registry, "get_embeddings", no_model)
+    manager = VectorDBManager()
+    path, _ = exported
+
+    assert collection in manager.list_collections()
+    manager.export_collection(collection, str(tmp_path / "again"))
+    assert manager.import_collection(path, collection_name=f"{collection}-cli") == {"imported": 25}
+    with pytest.raises(AssertionError, match="embedding model"):
+        manager.embedding_function
@@ -0,0 +1,89 @@
+"""Incremental re-ingestion: deterministic chunk IDs, idempotent syncs and stale chunk removal."""
+
+from conftest import chunk
+
+
+def _stored(db, collection):
+    return db._get_collection_store(collection)._collection.get(include=["documents", "metadatas"])
+
+
+def test_chunk_id_is_deterministic_and_depends_on_the_document():
+    from core.DBHandler import VectorDBManager
+
+    a = chunk("Quarterly revenue grew by 12%", source_path="/uploads/s1/report.pdf")
+    assert VectorDBManager.chunk_id(a) == VectorDBManager.chunk_id(chunk("Quarterly revenue grew by 12%", source_path="/uploads/s1/report.pdf"))
+    assert VectorDBManager.chunk_id(a) != VectorDBManager.chunk_id(chunk("Quarterly revenue grew by 12%", source_path="/uploads/s2/report.pdf"))
+    assert VectorDBManager.chunk_id(a) != VectorDBManager.chunk_id(chunk("Quarterly revenue grew by 13%", source_path="/uploads/s1/report.pdf"))
+
+
+def test_source_key_prefers_the_full_path():
+    from core.DBHandler import VectorDBManager
+
+    assert VectorDBManager.source_key({"source": "report.pdf", "source_path": "/uploads/s1/report.pdf"}) == "/uploads/s1/report.pdf"
+    assert VectorDBManager.source_key({"source": "report.pdf"}) == "report.pdf"
+    assert VectorDBManager.source_key(None) == ""
+
+
+def test_resync_is_idempotent(db, embeddings, collection):
+    docs = [
+        chunk("The pump must be inspected every six months.", source_path="/data/manual.pdf", page="1"),
+        chunk("Warranty claims are handled by the supplier.", source_path="/data/manual.pdf", page="2"),
+    ]
+    first = db.sync_documents(collection, docs)
+    assert first["added"] == 2 and first["removed"] == 0
+    calls = embeddings.calls
+
+    second = db.sync_documents(collection, docs)
+    assert second == {"added": 0, "unchanged": 2, "removed": 0, "deduplicated": 0}
+    assert embeddings.calls == calls
+    assert len(_stored(db, collection)["ids"]) == 2
+
+
+def test_resync_removes_stale_chunks(db, collection):
+    path = "/data/manual.pdf"
+    db.sync_documents(
+        collection,
+        [
+            chunk("The pump must be inspected every six months.", source_path=path, page="1"),
+            chunk("Warranty claims are handled by the supplier.", source_path=path, page="2"),
+        ],
+    )
+    report = db.sync_documents(
+        collection,
+        [
+            chunk("The pump must be inspected every six months.", source_path=path, page="1"),
+            chunk("Warranty claims are handled by the manufacturer.", source_path=path, page="2"),
+        ],
+    )
+    assert report["added"] == 1 and report["unchanged"] == 1 and report["removed"] == 1
+    assert sorted(_stored(db, collection)["documents"]) == [
+        "The pump must be inspected every six months.",
+        "Warranty claims are handled by the manufacturer.",
+    ]
+    # The lexical index follows the collection
+    hits = db.query(collection, "supplier warranty", k=5, mode="lexical")
+    assert all("supplier" not in doc.page_content for doc in hits)
+
+
+def test_files_sharing_a_name_are_different_documents(db, collection):
+    db.sync_documents(collection, [chunk("Budget of the first session.", source="report.pdf", source_path="/uploads/s1/report.pdf")])
+    report = db.sync_documents(
+        collection, [chunk("Audit of the second session.", source="report.pdf", source_path="/uploads/s2/report.pdf")]
+    )
+    assert report["removed"] == 0
+    assert sorted(_stored(db, collection)["documents"]) == ["Audit of the second session.", "Budget of the first session."]
+
+    # Re-ingesting one of them only replaces its own chunks
+    report = db.sync_documents(
+        collection, [chunk("Revised budget of the first session.", source="report.pdf", source_path="/uploads/s1/report.pdf")]
+    )
+    assert report["removed"] == 1
+    assert sorted(_stored(db, collection)["documents"]) == ["Audit of the second session.", "Revised budget of the first session."]
+
+
+def test_chunks_without_a_path_are_keyed_by_name(db, collection):
+    db.sync_documents(collection, [chunk("Chunk added by name only.", source="notes.txt")])
+    db.sync_documents(collection, [chunk("Chunk of another notes.txt.", source="notes.txt", source_path="/data/notes.txt")])
+    report = db.sync_documents(collection, [chunk("New content added by name only.", source="notes.txt")])
+    assert report["removed"] == 1
+    assert sorted(_stored(db, collection)["documents"]) == ["Chunk of another notes.txt.", "New content added by name only."]
@@ -0,0 +1,143 @@
+"""In-process vector store: segments, the operation log, compaction and the IVF index."""
+
+import os
+
+import numpy as np
+import pytest
+
+from core import vector_store
+from core.vector_store import LocalVectorClient
+
+
+def _vectors(count, dimension=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, dimension)).astype(np.float32)
+
+
+def _ids(count, prefix="id"):
+    return [f"{prefix}-{i}" for i in range(count)]
+
+
+def _segment_files(path, name):
+    return sorted(f for f in os.listdir(os.path.join(path, name)) if f.startswith("seg-"))
+
+
+@pytest.fixture
+def client(tmp_path):
+    return LocalVectorClient(path=str(tmp_path / "vectors"), index_threshold=0)
+
+
+def test_upsert_get_and_query_like_chroma(client):
+    collection = client.get_or_create_collection("docs", metadata={"hnsw:space": "cosine"})
+    vectors = _vectors(50)
+    collection.upsert(
+        ids=_ids(50), embeddings=vectors, documents=[f"text {i}" for i in range(50)], metadatas=[{"n": i} for i in range(50)]
+    )
+
+    assert collection.count() == 50
+    got = collection.get(ids=["id-3", "missing", "id-1"], include=["documents", "metadatas", "embeddings"])
+    assert got["ids"] == ["id-3", "id-1"] and got["documents"] == ["text 3", "text 1"]
+    np.testing.assert_allclose(got["embeddings"], vectors[[3, 1]])
+    assert collection.get(where={"n": {"$gte": 45}}, offset=1, limit=2)["ids"] == ["id-46", "id-47"]
+
+    result = collection.query(query_embeddings=[vectors[7]], n_results=5)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(1 - normalized @ normalized[7], kind="stable")[:5]
+    assert result["ids"][0] == [f"id-{i}" for i in expected]
+    assert result["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+    assert collection.query(query_embeddings=[vectors[7]], n_results=3, where={"n": {"$lt": 5}})["ids"][0][0] in _ids(5)
+
+
+def test_upsert_replaces_and_delete_masks_rows(client):
+    collection = client.get_or_create_collection("docs")
+    collection.upsert(ids=_ids(3), embeddings=_vectors(3), documents=["a", "b", "c"])
+    collection.upsert(ids=["id-1"], embeddings=_vectors(1, seed=1), documents=["b2"])
+    collection.delete(ids=["id-2"])
+
+    assert collection.count() == 2
+    assert collection.get()["documents"] == ["a", "b2"]
+    with pytest.raises(ValueError, match="dimension"):
+        collection.upsert(ids=["x"], embeddings=_vectors(1, dimension=8))
+
+
+def test_collection_is_reloaded_from_its_log(client, tmp_path):
+    collection = client.get_or_create_collection("docs")
+    collection.upsert(ids=_ids(4), embeddings=_vectors(4), documents=list("abcd"), metadatas=[{"n": i} for i in range(4)])
+    collection.upsert(ids=["id-0"], embeddings=_vectors(1, seed=1), documents=["a2"])
+    collection.delete(where={"n": 3})
+    # A segment written by a crashed upsert, never logged
+    vector_store._Segment.write(collection.folder, "seg-000099", ["ghost"], _vectors(1), ["ghost"], [None], "float32")
+
+    reopened = LocalVectorClient(path=client.path, index_threshold=0).get_collection("docs")
+    assert reopened.get()["ids"] == ["id-1", "id-2", "id-0"]
+    assert reopened.get(ids=["id-0"])["documents"] == ["a2"]
+    assert not any(name.startswith("seg-000099") for name in _segment_files(client.path, "docs"))
+
+
+def test_compaction_drops_dead_rows(client):
+    collection = client.get_or_create_collection("docs")
+    collection.upsert(ids=_ids(10), embeddings=_vectors(10), documents=[str(i) for i in range(10)])
+    collection.upsert(ids=_ids(5, "other"), embeddings=_vectors(5, seed=1))
+    # Over MAX_DEAD_RATIO of the rows are dead: everything is rewritten into one segment
+    collection.delete(ids=_ids(6))
+
+    assert len(collection._segments) == 1 and collection._total_rows() == collection.count() == 9
+    assert len(_segment_files(client.path, "docs")) == 2
+    reopened = LocalVectorClient(path=client.path, index_threshold=0).get_collection("docs")
+    assert reopened.get()["ids"] == _ids(10)[6:] + _ids(5, "other")
+
+
+def test_small_segments_are_merged(client, monkeypatch):
+    monkeypatch.setattr(vector_store, "MAX_SEGMENTS", 4)
+    collection = client.get_or_create_collection("docs")
+    for i in range(10):
+        collection.upsert(ids=[f"id-{i}"], embeddings=_vectors(1, seed=i))
+
+    assert len(collection._segments) <= 4
+    assert collection.get()["ids"] == _ids(10)
+
+
+def test_float16_storage(tmp_path):
+    collection = LocalVectorClient(path=str(tmp_path), dtype="float16", index_threshold=0).get_or_create_collection("docs")
+    vectors = _vectors(20)
+    collection.upsert(ids=_ids(20), embeddings=vectors)
+
+    assert collection._segments[0].embeddings.dtype == np.float16
+    assert collection.query(query_embeddings=[vectors[11]], n_results=1)["ids"] == [["id-11"]]
+
+
+def test_ivf_index_finds_the_nearest_rows(tmp_path):
+    # Clustered rows, as the IVF lists assume
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 16)) * 10
+    vectors = (centers[rng.integers(0, 20, size=2000)] + rng.normal(size=(2000, 16))).astype(np.float32)
+    collection = LocalVectorClient(path=str(tmp_path), index_threshold=1000).get_or_create_collection("docs")
+    collection.upsert(ids=_ids(2000), embeddings=vectors)
+
+    # The first query scans exhaustively while the index is built in the background
+    assert collection.query(query_embeddings=[vectors[7]], n_results=1)["ids"] == [["id-7"]]
+    collection._index_build.join(10)
+    assert collection._index is not None and collection._index.rows == 2000
+    for row in (0, 500, 1999):
+        assert collection.query(query_embeddings=[vectors[row]], n_results=1)["ids"] == [[f"id-{row}"]]
+
+    # Rows written after the build are scanned exhaustively
+    collection.upsert(ids=["new"], embeddings=vectors[:1] + 0.01)
+    assert collection.query(query_embeddings=[vectors[0] + 0.01], n_results=1)["ids"] == [["new"]]
+
+
+def test_ivf_index_is_rebuilt_after_compaction(tmp_path):
+    vectors = _vectors(300)
+    collection = LocalVectorClient(path=str(tmp_path), index_threshold=100).get_or_create_collection("docs")
+    collection.upsert(ids=_ids(300), embeddings=vectors)
+    collection.query(query_embeddings=[vectors[0]], n_results=1)
+    collection._index_build.join(10)
+    built = collection._index
+
+    collection.upsert(ids=_ids(300)[:10], embeddings=vectors[:10] + 1.0)
+    collection.compact()
+    # Compaction starts the new build, queries are exact until it is ready
+    assert collection._index is not built
+    assert collection.query(query_embeddings=[vectors[5] + 1.0], n_results=1)["ids"] == [["id-5"]]
+    collection._index_build.join(10)
+    assert collection._index is not None and collection._index is not built
+    assert collection._index.segments == collection._segments and collection._index.rows == 300
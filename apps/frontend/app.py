@@ -10,40 +10,64 @@ st.title("📖 AutoRAGent")
 API_URL = os.getenv("BACKEND_URL", "http://localhost:2003")
 
 # SIDEBAR - Collections Preview
+COLLECTIONS_PAGE_SIZE = 50
+
+def fetch_collections(page: int, refresh: bool = False) -> dict:
+    """Collections catalog page, revalidated with its ETag so unchanged pages are not re-sent on every rerun."""
+    cache = st.session_state.setdefault("collections_cache", {})
+    cached = cache.get(page)
+    headers = {"If-None-Match": cached["etag"]} if cached and not refresh else {}
+    params = {"offset": page * COLLECTIONS_PAGE_SIZE, "limit": COLLECTIONS_PAGE_SIZE, "refresh": refresh}
+    response = requests.get(f"{API_URL}/collections", params=params, headers=headers, timeout=10)
+    if response.status_code == 304:
+        return cached["data"]
+    response.raise_for_status()
+    data = response.json()
+    cache[page] = {"etag": response.headers.get("ETag"), "data": data}
+    return data
+
 with st.sidebar:
     st.header("📚 Knowledge Base")
-    if st.button("Refresh Collections"):
-        st.rerun()
-    
+    refresh = st.button("Refresh Collections")
+    page = st.session_state.setdefault("collections_page", 0)
+
     try:
-        response = requests.get(f"{API_URL}/collections")
-        if response.status_code == 200:
-            data = response.json()
-            collections = data.get("collections", [])
-            
-            if not collections:
-                st.info("No collections found.")
-            
-            for col in collections:
-                with st.expander(f"📂 {col['name']}"):
-                    preview_docs = col.get("preview", [])
-                    if preview_docs:
-                        for i, doc in enumerate(preview_docs):
-                            with st.container(border=True):
-                                st.caption(f"📄 **Chunk {i+1}**")
-                                st.markdown(f"_{doc[:150]}..._" if len(doc) > 150 else f"_{doc}_")
-                    else:
-                        st.caption("🚫 *Empty collection*")
-        else:
-            st.error("Failed to fetch collections")
+        data = fetch_collections(page, refresh)
+        collections = data.get("collections", [])
+        total = data.get("total", len(collections))
+
+        if not collections:
+            st.info("No collections found.")
+
+        for col in collections:
+            with st.expander(f"📂 {col['name']} ({col.get('count', 0)} chunks)"):
+                if col.get("sources"):
+                    st.caption("🗂️ " + ", ".join(col["sources"][:10]) + (" …" if len(col["sources"]) > 10 else ""))
+                preview_docs = col.get("preview", [])
+                if preview_docs:
+                    for i, doc in enumerate(preview_docs):
+                        with st.container(border=True):
+                            st.caption(f"📄 **Chunk {i+1}**")
+                            st.markdown(f"_{doc[:150]}..._" if len(doc) > 150 else f"_{doc}_")
+                else:
+                    st.caption("🚫 *Empty collection*")
+
+        if total > COLLECTIONS_PAGE_SIZE:
+            last_page = (total - 1) // COLLECTIONS_PAGE_SIZE
+            previous_col, label_col, next_col = st.columns([1, 2, 1])
+            if previous_col.button("◀", disabled=page == 0):
+                st.session_state.collections_page = page - 1
+                st.rerun()
+            label_col.caption(f"Page {page + 1} / {last_page + 1}")
+            if next_col.button("▶", disabled=page >= last_page):
+                st.session_state.collections_page = page + 1
+                st.rerun()
     except Exception as e:
-        st.error(f"Connection error: {e}")
+        st.error(f"Failed to fetch collections: {e}")
 
 # STATE MANEGEMENT
 if "messages" not in st.session_state:
     st.session_state.messages = []
-if "history" not in st.session_state:
-    st.session_state.history = []  # downgraded version of messages to not abuse context, save user messages and only before final answer code blcok
 
 if "session_id" not in st.session_state:
     st.session_state.session_id = str(uuid.uuid4())
@@ -88,14 +112,7 @@ if prompt := st.chat_input("What is up?", accept_file="multiple", file_type=["cs
     st.session_state.messages.append(
         {"role": "user", "content": prompt.text, "files_names": file_names, "files_paths": []}) # paths are handled by backend now
     
-    # Prepare history for API (exclude large content if needed, but here we send full history)
-    # We need to make sure history format matches what backend expects
-    # Backend expects: [{"role": "user", "content": "...", "files_paths": [...]}, ...]
-    # Our session_state.history seems to match this structure roughly
-    
-    # Update history with current turn
-    current_turn = {"role": "user", "content": prompt.text, "files_paths": []} # Backend will fill files_paths
-    st.session_state.history.append(current_turn)
+    # The conversation history is kept by the backend under our session ID, we only send the new message
     
     images_path = []
 
@@ -111,17 +128,18 @@ if prompt := st.chat_input("What is up?", accept_file="multiple", file_type=["cs
             with st.container():
                 with st.expander("Coding Steps"):
                     step_placeholder = st.empty()
+            progress_container = st.container()
+            progress_bars = {}  # ingestion job ID -> progress bar
             final_answer_placeholder = st.empty()
             step_details = ""
             final_answer = ""
             counter = 1
-            code_blocks = [] 
             
             try:
                 # Prepare payload
                 payload = {
                     "session_id": st.session_state.session_id,
-                    "history": json.dumps(st.session_state.history)
+                    "message": prompt.text
                 }
                 
                 # Call API
@@ -140,13 +158,27 @@ if prompt := st.chat_input("What is up?", accept_file="multiple", file_type=["cs
                                     if resp_type == "code":
                                         step_details += f"**Step {counter}**\n\n{resp}\n---\n"
                                         counter += 1
-                                        code_blocks.append(resp)
                                         step_placeholder.markdown(step_details)
                                     elif resp_type == "final":
                                         final_answer = resp
                                         final_answer_placeholder.markdown(final_answer)
+                                    elif resp_type == "progress":
+                                        job = resp
+                                        if job["job_id"] not in progress_bars:
+                                            progress_bars[job["job_id"]] = progress_container.progress(0.0)
+                                        text = (f"📥 Ragifying into **{job['collection']}** ({job['status']}): "
+                                                f"{job['files_parsed']}/{job['files_total']} files, {job['pages_parsed']} pages parsed, "
+                                                f"{job['chunks_embedded']}/{job['chunks_produced']} chunks embedded")
+                                        progress_bars[job["job_id"]].progress(min(float(job["fraction"]), 1.0), text=text)
+                                    elif resp_type == "error":
+                                        st.error(f"Agent error: {resp}")
                             except json.JSONDecodeError:
                                 pass
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 429:
+                    st.warning("The assistant is busy with other conversations, please retry in a moment.")
+                else:
+                    st.error(f"Error communicating with backend: {e}")
             except Exception as e:
                 st.error(f"Error communicating with backend: {e}")
 
@@ -155,12 +187,4 @@ if prompt := st.chat_input("What is up?", accept_file="multiple", file_type=["cs
     st.session_state.messages.append(
         {"role": "assistant", "content": [final_answer, step_details], "images": images_path})
     
-    if len(code_blocks) >= 2:
-        st.session_state.history.append({"role": "assistant",
-                                         "content": f"Before Last code block : \n{code_blocks[-2]}\n\nLast code block : \n{code_blocks[-1]}"})
-    elif len(code_blocks) == 1:
-        st.session_state.history.append({"role": "assistant", "content": code_blocks[-1]})
-    else:
-         st.session_state.history.append({"role": "assistant", "content": final_answer})
-    
     st.rerun()